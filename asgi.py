@@ -0,0 +1,22 @@
+import os
+import sys
+
+# Add the project root directory to the Python path if needed
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from asgiref.wsgi import WsgiToAsgi
+
+from backend.app import create_app
+
+# Create the Flask app and wrap it for ASGI servers, e.g.
+#
+#   uvicorn asgi:application --workers 4
+#
+# Flask itself stays a WSGI app: each request still runs on a worker thread,
+# and async views run in an event loop of their own within that request,
+# which lets them await independent queries concurrently. The async view
+# variants are opt-in: set ASYNC_VIEWS=true (see backend.blueprints.async_views).
+app = create_app()
+application = WsgiToAsgi(app)
+
+# The 'application' variable is what ASGI servers will look for.
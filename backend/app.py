@@ -10,15 +10,31 @@ from flask_migrate import Migrate
 
 from backend.config import DevelopmentConfig, ProductionConfig
 from backend.extensions import db, ma, migrate, jwt, cors, cache, init_extensions
+from backend.utils.async_db import init_async_db
 from backend.utils.caching import configure_cache
+from backend.utils.warmup import warm_cache
+from backend.utils.change_tracking import init_change_tracking
+from backend.utils.entity_loader import init_entity_loader
+from backend.utils.edge_cache import init_edge_cache
+from backend.utils.db_pool import configure_pool
+from backend.utils.db_routing import init_routing
+from backend.utils.query_stats import init_query_stats
+from backend.utils.slow_queries import init_slow_query_log
+from backend.utils.sqlite_profile import apply_pragmas, profile_pragmas
+from backend.utils.write_coordinator import DatabaseBusy, busy_response
 
 # Blueprints
 from backend.blueprints.bakery_bp import bakery_bp
 from backend.blueprints.product_bp import product_bp
 from backend.blueprints.review_bp import bakery_review_bp, product_review_bp
+from backend.blueprints.review_search_bp import review_search_bp
 from backend.blueprints.user_bp import user_bp
 from backend.blueprints.auth_bp import auth_bp
 from backend.blueprints.category_bp import category_bp
+from backend.blueprints.admin_bp import admin_bp
+from backend.blueprints.search_bp import search_bp
+from backend.blueprints.zipcode_bp import zipcode_bp
+from backend.blueprints.async_views import register_async_views
 
 # Load environment variables from .env file
 load_dotenv()
@@ -68,19 +84,34 @@ def create_app(config_class=None):
             )
 
     # ——— Initialize extensions ———
+    configure_pool(app)
     init_extensions(app)
+    init_routing()
     configure_cache(app)
+    init_change_tracking()
+    init_entity_loader()
+    init_edge_cache(app)
     
-    # ——— Enable SQLite foreign key constraints ———
-    if 'sqlite' in app.config.get('SQLALCHEMY_DATABASE_URI', ''):
-        def _set_sqlite_pragma(dbapi_connection, connection_record):
-            cursor = dbapi_connection.cursor()
-            cursor.execute("PRAGMA foreign_keys=ON;")
-            cursor.close()
-            app.logger.info("SQLite foreign key constraints enabled")
-            
-        with app.app_context():
-            event.listen(db.engine, "connect", _set_sqlite_pragma)
+    # ——— SQLite: foreign key constraints and the performance profile ———
+    pragmas = profile_pragmas(app.config.get('SQLITE_PROFILE', 'default'), app.config.get('SQLITE_PRAGMAS'))
+
+    def _set_sqlite_pragma(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, pragmas)
+        app.logger.info(f"SQLite connection configured: foreign_keys=ON, {pragmas}")
+
+    with app.app_context():
+        # The primary and, when configured, the read replica
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, "connect", _set_sqlite_pragma)
+
+    # ——— Async engine for the async view variants (ASYNC_VIEWS) ———
+    # (its connections are opened per use, so without logging each one)
+    init_async_db(app, on_connect=lambda dbapi_connection, record: apply_pragmas(dbapi_connection, pragmas))
+
+    # ——— SQL statement counts, N+1 detection and the slow query log ———
+    init_query_stats(app)
+    init_slow_query_log(app)
 
     # ——— CORS ———
     allowed = app.config.get('ALLOWED_ORIGINS', ['http://localhost:5173'])
@@ -97,11 +128,20 @@ def create_app(config_class=None):
     app.register_blueprint(product_bp, url_prefix='/products')
     app.register_blueprint(bakery_review_bp, url_prefix='/bakeryreviews')
     app.register_blueprint(product_review_bp, url_prefix='/productreviews')
+    app.register_blueprint(review_search_bp, url_prefix='/reviews')
     app.register_blueprint(user_bp, url_prefix='/users')
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(category_bp, url_prefix='/categories')
+    app.register_blueprint(admin_bp, url_prefix='/admin')
+    app.register_blueprint(search_bp, url_prefix='/search')
+    app.register_blueprint(zipcode_bp, url_prefix='/zipcodes')
+    register_async_views(app)
 
     # ——— Error handling ———
+    @app.errorhandler(DatabaseBusy)
+    def database_busy(e):
+        return busy_response(e)
+
     @app.errorhandler(Exception)
     def catch_all(e):
         app.logger.error(f'Unhandled exception: {e}')
@@ -114,6 +154,13 @@ def create_app(config_class=None):
     with app.app_context():
         from backend.models import __all_models__  # noqa
 
+    # ——— Cache warmup ———
+    if app.config.get('CACHE_WARMUP_ENABLED'):
+        try:
+            warm_cache(app)
+        except Exception as e:
+            app.logger.error(f'Cache warmup failed: {e}')
+
     return app
 
 if __name__ == '__main__':
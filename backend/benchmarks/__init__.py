@@ -0,0 +1,6 @@
+"""
+Standalone benchmarks, run as modules: ``python -m backend.benchmarks.<name>``.
+
+They build their own throwaway SQLite databases and print timings; nothing
+here runs as part of the test suite.
+"""
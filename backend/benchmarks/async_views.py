@@ -0,0 +1,106 @@
+"""
+Requests per second of one worker, sync views against their async variants.
+
+    python -m backend.benchmarks.async_views [--requests 2000] [--threads 1]
+
+A fresh database file is seeded with bakeries, products and reviews. The
+endpoints that have an async variant (see ``backend.blueprints.async_views``)
+are then requested back to back through the WSGI test client, once with the
+sync views and once with ``ASYNC_VIEWS`` on, and the throughput and median
+latency are reported. ``--threads`` runs that many request threads against
+the same app, as a threaded worker would.
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from backend.benchmarks.common import make_app
+
+BAKERIES = 200
+PRODUCTS_PER_BAKERY = 8
+REVIEWS_PER_BAKERY = 25
+ENDPOINTS = ('/bakeries/{}/profile', '/bakeries/{}/stats')
+
+
+def seed(database):
+    """Create the schema with bakeries, their products and reviews"""
+    from sqlalchemy import text
+
+    app = make_app(f"sqlite:///{database}")
+    with app.app_context():
+        from backend.extensions import db
+
+        db.create_all()
+        db.session.execute(text(
+            "INSERT INTO user (id, username, email, password_hash, is_admin) VALUES (1, 'bench', 'b@example.com', 'x', 0)"
+        ))
+        db.session.execute(text(
+            "INSERT INTO bakery (id, name, zip_code, street_name, street_number) VALUES (:id, :name, '2200', 'Gade', '1')"
+        ), [{'id': i, 'name': f'Bageri {i}'} for i in range(1, BAKERIES + 1)])
+        db.session.execute(text(
+            "INSERT INTO product (name, name_sort_key, bakery_id) VALUES (:name, :name, :bakery_id)"
+        ), [{'name': f'Brød {b}.{p}', 'bakery_id': b} for b in range(1, BAKERIES + 1) for p in range(PRODUCTS_PER_BAKERY)])
+        rng = random.Random(42)
+        db.session.execute(text(
+            "INSERT INTO bakery_review (review, overall_rating, service_rating, user_id, bakery_id, created_at) "
+            "VALUES ('God', :rating, :rating, 1, :bakery_id, datetime('now', :age))"
+        ), [{'rating': rng.randint(1, 10), 'bakery_id': b, 'age': f'-{r} minutes'}
+            for b in range(1, BAKERIES + 1) for r in range(REVIEWS_PER_BAKERY)])
+        db.session.commit()
+        db.engine.dispose()
+
+
+def run(app, path, requests, threads):
+    """(requests per second, median latency in ms) for ``path`` over ``requests`` requests"""
+    rng = random.Random(7)
+    urls = [path.format(rng.randint(1, BAKERIES)) for _ in range(requests)]
+    latencies = []
+    lock = threading.Lock()
+
+    def work(chunk):
+        client = app.test_client()
+        own = []
+        for url in chunk:
+            started = time.perf_counter()
+            response = client.get(url)
+            own.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, response.get_data(as_text=True)
+        with lock:
+            latencies.extend(own)
+
+    for url in urls[:50]:  # warm up: zip rollups, statement caches
+        app.test_client().get(url)
+    started = time.perf_counter()
+    workers = [threading.Thread(target=work, args=(urls[n::threads],)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    return requests / elapsed, statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = f'{directory}/bakery.db'
+        seed(database)
+        print(f"{BAKERIES} bakeries, {PRODUCTS_PER_BAKERY} products and {REVIEWS_PER_BAKERY} reviews each; "
+              f"{args.requests} requests on {args.threads} thread(s)")
+        for async_views in (False, True):
+            app = make_app(f"sqlite:///{database}", ASYNC_VIEWS=async_views)
+            print('async views' if async_views else 'sync views')
+            for path in ENDPOINTS:
+                per_second, median = run(app, path, args.requests, args.threads)
+                print(f"  {path.format('<id>'):<30} {per_second:9.1f} req/s   median {median:7.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
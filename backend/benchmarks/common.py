@@ -0,0 +1,33 @@
+"""Helpers shared by the benchmarks"""
+import os
+import statistics
+import time
+
+# backend.config refuses to import without these; the benchmarks never use them
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark')
+
+
+def make_app(database_uri, **settings):
+    """App bound to the given database, with the testing config otherwise"""
+    from backend.app import create_app
+    from backend.config import TestingConfig
+
+    config = type('BenchmarkConfig', (TestingConfig,), {'SQLALCHEMY_DATABASE_URI': database_uri, **settings})
+    return create_app(config)
+
+
+def timed(function, repeat=20):
+    """Median and worst wall time of ``function()`` in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def report(label, timing):
+    median, worst = timing
+    print(f"  {label:<44} median {median:9.3f} ms   max {worst:9.3f} ms")
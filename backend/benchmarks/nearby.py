@@ -0,0 +1,96 @@
+"""
+Nearby bakery queries against a synthetic bakery table.
+
+    python -m backend.benchmarks.nearby [--bakeries 50000] [--db /tmp/bakery_nearby.db]
+
+Compares a full scan (load every coordinate, compute every distance) with
+the R*Tree ring search, for k-nearest, radius and rating-weighted queries
+from random points in Denmark.
+"""
+import argparse
+import os
+import random
+import time
+
+from backend.benchmarks.common import make_app, report, timed
+
+
+def build(db, count, seed=42):
+    """Create the schema and bulk load ``count`` bakeries and some reviews, bypassing the ORM"""
+    from sqlalchemy import text
+    from backend.utils.geo import _centroids
+
+    db.create_all()
+    rng = random.Random(seed)
+    codes, table = _centroids()
+    started = time.perf_counter()
+
+    bakeries = []
+    for i in range(1, count + 1):
+        zip_code = rng.choice(codes)
+        lat, lng = table[zip_code]
+        bakeries.append({'id': i, 'name': f'Bageri {i}', 'zip': zip_code,
+                         'lat': lat + rng.gauss(0, 0.02), 'lng': lng + rng.gauss(0, 0.03)})
+    db.session.execute(text(
+        "INSERT INTO bakery (id, name, zip_code, street_name, street_number, latitude, longitude) "
+        "VALUES (:id, :name, :zip, 'Gade', '1', :lat, :lng)"
+    ), bakeries)
+    db.session.execute(text(
+        "INSERT INTO bakery_rtree SELECT id, latitude, latitude, longitude, longitude FROM bakery"
+    ))
+    reviews = [{'bakery': rng.randint(1, count), 'rating': rng.randint(1, 10)} for _ in range(count * 2)]
+    db.session.execute(text(
+        "INSERT INTO bakery_review (review, overall_rating, bakery_id) VALUES ('ok', :rating, :bakery)"
+    ), reviews)
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+    print(f"Loaded {count:,} bakeries and {len(reviews):,} reviews in {time.perf_counter() - started:.1f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--bakeries', type=int, default=50_000)
+    parser.add_argument('--db', default='/tmp/bakery_nearby.db')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    fresh = not os.path.exists(args.db)
+    app = make_app(f"sqlite:///{args.db}")
+    with app.app_context():
+        from sqlalchemy import func, select
+        from backend.extensions import db
+        from backend.models import Bakery
+        from backend.services.bakery_service import BakeryService
+        from backend.utils.geo import haversine_km
+
+        if fresh:
+            build(db, args.bakeries)
+        print(f"{db.session.scalar(select(func.count(Bakery.id))):,} bakeries in {args.db}\n")
+
+        service = BakeryService()
+        rng = random.Random(1)
+        points = [(rng.uniform(54.9, 57.5), rng.uniform(8.3, 12.5)) for _ in range(args.repeat)]
+
+        def cycle(function):
+            remaining = iter(points * 2)
+            return lambda: function(*next(remaining))
+
+        def full_scan(lat, lng):
+            rows = db.session.execute(select(Bakery.id, Bakery.latitude, Bakery.longitude)).all()
+            return sorted((haversine_km(lat, lng, r.latitude, r.longitude), r.id) for r in rows)[:10]
+
+        report('full scan, 10 nearest (before)', timed(cycle(full_scan), max(args.repeat // 10, 1)))
+        report('R*Tree, 10 nearest', timed(cycle(lambda lat, lng: service.get_nearby_bakeries(lat, lng, limit=10)),
+                                            args.repeat))
+        report('R*Tree, 50 nearest', timed(cycle(lambda lat, lng: service.get_nearby_bakeries(lat, lng, limit=50)),
+                                            args.repeat))
+        report('R*Tree, 20 nearest within 5 km',
+               timed(cycle(lambda lat, lng: service.get_nearby_bakeries(lat, lng, radius_km=5)), args.repeat))
+        report('R*Tree, 20 best, rating weight 0.5 km',
+               timed(cycle(lambda lat, lng: service.get_nearby_bakeries(lat, lng, rating_weight=0.5)),
+                     args.repeat))
+        db.session.expunge_all()
+
+
+if __name__ == '__main__':
+    main()
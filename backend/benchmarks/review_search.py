@@ -0,0 +1,113 @@
+"""
+TF-IDF review search against synthetic reviews.
+
+    python -m backend.benchmarks.review_search [--reviews 100000] [--db /tmp/bakery_reviews.db]
+
+Times building, saving and loading the review vectors, relevance search,
+"similar reviews", and a search right after a new review was added. The
+ILIKE scan the review search used to fall back to is timed for comparison.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from backend.benchmarks.common import make_app, report, timed
+
+WORDS = (
+    'sourdough crust crumb flaky croissant butter rye bread cinnamon roll cardamom bun danish pastry '
+    'coffee service friendly slow queue price expensive cheap fresh warm chewy crispy soft dense airy '
+    'tart lemon custard chocolate almond marzipan seeded spelt wholegrain baguette focaccia sweet salty '
+    'rundstykke wienerbrød kanelsnegl rugbrød tebirkes spandauer hindbærsnitte flødebolle kringle'
+).split()
+
+
+def build(db, count, seed=42):
+    """Create the schema and bulk load ``count`` bakery and product reviews, bypassing the ORM"""
+    from sqlalchemy import text
+
+    db.create_all()
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    db.session.execute(text(
+        "INSERT INTO bakery (id, name, zip_code, street_name, street_number) VALUES (1, 'Bageri', '2200', 'Gade', '1')"
+    ))
+    db.session.execute(text("INSERT INTO product (id, name, bakery_id) VALUES (1, 'Brød', 1)"))
+
+    def review():
+        return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 40)))
+
+    half = count // 2
+    db.session.execute(text(
+        "INSERT INTO bakery_review (review, overall_rating, bakery_id, updated_at) "
+        "VALUES (:review, 5, 1, '2026-01-01 00:00:00')"
+    ), [{'review': review()} for _ in range(half)])
+    db.session.execute(text(
+        "INSERT INTO product_review (review, overall_rating, product_id, updated_at) "
+        "VALUES (:review, 5, 1, '2026-01-01 00:00:00')"
+    ), [{'review': review()} for _ in range(count - half)])
+    db.session.commit()
+    print(f"Loaded {count:,} reviews in {time.perf_counter() - started:.1f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--reviews', type=int, default=100_000)
+    parser.add_argument('--db', default='/tmp/bakery_reviews.db')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    fresh = not os.path.exists(args.db)
+    app = make_app(f"sqlite:///{args.db}")
+    with app.app_context():
+        from sqlalchemy import func, select
+        from backend.extensions import db
+        from backend.models import BakeryReview, ProductReview
+        from backend.services import review_vectors
+        from backend.utils.tfidf import TfidfIndex
+
+        if fresh:
+            build(db, args.reviews)
+        total = sum(db.session.scalar(select(func.count(model.id))) for model in (BakeryReview, ProductReview))
+        print(f"{total:,} reviews in {args.db}\n")
+
+        with tempfile.TemporaryDirectory() as path:
+            report('build from the database', timed(review_vectors.build_index, 1))
+            report('build and save', timed(lambda: review_vectors.save_index(path), 1))
+            report('load saved vectors', timed(lambda: TfidfIndex.load(path), 3))
+
+        index = review_vectors.get_review_index()
+        print(f"  {len(index):,} rows, {len(index.vocabulary):,} terms, {index.vectors.nnz:,} non-zeros\n")
+
+        rng = random.Random(1)
+        queries = [f"{rng.choice(WORDS)} {rng.choice(WORDS)}" for _ in range(args.repeat)]
+        keys = rng.sample(index.keys, args.repeat)
+
+        def cycle(items, function):
+            remaining = iter(items * 2)
+            return lambda: function(next(remaining))
+
+        def ilike(query):
+            return BakeryReview.query.filter(BakeryReview.review.ilike(f'%{query}%')).limit(20).all()
+
+        report('ILIKE scan, bakery reviews (before)', timed(cycle(queries, ilike), max(args.repeat // 10, 1)))
+        report('TF-IDF search, top 20', timed(cycle(queries, lambda q: index.search(q, 20)), args.repeat))
+        report('TF-IDF search, top 20 product reviews',
+               timed(cycle(queries, lambda q: index.search(q, 20, lambda key: key[0] == 'product')), args.repeat))
+        report('similar reviews, top 10', timed(cycle(keys, lambda key: index.similar(key, 10)), args.repeat))
+        report('search with loaded reviews, top 20',
+               timed(cycle(queries, lambda q: review_vectors.search_reviews(q, 20)), args.repeat))
+
+        added = iter(range(10_000_000, 10_000_000 + args.repeat))
+
+        def add_then_search(query):
+            index.add(('bakery', next(added)), query)
+            return index.search(query, 20)
+
+        report('add a review, then search', timed(cycle(queries, add_then_search), args.repeat))
+        db.session.expunge_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Concurrent reads and writes under each SQLite profile.
+
+    python -m backend.benchmarks.sqlite_profile [--readers 4] [--writers 2] [--seconds 5]
+
+For every profile in ``backend.utils.sqlite_profile.PROFILES``, a fresh
+database file is seeded and then hit by reader processes (a bakery's
+reviews, the way ``/bakeryreviews/bakery/<id>`` loads them) and writer
+processes (one review per transaction, like review submissions), each with
+its own app as gunicorn workers would have. Reports throughput, read
+latency and lock errors per profile.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from backend.benchmarks.common import make_app
+
+BAKERIES = 500
+
+
+def seed(database, profile):
+    """Create the schema with some bakeries and reviews"""
+    from sqlalchemy import text
+
+    app = make_app(f"sqlite:///{database}", SQLITE_PROFILE=profile)
+    with app.app_context():
+        from backend.extensions import db
+
+        db.create_all()
+        db.session.execute(text(
+            "INSERT INTO bakery (id, name, zip_code, street_name, street_number) VALUES (:id, :name, '2200', 'Gade', '1')"
+        ), [{'id': i, 'name': f'Bageri {i}'} for i in range(1, BAKERIES + 1)])
+        rng = random.Random(42)
+        db.session.execute(text(
+            "INSERT INTO bakery_review (review, overall_rating, bakery_id, created_at) "
+            "VALUES ('Godt brød', :rating, :bakery, CURRENT_TIMESTAMP)"
+        ), [{'rating': rng.randint(1, 10), 'bakery': rng.randint(1, BAKERIES)} for _ in range(BAKERIES * 20)])
+        db.session.commit()
+
+
+def worker(role, database, profile, ready, seconds, results):
+    """Read or write until the time is up; report (role, operations, errors, latencies in ms)"""
+    app = make_app(f"sqlite:///{database}", SQLITE_PROFILE=profile)
+    with app.app_context():
+        from backend.extensions import db
+        from backend.services.review_service import ReviewService
+
+        service = ReviewService()
+        rng = random.Random(os.getpid())
+        operations, errors, latencies = 0, 0, []
+        ready.wait()  # start together once every worker has its app
+        deadline = time.time() + seconds
+        while time.time() < deadline:
+            bakery_id = rng.randint(1, BAKERIES)
+            started = time.perf_counter()
+            try:
+                if role == 'reader':
+                    service.get_bakery_reviews_by_bakery(bakery_id)
+                    db.session.rollback()  # end the read transaction, like the end of a request
+                else:
+                    service.create_bakery_review('Sprød skorpe', rng.randint(1, 10), None, None, None, None,
+                                                 None, bakery_id)
+                operations += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+            except Exception:
+                db.session.rollback()
+                errors += 1
+            db.session.expunge_all()
+        results.put((role, operations, errors, latencies))
+
+
+def run(profile, readers, writers, seconds):
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, 'bench.db')
+        seed(database, profile)
+
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        roles = ['reader'] * readers + ['writer'] * writers
+        ready = context.Barrier(len(roles) + 1)
+        processes = [context.Process(target=worker, args=(role, database, profile, ready, seconds, results))
+                     for role in roles]
+        for process in processes:
+            process.start()
+        ready.wait()
+        reports = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    print(f"\n  profile '{profile}'")
+    for role in ('reader', 'writer'):
+        mine = [r for r in reports if r[0] == role]
+        operations = sum(r[1] for r in mine)
+        errors = sum(r[2] for r in mine)
+        latencies = sorted(latency for r in mine for latency in r[3])
+        if not latencies:
+            print(f"    {role}s: no completed operations, {errors} errors")
+            continue
+        p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)]
+        print(f"    {role}s: {operations / seconds:9.1f} ops/s   median {statistics.median(latencies):7.2f} ms"
+              f"   p99 {p99:8.2f} ms   errors {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--profiles', default='default,performance')
+    args = parser.parse_args()
+
+    print(f"{args.readers} reader and {args.writers} writer processes, {args.seconds:g} s per profile")
+    for profile in args.profiles.split(','):
+        run(profile, args.readers, args.writers, args.seconds)
+
+
+if __name__ == '__main__':
+    main()
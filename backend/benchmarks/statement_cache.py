@@ -0,0 +1,123 @@
+"""
+Per-call overhead of the hot service reads: queries built per call against
+statements built once.
+
+    python -m backend.benchmarks.statement_cache [--calls 3000]
+
+A small database is seeded so that the time goes to statement construction
+and SQLAlchemy's per-execution work rather than to SQLite. Each hot read is
+timed the way it was written before (``Model.query.filter_by(...)
+.order_by(...)`` on every call) and through the service method, which
+executes a statement built once with bound parameters. Reports microseconds
+per call and the compiled cache outcomes of each run.
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+from backend.benchmarks.common import make_app
+
+BAKERIES = 20
+BATCHES = 7
+
+
+def seed(database):
+    """Create the schema with a few users, bakeries, products and reviews"""
+    from sqlalchemy import text
+
+    app = make_app(f"sqlite:///{database}")
+    with app.app_context():
+        from backend.extensions import db
+
+        db.create_all()
+        db.session.execute(text(
+            "INSERT INTO user (id, username, email, password_hash, is_admin) VALUES (:id, :name, :email, 'x', 0)"
+        ), [{'id': i, 'name': f'user{i}', 'email': f'user{i}@example.com'} for i in range(1, BAKERIES + 1)])
+        db.session.execute(text(
+            "INSERT INTO bakery (id, name, name_sort_key, zip_code, street_name, street_number) "
+            "VALUES (:id, :name, :name, '2200', 'Gade', '1')"
+        ), [{'id': i, 'name': f'Bageri {i}'} for i in range(1, BAKERIES + 1)])
+        db.session.execute(text(
+            "INSERT INTO product (id, name, name_sort_key, bakery_id) VALUES (:id, :name, :name, :id)"
+        ), [{'id': i, 'name': f'Brød {i}'} for i in range(1, BAKERIES + 1)])
+        db.session.execute(text(
+            "INSERT INTO bakery_review (review, overall_rating, user_id, bakery_id, created_at) "
+            "VALUES ('God', 8, :id, :id, datetime('now'))"
+        ), [{'id': i} for i in range(1, BAKERIES + 1)])
+        db.session.execute(text(
+            "INSERT INTO product_review (review, overall_rating, taste_rating, price_rating, presentation_rating, "
+            "user_id, product_id, created_at) VALUES ('God', 8, 8, 8, 8, :id, :id, datetime('now'))"
+        ), [{'id': i} for i in range(1, BAKERIES + 1)])
+        db.session.commit()
+
+
+def cases():
+    """(name, before, after): callables taking an id"""
+    from backend.models import Bakery, BakeryReview, Product, ProductReview
+    from backend.services.bakery_service import BakeryService
+    from backend.services.product_service import ProductService
+    from backend.services.review_service import ReviewService
+
+    bakeries, products, reviews = BakeryService(), ProductService(), ReviewService()
+    return [
+        ('bakery reviews by bakery',
+         lambda i: BakeryReview.query.filter_by(bakery_id=i).order_by(BakeryReview.created_at.desc()).all(),
+         reviews.get_bakery_reviews_by_bakery),
+        ('bakery reviews by user',
+         lambda i: BakeryReview.query.filter_by(user_id=i).order_by(BakeryReview.created_at.desc()).all(),
+         reviews.get_bakery_reviews_by_user),
+        ('product reviews by product',
+         lambda i: ProductReview.query.filter_by(product_id=i).order_by(ProductReview.created_at.desc()).all(),
+         reviews.get_product_reviews_by_product),
+        ('products by bakery',
+         lambda i: Product.query.filter_by(bakery_id=i).order_by(Product.name_sort_key).all(),
+         products.get_products_by_bakery),
+        ('bakeries by zip',
+         lambda i: Bakery.query.filter_by(zip_code='2200').order_by(Bakery.name_sort_key).all(),
+         lambda i: bakeries.get_bakeries_by_zip('2200')),
+    ]
+
+
+def per_call(function, calls):
+    """Median microseconds per call over a few batches"""
+    batches = []
+    for _ in range(BATCHES):
+        started = time.perf_counter()
+        for n in range(calls // BATCHES):
+            function(n % BAKERIES + 1)
+        batches.append((time.perf_counter() - started) / (calls // BATCHES) * 1e6)
+    return statistics.median(batches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=3000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = f'{directory}/bakery.db'
+        seed(database)
+        app = make_app(f"sqlite:///{database}")
+        with app.app_context():
+            from backend.utils.query_stats import compile_cache_stats
+
+            print(f"{args.calls} calls each; microseconds per call (compiled cache hits/misses)")
+            for name, before, after in cases():
+                timings = []
+                for function in (before, after):
+                    function(1)  # compile once
+                    start = compile_cache_stats()
+                    timings.append(per_call(function, args.calls))
+                    end = compile_cache_stats()
+                    timings.append((end['hit'] - start['hit'], end['miss'] - start['miss']))
+                before_us, before_cache, after_us, after_cache = timings
+                print(f"  {name:<28} before {before_us:7.1f} us ({before_cache[0]}/{before_cache[1]})   "
+                      f"after {after_us:7.1f} us ({after_cache[0]}/{after_cache[1]})   "
+                      f"{(1 - after_us / before_us) * 100:5.1f}% less")
+            stats = compile_cache_stats()
+            print(f"compiled cache hit ratio over the run: {stats['hit_ratio']}")
+
+
+if __name__ == '__main__':
+    main()
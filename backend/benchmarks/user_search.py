@@ -0,0 +1,101 @@
+"""
+User search against a synthetic user table.
+
+    python -m backend.benchmarks.user_search [--users 1000000] [--db /tmp/user_search.db]
+
+Compares the old ``ILIKE '%term%'`` scan with prefix search over the indexed
+lowercase columns and substring search over the trigram index. The
+database is built on first run and reused afterwards.
+"""
+import argparse
+import os
+import random
+import string
+import time
+
+from backend.benchmarks.common import make_app, report, timed
+
+TERMS = ('a', 'ma', 'mar', 'marti', 'jens.h', 'zz', 'gmail', 'sen9')
+
+FIRST_NAMES = ('anna', 'mads', 'maria', 'martin', 'jens', 'sofie', 'lars', 'ida', 'mette', 'peter', 'karen', 'emil')
+LAST_NAMES = ('hansen', 'jensen', 'nielsen', 'pedersen', 'andersen', 'larsen', 'sorensen', 'rasmussen')
+DOMAINS = ('gmail.com', 'hotmail.com', 'outlook.dk', 'mail.dk', 'live.dk')
+
+
+def _users(count, seed=42):
+    rng = random.Random(seed)
+    for i in range(1, count + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        suffix = ''.join(rng.choices(string.ascii_lowercase + string.digits, k=4))
+        username = f"{first.capitalize()}{last[:3]}{i}"[:24]
+        email = f"{first}.{last}{suffix}{i}@{rng.choice(DOMAINS)}"[:50]
+        yield i, username, email, username.lower(), email.lower(), 'x', 1, False
+
+
+def build(db, count):
+    """Create the schema and bulk load ``count`` users, bypassing the ORM"""
+    from sqlalchemy import text
+
+    db.create_all()
+    connection = db.session.connection()
+    rows = _users(count)
+    started = time.perf_counter()
+    while True:
+        batch = [dict(zip(('id', 'username', 'email', 'username_lower', 'email_lower',
+                           'password_hash', 'profile_picture', 'is_admin'), row))
+                 for _, row in zip(range(50_000), rows)]
+        if not batch:
+            break
+        connection.execute(text(
+            'INSERT INTO "user" (id, username, email, username_lower, email_lower, password_hash, '
+            'profile_picture, is_admin) VALUES (:id, :username, :email, :username_lower, :email_lower, '
+            ':password_hash, :profile_picture, :is_admin)'
+        ), batch)
+    connection.execute(text('INSERT INTO user_trigram (rowid, username, email) '
+                            'SELECT id, username_lower, email_lower FROM "user"'))
+    connection.execute(text('ANALYZE'))
+    db.session.commit()
+    print(f"Loaded {count:,} users in {time.perf_counter() - started:.1f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--db', default='/tmp/bakery_user_search.db')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    fresh = not os.path.exists(args.db)
+    app = make_app(f"sqlite:///{args.db}")
+    with app.app_context():
+        from sqlalchemy import func, select
+        from backend.extensions import db
+        from backend.models import User
+        from backend.services.user_service import UserService
+
+        if fresh:
+            build(db, args.users)
+        print(f"{db.session.scalar(select(func.count(User.id))):,} users in {args.db}\n")
+
+        service = UserService()
+
+        def legacy(term):
+            pattern = f"%{term}%"
+            return User.query.filter(User.username.ilike(pattern) | User.email.ilike(pattern)) \
+                .order_by(User.username).all()
+
+        for term in TERMS:
+            print(f"q={term!r}")
+            report('ILIKE scan, unpaginated (before)', timed(lambda: legacy(term), max(args.repeat // 10, 1)))
+            report('prefix, first page of 20', timed(lambda: service.search_users(term), args.repeat))
+            _, cursor = service.search_users(term)
+            if cursor:
+                report('prefix, second page of 20',
+                       timed(lambda: service.search_users(term, cursor=cursor), args.repeat))
+            report('substring (trigram), first page of 20',
+                   timed(lambda: service.search_users(term, mode='substring'), args.repeat))
+            db.session.expunge_all()
+
+
+if __name__ == '__main__':
+    main()
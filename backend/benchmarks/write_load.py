@@ -0,0 +1,137 @@
+"""
+Peak write load against SQLite, with and without the write coordinator.
+
+    python -m backend.benchmarks.write_load [--writers 8] [--readers 2] [--seconds 5]
+
+A fresh WAL database is seeded and then hit by writer processes submitting
+reviews back to back through ``ReviewService`` (each with its own app, as
+gunicorn workers would have) while reader processes keep loading a bakery's
+reviews. With ``busy_timeout`` lowered to make contention visible, reports
+write throughput, latency, retries and lock errors with the coordinator off
+and on. With it on, lock errors should be 0.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from backend.benchmarks.common import make_app
+
+BAKERIES = 200
+
+
+def settings(coordinator, busy_timeout):
+    return {
+        'SQLITE_PROFILE': 'performance',
+        'SQLITE_PRAGMAS': f'busy_timeout={busy_timeout}',
+        'SQLITE_WRITE_COORDINATOR': coordinator,
+    }
+
+
+def seed(database):
+    """Create the schema with some bakeries"""
+    from sqlalchemy import text
+
+    app = make_app(f"sqlite:///{database}", SQLITE_PROFILE='performance')
+    with app.app_context():
+        from backend.extensions import db
+
+        db.create_all()
+        db.session.execute(text(
+            "INSERT INTO bakery (id, name, zip_code, street_name, street_number) VALUES (:id, :name, '2200', 'Gade', '1')"
+        ), [{'id': i, 'name': f'Bageri {i}'} for i in range(1, BAKERIES + 1)])
+        db.session.commit()
+
+
+def worker(role, database, config, ready, seconds, results):
+    """Read or write until the time is up; report (role, operations, lock errors, latencies in ms, retries)"""
+    app = make_app(f"sqlite:///{database}", **config)
+    with app.app_context():
+        from backend.extensions import db
+        from backend.services.review_service import ReviewService
+        from backend.utils.write_coordinator import DatabaseBusy, is_lock_error, write_stats
+
+        service = ReviewService()
+        rng = random.Random(os.getpid())
+        operations, errors, latencies = 0, 0, []
+        ready.wait()
+        deadline = time.time() + seconds
+        while time.time() < deadline:
+            bakery_id = rng.randint(1, BAKERIES)
+            started = time.perf_counter()
+            try:
+                if role == 'reader':
+                    service.get_bakery_reviews_by_bakery(bakery_id)
+                    db.session.rollback()
+                else:
+                    service.create_bakery_review('Sprød skorpe', rng.randint(1, 10), None, None, None, None,
+                                                 None, bakery_id)
+                operations += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+            except DatabaseBusy:
+                db.session.rollback()
+                errors += 1
+            except Exception as e:
+                db.session.rollback()
+                if not is_lock_error(e):
+                    raise
+                errors += 1
+            db.session.expunge_all()
+        results.put((role, operations, errors, latencies, write_stats()['retries']))
+
+
+def run(coordinator, readers, writers, seconds, busy_timeout):
+    with tempfile.TemporaryDirectory() as directory:
+        database = os.path.join(directory, 'bench.db')
+        seed(database)
+
+        config = settings(coordinator, busy_timeout)
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        roles = ['reader'] * readers + ['writer'] * writers
+        ready = context.Barrier(len(roles) + 1)
+        processes = [context.Process(target=worker, args=(role, database, config, ready, seconds, results))
+                     for role in roles]
+        for process in processes:
+            process.start()
+        ready.wait()
+        reports = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    print(f"\n  coordinator {'on' if coordinator else 'off'}")
+    for role in ('reader', 'writer'):
+        mine = [r for r in reports if r[0] == role]
+        if not mine:
+            continue
+        operations = sum(r[1] for r in mine)
+        errors = sum(r[2] for r in mine)
+        retries = sum(r[4] for r in mine)
+        latencies = sorted(latency for r in mine for latency in r[3])
+        if not latencies:
+            print(f"    {role}s: no completed operations, {errors} lock errors")
+            continue
+        p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)]
+        print(f"    {role}s: {operations / seconds:9.1f} ops/s   median {statistics.median(latencies):7.2f} ms"
+              f"   p99 {p99:8.2f} ms   lock errors {errors}" + (f"   retries {retries}" if role == 'writer' else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--readers', type=int, default=2)
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--busy-timeout', type=int, default=50, help='ms')
+    args = parser.parse_args()
+
+    print(f"{args.readers} reader and {args.writers} writer processes, {args.seconds:g} s each, "
+          f"busy_timeout {args.busy_timeout} ms")
+    for coordinator in (False, True):
+        run(coordinator, args.readers, args.writers, args.seconds, args.busy_timeout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+from functools import wraps
+from flask import Blueprint, request, jsonify, current_app as app, Response
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+
+from backend.services.user_service import UserService, UserNotFound
+from backend.utils.caching import get_cache_stats
+from backend.utils.metrics import render_metrics
+from backend.utils.slow_queries import get_slow_queries
+
+# Create blueprint
+admin_bp = Blueprint('admin', __name__)
+
+# Initialize service
+user_service = UserService()
+
+
+def admin_required(fn):
+    """Allow the request only for an authenticated admin user"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        verify_jwt_in_request()
+        try:
+            user = user_service.get_user_by_id(int(get_jwt_identity()))
+        except (UserNotFound, ValueError, TypeError):
+            return jsonify({"message": "User not found"}), 404
+        if not user.is_admin:
+            return jsonify({"message": "Admin privileges required"}), 403
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def metrics_auth_required(fn):
+    """Allow admins, or a scraper presenting the configured METRICS_TOKEN"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = app.config.get('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') == f'Bearer {token}':
+            return fn(*args, **kwargs)
+        return admin_required(fn)(*args, **kwargs)
+    return wrapper
+
+
+@admin_bp.route('/cache/stats', methods=['GET'])
+@admin_required
+def get_cache_stats_view():
+    """Cache hit/miss/eviction statistics per key prefix"""
+    return jsonify(get_cache_stats()), 200
+
+
+@admin_bp.route('/cache/stats/reset', methods=['POST'])
+@admin_required
+def reset_cache_stats():
+    """Reset the cache statistics"""
+    stats = app.extensions.get('cache_stats')
+    if stats:
+        stats.reset()
+    return jsonify({"message": "Cache statistics reset"}), 200
+
+
+@admin_bp.route('/metrics', methods=['GET'])
+@metrics_auth_required
+def get_metrics():
+    """Metrics in Prometheus text format"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+
+@admin_bp.route('/slow-queries', methods=['GET'])
+@admin_required
+def get_slow_queries_view():
+    """Slow query log entries, newest first; filter with ?endpoint= and ?min_ms="""
+    try:
+        limit = min(int(request.args.get('limit', 50)), 500)
+        min_ms = request.args.get('min_ms', type=float)
+    except ValueError:
+        return jsonify({"message": "limit must be an integer"}), 400
+    queries = get_slow_queries(limit, request.args.get('endpoint'), min_ms)
+    return jsonify({
+        "threshold_ms": app.config.get('SLOW_QUERY_THRESHOLD_MS'),
+        "count": len(queries),
+        "queries": queries,
+    }), 200
@@ -0,0 +1,64 @@
+"""
+Async variants of read views.
+
+With ``ASYNC_VIEWS`` on and an async engine available,
+``register_async_views`` swaps these in for the sync views of the same
+endpoints, so URLs and responses stay the same. They fit endpoints that fan
+out to several independent queries, which then run concurrently.
+
+The async engine reads from the replica, so requests asking for a strong
+read (``X-Read-Consistency: strong``) are still served by the sync view.
+"""
+from functools import wraps
+
+from flask import current_app, jsonify
+
+from backend.services.async_bakery_service import AsyncBakeryService, BakeryNotFound
+from backend.utils.async_db import get_async_engine
+from backend.utils.db_routing import strong_consistency_requested
+
+async_bakery_service = AsyncBakeryService()
+
+
+async def get_bakery_profile(bakery_id):
+    """Bakery stats, products and latest reviews in one response"""
+    profile = await async_bakery_service.get_bakery_profile(bakery_id)
+    if profile is None:
+        return jsonify({"message": "Bakery not found"}), 404
+    return jsonify(profile), 200
+
+
+async def get_bakery_stats(bakery_id):
+    """Get statistics for a bakery including review averages"""
+    try:
+        stats = await async_bakery_service.get_bakery_stats(bakery_id)
+    except BakeryNotFound as e:
+        return jsonify({"message": str(e)}), 404
+    return jsonify(stats), 200
+
+
+# Endpoint -> async variant
+ASYNC_VARIANTS = {
+    'bakery.get_bakery_profile': get_bakery_profile,
+    'bakery.get_bakery_stats': get_bakery_stats,
+}
+
+
+def register_async_views(app):
+    """Replace the sync views that have an async variant; call after the blueprints are registered"""
+    with app.app_context():
+        if not app.config.get('ASYNC_VIEWS') or get_async_engine() is None:
+            return []
+    for endpoint, view in ASYNC_VARIANTS.items():
+        app.view_functions[endpoint] = _with_sync_fallback(view, app.view_functions[endpoint])
+    return list(ASYNC_VARIANTS)
+
+
+def _with_sync_fallback(async_view, sync_view):
+    """Dispatch to the async variant, or to the sync view for strong reads"""
+    @wraps(async_view)
+    def view(*args, **kwargs):
+        if strong_consistency_requested():
+            return sync_view(*args, **kwargs)
+        return current_app.ensure_sync(async_view)(*args, **kwargs)
+    return view
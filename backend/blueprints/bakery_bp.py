@@ -1,9 +1,13 @@
 from flask import Blueprint, request, jsonify, current_app as app, make_response
 from backend.extensions import db
 from backend.schemas.bakery_schema import BakerySchema
-from backend.services.bakery_service import BakeryService
+from backend.services.bakery_service import BakeryService, NEARBY_MAX_RADIUS_KM
 from backend.services.product_service import ProductService
 from backend.schemas.product_schema import ProductSchema
+from backend.utils.warmup import register_hot_key
+from backend.utils.conditional import conditional
+from backend.utils.edge_cache import cache_policy
+from backend.utils.write_coordinator import DatabaseBusy, busy_response
 
 # Create blueprint
 bakery_bp = Blueprint('bakery', __name__)
@@ -11,12 +15,23 @@ bakery_bp = Blueprint('bakery', __name__)
 # Initialize schemas
 bakery_schema = BakerySchema()
 bakeries_schema = BakerySchema(many=True)
+nearby_schema = BakerySchema(many=True, exclude=('products', 'bakery_reviews'))
 
 # Initialize service
 bakery_service = BakeryService()
 
+# Tables a serialized bakery is built from: it lists its review ids and its
+# products' review ids
+BAKERY_TABLES = ('bakery', 'bakery_review', 'product', 'product_review', 'category', 'subcategory')
+
+# Hot endpoints primed on startup
+register_hot_key('bakeries', '/bakeries')
+register_hot_key('top_bakeries', '/bakeries/top?limit=4&includeStats=true')
+
 
 @bakery_bp.route('/', methods=['GET'])
+@cache_policy(s_maxage=300, stale_while_revalidate=30, collections=('bakery',))
+@conditional(*BAKERY_TABLES)
 def get_bakeries():
     """Get all bakeries"""
     try:
@@ -30,20 +45,16 @@ def get_bakeries():
 
 
 @bakery_bp.route('/top', methods=['GET'])
+@cache_policy(s_maxage=300, stale_while_revalidate=30, collections=('bakery', 'bakery_review'))
+@conditional(*BAKERY_TABLES)
 def get_top_bakeries():
     """Get top rated bakeries"""
     try:
         limit = request.args.get('limit', default=4, type=int)
 
-        # Get all bakeries first
+        # All bakeries, with the same rating stats as the profile page
         bakeries = bakery_service.get_all_bakeries()
 
-        # For each bakery, get its stats (using the same logic as the profile page)
-        for bakery in bakeries:
-            stats = bakery_service.get_bakery_stats(bakery.id)
-            bakery.average_rating = stats.get('average_rating', 0)
-            bakery.review_count = stats.get('review_count', 0)
-
         # Sort by average rating (highest first)
         sorted_bakeries = sorted(
             bakeries,
@@ -60,7 +71,39 @@ def get_top_bakeries():
         return jsonify({"message": str(e), "bakeries": []}), 500
 
 
+@bakery_bp.route('/nearby', methods=['GET'])
+@cache_policy(s_maxage=300, stale_while_revalidate=30, collections=('bakery', 'bakery_review'))
+def get_nearby_bakeries():
+    """Bakeries around ?lat=&lng=, nearest first (optionally within ?radius= km, weighted by ?ratingWeight=)"""
+    lat = request.args.get('lat', type=float)
+    lng = request.args.get('lng', type=float)
+    if lat is None or lng is None or not -90 <= lat <= 90 or not -180 <= lng <= 180:
+        return jsonify({"message": "lat and lng must be valid coordinates"}), 400
+
+    radius = request.args.get('radius', type=float)
+    if radius is not None and not 0 < radius <= NEARBY_MAX_RADIUS_KM:
+        return jsonify({"message": f"radius must be between 0 and {NEARBY_MAX_RADIUS_KM:g} km"}), 400
+    rating_weight = request.args.get('ratingWeight', default=0.0, type=float)
+    if not 0 <= rating_weight <= 10:
+        return jsonify({"message": "ratingWeight must be between 0 and 10"}), 400
+    limit = min(max(request.args.get('limit', default=20, type=int), 1), 100)
+
+    try:
+        nearby = bakery_service.get_nearby_bakeries(lat, lng, radius, limit, rating_weight)
+    except Exception as e:
+        app.logger.error(f"Error finding nearby bakeries: {str(e)}")
+        return jsonify({"message": str(e), "bakeries": []}), 500
+
+    results = nearby_schema.dump([bakery for bakery, _, _ in nearby])
+    for result, (_, distance, rating) in zip(results, nearby):
+        result['distanceKm'] = round(distance, 3)
+        result['averageRating'] = round(rating, 2)
+    return jsonify({"bakeries": results})
+
+
 @bakery_bp.route('/<int:bakery_id>', methods=['GET'])
+@cache_policy(s_maxage=300, stale_while_revalidate=30)
+@conditional(*BAKERY_TABLES)
 def get_bakery(bakery_id):
     """Get a specific bakery by ID"""
     bakery = bakery_service.get_bakery_by_id(bakery_id)
@@ -117,6 +160,8 @@ def create_bakery():
             "bakery": bakery_schema.dump(new_bakery)
         }), 201
 
+    except DatabaseBusy as e:
+        return busy_response(e)
     except Exception as e:
         db.session.rollback()
         app.logger.error(f"Error creating bakery: {str(e)}")
@@ -160,6 +205,8 @@ def update_bakery(bakery_id):
             "bakery": bakery_schema.dump(updated_bakery)
         }), 200
 
+    except DatabaseBusy as e:
+        return busy_response(e)
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": f"Error updating bakery: {str(e)}"}), 400
@@ -177,6 +224,8 @@ def delete_bakery(bakery_id):
 
         return jsonify({"message": "Bakery deleted successfully"}), 200
 
+    except DatabaseBusy as e:
+        return busy_response(e)
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": f"Error deleting bakery: {str(e)}"}), 400
@@ -260,6 +309,15 @@ def get_bakery_stats(bakery_id):
         return jsonify({"message": str(e)}), 404
 
 
+@bakery_bp.route('/<int:bakery_id>/profile', methods=['GET'])
+def get_bakery_profile(bakery_id):
+    """Bakery stats, products and latest reviews in one response"""
+    profile = bakery_service.get_bakery_profile(bakery_id)
+    if profile is None:
+        return jsonify({"message": "Bakery not found"}), 404
+    return jsonify(profile), 200
+
+
 @bakery_bp.route('/<int:bakery_id>/products', methods=['GET'])
 def get_bakery_products(bakery_id):
     """Get all products for a specific bakery"""
@@ -2,7 +2,11 @@ from flask import Blueprint, request, jsonify
 from backend.models import Category, Subcategory
 from backend.schemas import CategorySchema, SubcategorySchema
 from backend.services.category_service import CategoryService, SubcategoryService
-from backend.utils.caching import cache
+from backend.services.category_tree import get_category_tree
+from backend.utils.warmup import register_hot_key
+from backend.utils.conditional import conditional
+from backend.utils.edge_cache import cache_policy
+from backend.utils.write_coordinator import DatabaseBusy, busy_response
 
 # Create blueprint
 category_bp = Blueprint('category', __name__)
@@ -17,23 +21,31 @@ subcategories_schema = SubcategorySchema(many=True)
 category_service = CategoryService()
 subcategory_service = SubcategoryService()
 
+# Tables the category tree is built from
+CATEGORY_TABLES = ('category', 'subcategory', 'product')
+
+# Hot endpoints primed on startup
+register_hot_key('categories', '/categories')
+register_hot_key('subcategories', '/categories/subcategories')
+
 # === Category Routes ===
 
 @category_bp.route('/', methods=['GET'])
-@cache.cached(timeout=60)  # Cache for 60 seconds
+@cache_policy(s_maxage=3600, stale_while_revalidate=60, collections=CATEGORY_TABLES)
+@conditional(*CATEGORY_TABLES)
 def get_categories():
     """Get all categories"""
-    categories = category_service.get_all_categories()
-    return jsonify({"categories": categories_schema.dump(categories)})
+    return jsonify({"categories": get_category_tree().all_categories()})
 
 @category_bp.route('/<int:category_id>', methods=['GET'])
-@cache.cached(timeout=60)  # Cache for 60 seconds
+@cache_policy(s_maxage=3600, stale_while_revalidate=60, collections=CATEGORY_TABLES)
+@conditional(*CATEGORY_TABLES)
 def get_category(category_id):
     """Get a specific category by ID"""
-    category = category_service.get_category_by_id(category_id)
+    category = get_category_tree().get_category(category_id)
     if not category:
         return jsonify({"message": "Category not found"}), 404
-    return jsonify(category_schema.dump(category))
+    return jsonify(category)
 
 @category_bp.route('/create', methods=['POST'])
 def create_category():
@@ -48,13 +60,12 @@ def create_category():
         # Create category
         category = category_service.create_category(name=data['name'])
         
-        # Invalidate cache
-        cache.delete_memoized(get_categories)
-        
         return jsonify({
             "message": "Category created successfully!",
             "category": category_schema.dump(category)
         }), 201
+    except DatabaseBusy as e:
+        return busy_response(e)
     except Exception as e:
         return jsonify({"message": str(e)}), 400
 
@@ -78,15 +89,12 @@ def update_category(category_id):
             name=data['name']
         )
         
-        # Invalidate cache
-        cache.delete_memoized(get_categories)
-        
-        
-        
         return jsonify({
             "message": "Category updated successfully",
             "category": category_schema.dump(updated_category)
         }), 200
+    except DatabaseBusy as e:
+        return busy_response(e)
     except Exception as e:
         return jsonify({"message": str(e)}), 400
 
@@ -101,42 +109,40 @@ def delete_category(category_id):
         # Delete category
         category_service.delete_category(category_id)
         
-        # Invalidate cache
-        cache.delete_memoized(get_categories)
-        
-        
         return jsonify({"message": "Category deleted successfully"}), 200
+    except DatabaseBusy as e:
+        return busy_response(e)
     except Exception as e:
         return jsonify({"message": str(e)}), 400
 
 # === Subcategory Routes ===
 
 @category_bp.route('/subcategories', methods=['GET'])
-@cache.cached(timeout=60)  # Cache for 60 seconds
+@cache_policy(s_maxage=3600, stale_while_revalidate=60, collections=CATEGORY_TABLES)
+@conditional(*CATEGORY_TABLES)
 def get_subcategories():
     """Get all subcategories"""
-    subcategories = subcategory_service.get_all_subcategories()
-    return jsonify({"subcategories": subcategories_schema.dump(subcategories)})
+    return jsonify({"subcategories": get_category_tree().all_subcategories()})
 
 @category_bp.route('/<int:category_id>/subcategories', methods=['GET'])
-@cache.cached(timeout=60)  # Cache for 60 seconds
+@cache_policy(s_maxage=3600, stale_while_revalidate=60, collections=CATEGORY_TABLES)
+@conditional(*CATEGORY_TABLES)
 def get_subcategories_by_category(category_id):
     """Get all subcategories for a specific category"""
-    category = category_service.get_category_by_id(category_id)
-    if not category:
+    subcategories = get_category_tree().subcategories_of(category_id)
+    if subcategories is None:
         return jsonify({"message": "Category not found"}), 404
-        
-    subcategories = subcategory_service.get_subcategories_by_category(category_id)
-    return jsonify({"subcategories": subcategories_schema.dump(subcategories)})
+    return jsonify({"subcategories": subcategories})
 
 @category_bp.route('/subcategories/<int:subcategory_id>', methods=['GET'])
-@cache.cached(timeout=60)  # Cache for 60 seconds
+@cache_policy(s_maxage=3600, stale_while_revalidate=60, collections=CATEGORY_TABLES)
+@conditional(*CATEGORY_TABLES)
 def get_subcategory(subcategory_id):
     """Get a specific subcategory by ID"""
-    subcategory = subcategory_service.get_subcategory_by_id(subcategory_id)
+    subcategory = get_category_tree().get_subcategory(subcategory_id)
     if not subcategory:
         return jsonify({"message": "Subcategory not found"}), 404
-    return jsonify(subcategory_schema.dump(subcategory))
+    return jsonify(subcategory)
 
 @category_bp.route('/subcategories/create', methods=['POST'])
 def create_subcategory():
@@ -149,8 +155,7 @@ def create_subcategory():
             return jsonify({"message": "Name and categoryId are required"}), 400
         
         # Validate category exists
-        category = category_service.get_category_by_id(data['categoryId'])
-        if not category:
+        if not get_category_tree().has_category(data['categoryId']):
             return jsonify({"message": "Category not found"}), 404
         
         # Create subcategory
@@ -159,14 +164,12 @@ def create_subcategory():
             category_id=data['categoryId']
         )
         
-        # Invalidate cache
-        cache.delete_memoized(get_subcategories)
-        
-        
         return jsonify({
             "message": "Subcategory created successfully!",
             "subcategory": subcategory_schema.dump(subcategory)
         }), 201
+    except DatabaseBusy as e:
+        return busy_response(e)
     except Exception as e:
         return jsonify({"message": str(e)}), 400
 
@@ -187,8 +190,7 @@ def update_subcategory(subcategory_id):
         # Validate category exists if it's being updated
         category_id = data.get('categoryId')
         if category_id and category_id != subcategory.category_id:
-            category = category_service.get_category_by_id(category_id)
-            if not category:
+            if not get_category_tree().has_category(category_id):
                 return jsonify({"message": "Category not found"}), 404
         
         # Update subcategory
@@ -198,27 +200,12 @@ def update_subcategory(subcategory_id):
             category_id=data.get('categoryId')
         )
         
-        # Invalidate cache
-        try:
-            cache.delete_memoized(get_subcategories)
-        except Exception as e:
-            print(f"Cache invalidation error (non-critical): {str(e)}")
-
-        try:
-            cache.delete_memoized(get_subcategories_by_category, subcategory.category_id)
-        except Exception as e:
-            print(f"Cache invalidation error (non-critical): {str(e)}")
-
-        if category_id and category_id != subcategory.category_id:
-            try:
-                cache.delete_memoized(get_subcategories_by_category, category_id)
-            except Exception as e:
-                print(f"Cache invalidation error (non-critical): {str(e)}")
-
         return jsonify({
             "message": "Subcategory updated successfully",
             "subcategory": subcategory_schema.dump(updated_subcategory)
         }), 200
+    except DatabaseBusy as e:
+        return busy_response(e)
     except Exception as e:
         return jsonify({"message": str(e)}), 400
 
@@ -230,14 +217,11 @@ def delete_subcategory(subcategory_id):
         if not subcategory:
             return jsonify({"message": "Subcategory not found"}), 404
         
-        category_id = subcategory.category_id
-        
         # Delete subcategory
         subcategory_service.delete_subcategory(subcategory_id)
         
-        # Invalidate cache
-        cache.delete_memoized(get_subcategories)
-        
         return jsonify({"message": "Subcategory deleted successfully"}), 200
+    except DatabaseBusy as e:
+        return busy_response(e)
     except Exception as e:
         return jsonify({"message": str(e)}), 400
\ No newline at end of file
@@ -1,10 +1,15 @@
 from flask import Blueprint, request, jsonify
-from backend.models import Product, Bakery, Subcategory  # Adjusted model import path
+from backend.models import Product, Bakery  # Adjusted model import path
 from backend.schemas import ProductSchema  # Adjusted schema import path
 from backend.services.product_service import ProductService  # Adjusted service import path
 from flask import current_app as app
 from backend.utils.caching import cache  # Adjusted utils import path
-from backend.services.category_service import SubcategoryService 
+from backend.services.category_tree import get_category_tree
+from backend.utils.warmup import register_hot_key
+from backend.utils.conditional import conditional
+from backend.utils.edge_cache import cache_policy
+from backend.utils.entity_loader import load_entity
+from backend.utils.write_coordinator import DatabaseBusy, busy_response
 
 
 # Create blueprint
@@ -17,7 +22,20 @@ products_schema = ProductSchema(many=True)
 # Initialize service
 product_service = ProductService()
 
+# Tables a serialized product is built from, including the review ids it lists
+PRODUCT_TABLES = ('product', 'product_review', 'bakery', 'category', 'subcategory')
+
+
+def _subcategory_product_paths():
+    """Paths of every subcategory product list, for cache warmup"""
+    return [f'/products/subcategory/{subcategory_id}' for subcategory_id in get_category_tree().subcategories]
+
+# Hot endpoints primed on startup
+register_hot_key('subcategory_products', _subcategory_product_paths)
+
 @product_bp.route('/', methods=['GET'])
+@cache_policy(s_maxage=300, stale_while_revalidate=30, collections=('product',))
+@conditional(*PRODUCT_TABLES)
 def get_products():
     """Get all products with detailed information"""
     try:
@@ -36,6 +54,8 @@ def get_products():
         }), 500
 
 @product_bp.route('/<int:product_id>', methods=['GET'])
+@cache_policy(s_maxage=300, stale_while_revalidate=30)
+@conditional(*PRODUCT_TABLES)
 def get_product(product_id):
     """Get a specific product by ID"""
     product = product_service.get_product_by_id(product_id)
@@ -53,28 +73,31 @@ def get_product_stats(product_id):
         return jsonify({"message": str(e)}), 404
 
 @product_bp.route('/bakery/<int:bakery_id>', methods=['GET'])
+@cache_policy(s_maxage=300, stale_while_revalidate=30, collections=('product',))
+@conditional(*PRODUCT_TABLES)
 def get_products_by_bakery(bakery_id):
     """Get all products for a specific bakery"""
     products = product_service.get_products_by_bakery(bakery_id)
     return jsonify({"products": products_schema.dump(products)})
 
 @product_bp.route('/category/<category>', methods=['GET'])
+@cache_policy(s_maxage=300, stale_while_revalidate=30, collections=('product',))
+@conditional(*PRODUCT_TABLES)
 def get_products_by_category(category):
     """Get all products for a specific category"""
     products = product_service.get_products_by_category(category)
     return jsonify({"products": products_schema.dump(products)})
 
 @product_bp.route('/subcategory/<int:subcategory_id>', methods=['GET'])
+@cache_policy(s_maxage=300, stale_while_revalidate=30, collections=('product',))
+@conditional(*PRODUCT_TABLES)
 @cache.cached(timeout=60)
 def get_products_by_subcategory_id(subcategory_id):
     """Get all products for a specific subcategory by ID"""
-    subcategory_service = SubcategoryService()
-    
-    subcategory = subcategory_service.get_subcategory_by_id(subcategory_id)
-    if not subcategory:
+    if not get_category_tree().has_subcategory(subcategory_id):
         return jsonify({"message": "Subcategory not found"}), 404
 
-    products = Product.query.filter_by(subcategory_id=subcategory_id).order_by(Product.name).all()
+    products = Product.query.filter_by(subcategory_id=subcategory_id).order_by(Product.name_sort_key).all()
     return jsonify({"products": products_schema.dump(products)})
 
 @product_bp.route('/create', methods=['POST'])
@@ -85,7 +108,7 @@ def create_product():
         if not data.get('name') or not data.get('bakeryId'):
             return jsonify({"message": "Name and bakeryId are required"}), 400
 
-        bakery = Bakery.query.get(data['bakeryId'])
+        bakery = load_entity(Bakery, data['bakeryId'])
         if not bakery:
             return jsonify({"message": "Bakery not found"}), 404
 
@@ -95,8 +118,7 @@ def create_product():
             
         # If both category and subcategory are provided, check relationship
         if data.get('subcategoryId') and data.get('categoryId'):
-            subcategory = Subcategory.query.get(data['subcategoryId'])
-            if not subcategory or subcategory.category_id != data['categoryId']:
+            if not get_category_tree().subcategory_belongs_to(data['subcategoryId'], data['categoryId']):
                 return jsonify({"message": "Subcategory does not belong to the selected category"}), 400
 
         errors = product_schema.validate(data)
@@ -118,6 +140,8 @@ def create_product():
             cache.delete(f'view/get_products_by_category_{data["categoryId"]}')
 
         return jsonify({"message": "Product created!", "product": product_schema.dump(new_product)}), 201
+    except DatabaseBusy as e:
+        return busy_response(e)
     except Exception as e:
         return jsonify({"message": str(e)}), 400
 
@@ -137,7 +161,7 @@ def update_product(product_id):
         image_url = data.get('imageUrl', product.image_url)
 
         if bakery_id != product.bakery_id:
-            bakery = Bakery.query.get(bakery_id)
+            bakery = load_entity(Bakery, bakery_id)
             if not bakery:
                 return jsonify({"message": "Bakery not found"}), 404
 
@@ -164,6 +188,8 @@ def update_product(product_id):
             cache.delete(f'view/get_products_by_category_{category_id}')
 
         return jsonify({"message": "Product updated.", "product": product_schema.dump(updated_product)}), 200
+    except DatabaseBusy as e:
+        return busy_response(e)
     except Exception as e:
         return jsonify({"message": str(e)}), 400
 
@@ -185,6 +211,8 @@ def delete_product(product_id):
             cache.delete(f'view/get_products_by_category_{product.category_id}')
 
         return jsonify({"message": "Product deleted!"}), 200
+    except DatabaseBusy as e:
+        return busy_response(e)
     except Exception as e:
         return jsonify({"message": str(e)}), 400
 
@@ -4,6 +4,10 @@ from backend.models import BakeryReview, ProductReview, Bakery, Product, User  #
 from backend.schemas import BakeryReviewSchema, ProductReviewSchema  # Adjusted schema import path
 from backend.services.review_service import ReviewService  # Adjusted service import path
 from sqlalchemy.orm import joinedload
+from backend.utils.conditional import conditional
+from backend.utils.edge_cache import cache_policy
+from backend.utils.entity_loader import load_entity
+from backend.utils.write_coordinator import DatabaseBusy, busy_response
 
 # Create blueprints
 bakery_review_bp = Blueprint('bakeryreview', __name__)
@@ -18,9 +22,15 @@ product_reviews_schema = ProductReviewSchema(many=True)
 # Initialize service
 review_service = ReviewService()
 
+# Tables a serialized review list is built from
+BAKERY_REVIEW_TABLES = ('bakery_review', 'user', 'bakery')
+PRODUCT_REVIEW_TABLES = ('product_review', 'user', 'product')
+
 # === Bakery Review Routes ===
 
 @bakery_review_bp.route('/', methods=['GET'])
+@cache_policy(s_maxage=60, collections=('bakery_review',))
+@conditional(*BAKERY_REVIEW_TABLES)
 def get_bakery_reviews():
     """Get all bakery reviews with related user and bakery information"""
     try:
@@ -50,9 +60,11 @@ def get_bakery_reviews():
         }), 500
 
 @bakery_review_bp.route('/bakery/<int:bakery_id>', methods=['GET'])
+@cache_policy(s_maxage=60, collections=('bakery_review',))
+@conditional(*BAKERY_REVIEW_TABLES)
 def get_bakery_reviews_by_bakery(bakery_id):
     """Get all reviews for a specific bakery"""
-    bakery = Bakery.query.get(bakery_id)
+    bakery = load_entity(Bakery, bakery_id)
     if not bakery:
         return jsonify({"message": "Bakery not found"}), 404
     
@@ -60,15 +72,31 @@ def get_bakery_reviews_by_bakery(bakery_id):
     return jsonify({"bakeryReviews": bakery_reviews_schema.dump(reviews)})
 
 @bakery_review_bp.route('/user/<int:user_id>', methods=['GET'])
+@cache_policy(s_maxage=60, collections=('bakery_review',))
+@conditional(*BAKERY_REVIEW_TABLES)
 def get_bakery_reviews_by_user(user_id):
     """Get all bakery reviews by a specific user"""
-    user = User.query.get(user_id)
+    user = load_entity(User, user_id)
     if not user:
         return jsonify({"message": "User not found"}), 404
     
     reviews = review_service.get_bakery_reviews_by_user(user_id)
     return jsonify({"bakeryReviews": bakery_reviews_schema.dump(reviews)})
 
+@bakery_review_bp.route('/search', methods=['GET'])
+def search_bakery_reviews():
+    """Search bakery reviews by text"""
+    search_term = request.args.get('q', '')
+    if not search_term or len(search_term) < 2:
+        return jsonify({"message": "Search term must be at least 2 characters long", "bakeryReviews": []}), 400
+
+    limit = request.args.get('limit', default=50, type=int)
+    try:
+        reviews = review_service.search_bakery_reviews(search_term, limit=min(max(limit, 1), 200))
+        return jsonify({"bakeryReviews": bakery_reviews_schema.dump(reviews)}), 200
+    except Exception as e:
+        return jsonify({"message": f"Error searching bakery reviews: {str(e)}", "bakeryReviews": []}), 500
+
 @bakery_review_bp.route('/create', methods=['POST'])
 def create_bakery_review():
     """Create a new bakery review"""
@@ -83,13 +111,13 @@ def create_bakery_review():
                 return jsonify({"message": f"Missing required field: {field}"}), 400
         
         # Validate bakery exists
-        bakery = Bakery.query.get(data['bakeryId'])
+        bakery = load_entity(Bakery, data['bakeryId'])
         if not bakery:
             return jsonify({"message": "Bakery not found"}), 404
             
         # Validate user exists only if userId is provided (support anonymous reviews)
         if data.get('userId'):
-            user = User.query.get(data['userId'])
+            user = load_entity(User, data['userId'])
             if not user:
                 return jsonify({"message": "User not found"}), 404
         
@@ -153,6 +181,8 @@ def create_bakery_review():
         )
         
         return jsonify({"message": "Bakery review created!", "review": bakery_review_schema.dump(review)}), 201
+    except DatabaseBusy as e:
+        return busy_response(e)
     except Exception as e:
         return jsonify({"message": str(e)}), 400
 
@@ -161,7 +191,7 @@ def create_bakery_review():
 def update_bakery_review(review_id):
     """Update a bakery review"""
     try:
-        review = BakeryReview.query.get(review_id)
+        review = review_service.get_bakery_review_by_id(review_id)
         if not review:
             return jsonify({"message": "Bakery review not found"}), 404
         
@@ -179,13 +209,13 @@ def update_bakery_review(review_id):
         
         # Validate bakery exists if being updated
         if bakery_id != review.bakery_id:
-            bakery = Bakery.query.get(bakery_id)
+            bakery = load_entity(Bakery, bakery_id)
             if not bakery:
                 return jsonify({"message": "Bakery not found"}), 404
         
         # Validate user exists if being updated and not null
         if user_id != review.user_id and user_id is not None:
-            user = User.query.get(user_id)
+            user = load_entity(User, user_id)
             if not user:
                 return jsonify({"message": "User not found"}), 404
         
@@ -221,6 +251,8 @@ def update_bakery_review(review_id):
         )
         
         return jsonify({"message": "Bakery review updated.", "review": bakery_review_schema.dump(updated_review)}), 200
+    except DatabaseBusy as e:
+        return busy_response(e)
     except Exception as e:
         return jsonify({"message": str(e)}), 400
 
@@ -228,7 +260,7 @@ def update_bakery_review(review_id):
 def delete_bakery_review(review_id):
     """Delete a bakery review"""
     try:
-        review = BakeryReview.query.get(review_id)
+        review = review_service.get_bakery_review_by_id(review_id)
         if not review:
             return jsonify({"message": "Bakery review not found"}), 404
         
@@ -236,12 +268,16 @@ def delete_bakery_review(review_id):
         review_service.delete_bakery_review(review_id)
         
         return jsonify({"message": "Bakery review deleted!"}), 200
+    except DatabaseBusy as e:
+        return busy_response(e)
     except Exception as e:
         return jsonify({"message": str(e)}), 400
 
 # === Product Review Routes ===
 
 @product_review_bp.route('/', methods=['GET'])
+@cache_policy(s_maxage=60, collections=('product_review',))
+@conditional(*PRODUCT_REVIEW_TABLES)
 def get_product_reviews():
     """Get all product reviews with related user and product information"""
     try:
@@ -265,9 +301,11 @@ def get_product_reviews():
         }), 500
 
 @product_review_bp.route('/product/<int:product_id>', methods=['GET'])
+@cache_policy(s_maxage=60, collections=('product_review',))
+@conditional(*PRODUCT_REVIEW_TABLES)
 def get_product_reviews_by_product(product_id):
     """Get all reviews for a specific product"""
-    product = Product.query.get(product_id)
+    product = load_entity(Product, product_id)
     if not product:
         return jsonify({"message": "Product not found"}), 404
     
@@ -275,15 +313,31 @@ def get_product_reviews_by_product(product_id):
     return jsonify({"productReviews": product_reviews_schema.dump(reviews)})
 
 @product_review_bp.route('/user/<int:user_id>', methods=['GET'])
+@cache_policy(s_maxage=60, collections=('product_review',))
+@conditional(*PRODUCT_REVIEW_TABLES)
 def get_product_reviews_by_user(user_id):
     """Get all product reviews by a specific user"""
-    user = User.query.get(user_id)
+    user = load_entity(User, user_id)
     if not user:
         return jsonify({"message": "User not found"}), 404
     
     reviews = review_service.get_product_reviews_by_user(user_id)
     return jsonify({"productReviews": product_reviews_schema.dump(reviews)})
 
+@product_review_bp.route('/search', methods=['GET'])
+def search_product_reviews():
+    """Search product reviews by text"""
+    search_term = request.args.get('q', '')
+    if not search_term or len(search_term) < 2:
+        return jsonify({"message": "Search term must be at least 2 characters long", "productReviews": []}), 400
+
+    limit = request.args.get('limit', default=50, type=int)
+    try:
+        reviews = review_service.search_product_reviews(search_term, limit=min(max(limit, 1), 200))
+        return jsonify({"productReviews": product_reviews_schema.dump(reviews)}), 200
+    except Exception as e:
+        return jsonify({"message": f"Error searching product reviews: {str(e)}", "productReviews": []}), 500
+
 @product_review_bp.route('/create', methods=['POST'])
 def create_product_review():
     """Create a new product review"""
@@ -298,13 +352,13 @@ def create_product_review():
                 return jsonify({"message": f"Missing required field: {field}"}), 400
         
         # Validate product exists
-        product = Product.query.get(data['productId'])
+        product = load_entity(Product, data['productId'])
         if not product:
             return jsonify({"message": "Product not found"}), 404
             
         # Validate user exists only if userId is provided (support anonymous reviews)
         if data.get('userId'):
-            user = User.query.get(data['userId'])
+            user = load_entity(User, data['userId'])
             if not user:
                 return jsonify({"message": "User not found"}), 404
         
@@ -358,6 +412,8 @@ def create_product_review():
         )
         
         return jsonify({"message": "Product review created!", "review": product_review_schema.dump(review)}), 201
+    except DatabaseBusy as e:
+        return busy_response(e)
     except Exception as e:
         return jsonify({"message": str(e)}), 400
 
@@ -366,7 +422,7 @@ def create_product_review():
 def update_product_review(review_id):
     """Update a product review"""
     try:
-        review = ProductReview.query.get(review_id)
+        review = review_service.get_product_review_by_id(review_id)
         if not review:
             return jsonify({"message": "Product review not found"}), 404
         
@@ -383,13 +439,13 @@ def update_product_review(review_id):
         
         # Validate product exists if being updated
         if product_id != review.product_id:
-            product = Product.query.get(product_id)
+            product = load_entity(Product, product_id)
             if not product:
                 return jsonify({"message": "Product not found"}), 404
         
         # Validate user exists if being updated and not null
         if user_id != review.user_id and user_id is not None:
-            user = User.query.get(user_id)
+            user = load_entity(User, user_id)
             if not user:
                 return jsonify({"message": "User not found"}), 404
         
@@ -427,6 +483,8 @@ def update_product_review(review_id):
             "review": product_review_schema.dump(updated_review)
         }), 200
     
+    except DatabaseBusy as e:
+        return busy_response(e)
     except Exception as e:
         db.session.rollback()
         return jsonify({"message": f"Error updating review: {str(e)}"}), 400
@@ -435,7 +493,7 @@ def update_product_review(review_id):
 def delete_product_review(review_id):
     """Delete a product review"""
     try:
-        review = ProductReview.query.get(review_id)
+        review = review_service.get_product_review_by_id(review_id)
         if not review:
             return jsonify({"message": "Product review not found"}), 404
         
@@ -443,5 +501,7 @@ def delete_product_review(review_id):
         review_service.delete_product_review(review_id)
         
         return jsonify({"message": "Product review deleted!"}), 200
+    except DatabaseBusy as e:
+        return busy_response(e)
     except Exception as e:
         return jsonify({"message": str(e)}), 400
\ No newline at end of file
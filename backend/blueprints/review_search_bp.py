@@ -0,0 +1,68 @@
+from flask import Blueprint, request, jsonify
+from backend.schemas import BakeryReviewSchema, ProductReviewSchema
+from backend.services.review_vectors import search_reviews, similar_reviews, SOURCES
+from backend.utils.conditional import conditional
+from backend.utils.edge_cache import cache_policy
+
+# Create blueprint
+review_search_bp = Blueprint('reviewsearch', __name__)
+
+# Initialize schemas
+review_schemas = {
+    'bakery': BakeryReviewSchema(),
+    'product': ProductReviewSchema(),
+}
+
+# Tables a serialized result list is built from
+REVIEW_SEARCH_TABLES = ('bakery_review', 'product_review', 'user', 'bakery', 'product')
+
+
+def _type_filter():
+    """The optional ?type= filter; raises ValueError for unknown types"""
+    kind = request.args.get('type')
+    if kind is not None and kind not in SOURCES:
+        raise ValueError(f"type must be one of: {', '.join(SOURCES)}")
+    return kind
+
+
+def _results(matches):
+    return [
+        {"type": kind, "score": round(score, 4), "review": review_schemas[kind].dump(review)}
+        for kind, review, score in matches
+    ]
+
+
+@review_search_bp.route('/search', methods=['GET'])
+@cache_policy(s_maxage=60, collections=('bakery_review', 'product_review'))
+@conditional(*REVIEW_SEARCH_TABLES)
+def search():
+    """Bakery and product reviews ranked by relevance to ?q="""
+    query = request.args.get('q', '').strip()
+    if len(query) < 2:
+        return jsonify({"message": "Search term must be at least 2 characters long", "reviews": []}), 400
+    try:
+        kind = _type_filter()
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    limit = min(max(request.args.get('limit', default=20, type=int), 1), 100)
+    return jsonify({"reviews": _results(search_reviews(query, limit, kind))}), 200
+
+
+@review_search_bp.route('/<review_type>/<int:review_id>/similar', methods=['GET'])
+@cache_policy(s_maxage=300, collections=('bakery_review', 'product_review'))
+@conditional(*REVIEW_SEARCH_TABLES)
+def similar(review_type, review_id):
+    """Reviews closest in wording to a bakery or product review"""
+    if review_type not in SOURCES:
+        return jsonify({"message": f"Review type must be one of: {', '.join(SOURCES)}"}), 404
+    try:
+        kind = _type_filter()
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    limit = min(max(request.args.get('limit', default=10, type=int), 1), 50)
+    matches = similar_reviews(review_type, review_id, limit, kind)
+    if matches is None:
+        return jsonify({"message": "Review not found"}), 404
+    return jsonify({"reviews": _results(matches)}), 200
@@ -0,0 +1,142 @@
+from flask import Blueprint, request, jsonify, current_app as app
+from backend.models import Bakery, Product
+from backend.schemas import BakerySchema, ProductSchema
+from backend.services.suggest_index import get_suggest_index, SOURCES
+from backend.services.facet_index import faceted_search, SORTS
+from backend.services.category_tree import get_category_tree
+from backend.utils.edge_cache import cache_policy
+from backend.utils.conditional import conditional
+
+# Create blueprint
+search_bp = Blueprint('search', __name__)
+
+# Initialize schemas (search results leave out the nested collections)
+bakery_results_schema = BakerySchema(many=True, exclude=('products', 'bakery_reviews'))
+product_results_schema = ProductSchema(many=True, exclude=('product_reviews',))
+
+# Tables a search result page is built from
+SEARCH_TABLES = ('bakery', 'product', 'bakery_review', 'product_review', 'category', 'subcategory')
+
+
+def _id_list(name):
+    """Comma-separated integer ids from the query string"""
+    raw = request.args.get(name, '')
+    return [int(v) for v in raw.split(',') if v.strip().isdigit()]
+
+
+def _load_in_order(model, ids):
+    by_id = {obj.id: obj for obj in model.query.filter(model.id.in_(ids))} if ids else {}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def _format_facets(counts):
+    """Facet counts as lists the frontend can render directly"""
+    tree = get_category_tree()
+
+    def label(facet, value):
+        node = tree.categories.get(value) if facet == 'category' else tree.subcategories.get(value)
+        return node.name if node else None
+
+    facets = {
+        "zipCode": [
+            {"value": value, "count": count}
+            for value, count in sorted(counts['zipCode'].items(), key=lambda item: (-item[1], item[0]))
+        ],
+    }
+    for facet in ('category', 'subcategory'):
+        facets[facet] = [
+            {"id": value, "name": label(facet, value), "count": count}
+            for value, count in sorted(counts[facet].items(), key=lambda item: (-item[1], item[0]))
+        ]
+    for facet in ('minRating', 'minReviews'):
+        facets[facet] = [{"value": step, "count": count} for step, count in sorted(counts[facet].items())]
+    return facets
+
+
+@search_bp.route('/', methods=['GET'])
+@cache_policy(s_maxage=60, collections=SEARCH_TABLES)
+@conditional(*SEARCH_TABLES)
+def search():
+    """Faceted search over bakeries or products with paginated results and facet counts"""
+    kind = request.args.get('type', 'bakeries')
+    if kind not in ('bakeries', 'products'):
+        return jsonify({"message": "type must be 'bakeries' or 'products'"}), 400
+
+    sort = request.args.get('sort')
+    if sort is not None and sort not in SORTS:
+        return jsonify({"message": f"sort must be one of: {', '.join(SORTS)}"}), 400
+
+    page = max(request.args.get('page', default=1, type=int), 1)
+    page_size = min(max(request.args.get('pageSize', default=20, type=int), 1), 100)
+
+    zip_codes = [z.strip() for z in request.args.get('zipCode', '').split(',') if z.strip()]
+    selected = {
+        facet: values
+        for facet, values in (
+            ('zipCode', zip_codes),
+            ('category', _id_list('category')),
+            ('subcategory', _id_list('subcategory')),
+        )
+        if values
+    }
+
+    try:
+        result = faceted_search(
+            kind,
+            selected,
+            min_rating=request.args.get('minRating', type=float),
+            min_reviews=request.args.get('minReviews', type=int),
+            q=request.args.get('q', '').strip() or None,
+            sort=sort,
+            page=page,
+            page_size=page_size,
+        )
+
+        facet_set = result.facet_set
+        if kind == 'bakeries':
+            results = bakery_results_schema.dump(_load_in_order(Bakery, result.ids))
+            for item in results:
+                item['averageRating'] = facet_set.ratings.get(item['id'], 0)
+                item['reviewCount'] = facet_set.review_counts.get(item['id'], 0)
+        else:
+            products = _load_in_order(Product, result.ids)
+            for product in products:
+                product.average_rating = facet_set.ratings.get(product.id, 0)
+                product.review_count = facet_set.review_counts.get(product.id, 0)
+            results = product_results_schema.dump(products)
+
+        return jsonify({
+            "type": kind,
+            "results": results,
+            "total": result.total,
+            "page": page,
+            "pageSize": page_size,
+            "facets": _format_facets(result.facets),
+        }), 200
+    except Exception as e:
+        app.logger.error(f"Error in faceted search: {str(e)}")
+        return jsonify({"message": f"Error searching: {str(e)}", "results": []}), 500
+
+
+@search_bp.route('/suggest', methods=['GET'])
+@cache_policy(max_age=60, s_maxage=60, collections=tuple(SOURCES))
+def suggest():
+    """Autocomplete bakery, product, category and subcategory names"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"suggestions": []}), 200
+
+    limit = min(max(request.args.get('limit', default=8, type=int), 1), 50)
+    types = request.args.get('types')
+    if types:
+        types = {t.strip() for t in types.split(',') if t.strip()}
+        unknown = types - set(SOURCES)
+        if unknown:
+            return jsonify({"message": f"Unknown types: {', '.join(sorted(unknown))}"}), 400
+
+    try:
+        suggestions = get_suggest_index().suggest(query, limit=limit, types=types)
+        return jsonify({"suggestions": suggestions}), 200
+    except Exception as e:
+        app.logger.error(f"Error building suggestions: {str(e)}")
+        return jsonify({"message": f"Error building suggestions: {str(e)}", "suggestions": []}), 500
@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from backend.schemas import UserSchema
-from backend.services.user_service import UserService
+from backend.services.user_service import UserService, InvalidCursor, SEARCH_MODES
 
 # Create blueprint
 user_bp = Blueprint('user', __name__)
@@ -28,13 +28,22 @@ def get_user(user_id):
 
 @user_bp.route('/search', methods=['GET'])
 def search_users():
-    """Search users by username or email"""
+    """Search users by username or email prefix (or substring with mode=substring), a page at a time"""
     search_term = request.args.get('q')
     if not search_term:
         return jsonify({"message": "Search term is required"}), 400
-         
-    users = user_service.search_users(search_term)
-    return jsonify({"users": users_schema.dump(users)})
+    mode = request.args.get('mode', 'prefix')
+    if mode not in SEARCH_MODES:
+        return jsonify({"message": f"mode must be one of: {', '.join(SEARCH_MODES)}"}), 400
+    limit = min(max(request.args.get('limit', default=20, type=int), 1), 100)
+
+    try:
+        users, next_cursor = user_service.search_users(
+            search_term, limit=limit, cursor=request.args.get('cursor'), mode=mode
+        )
+    except InvalidCursor as e:
+        return jsonify({"message": str(e)}), 400
+    return jsonify({"users": users_schema.dump(users), "nextCursor": next_cursor})
 
 @user_bp.route('/update/<int:user_id>', methods=['PATCH'])
 def update_user(user_id):
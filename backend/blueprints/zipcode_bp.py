@@ -0,0 +1,65 @@
+import re
+
+from flask import Blueprint, request, jsonify
+from backend.schemas import BakerySchema
+from backend.services.bakery_service import BakeryService
+from backend.services.zip_rollups import get_zip_rollups, SORTS
+from backend.utils.conditional import conditional
+from backend.utils.edge_cache import cache_policy
+from backend.utils.geo import zip_city
+
+# Create blueprint
+zipcode_bp = Blueprint('zipcode', __name__)
+
+# Initialize schemas (ranking lists leave out the nested collections)
+bakeries_schema = BakerySchema(many=True, exclude=('products', 'bakery_reviews'))
+
+# Initialize service
+bakery_service = BakeryService()
+
+# Tables the rollups are built from
+ZIPCODE_TABLES = ('bakery', 'bakery_review')
+
+
+def _rating(value):
+    return round(value, 2) if value is not None else None
+
+
+@zipcode_bp.route('/', methods=['GET'])
+@cache_policy(s_maxage=300, stale_while_revalidate=30, collections=ZIPCODE_TABLES)
+@conditional(*ZIPCODE_TABLES)
+def get_zipcodes():
+    """Bakery count, review count and average rating per zip code"""
+    rollups = get_zip_rollups()
+    return jsonify({"zipCodes": [
+        {
+            "zipCode": rollup.zip_code,
+            "city": zip_city(rollup.zip_code),
+            "bakeryCount": rollup.bakery_count,
+            "reviewCount": rollup.review_count,
+            "averageRating": _rating(rollup.average_rating),
+        }
+        for rollup in sorted(rollups.zips.values())
+    ]})
+
+
+@zipcode_bp.route('/<zip_code>/bakeries', methods=['GET'])
+@cache_policy(s_maxage=300, stale_while_revalidate=30, collections=ZIPCODE_TABLES)
+@conditional(*ZIPCODE_TABLES)
+def get_zipcode_bakeries(zip_code):
+    """Bakeries in a zip code ranked by ?sort=rating (default), reviews or name"""
+    if not re.fullmatch(r'\d{4}', zip_code):
+        return jsonify({"message": "Zip code must be a 4-digit number"}), 400
+    sort = request.args.get('sort', 'rating')
+    if sort not in SORTS:
+        return jsonify({"message": f"sort must be one of: {', '.join(SORTS)}"}), 400
+
+    rollups = get_zip_rollups()
+    bakeries = rollups.order(bakery_service.get_bakeries_by_zip(zip_code), sort)
+    results = bakeries_schema.dump(bakeries)
+    for result, bakery in zip(results, bakeries):
+        rank = rollups.rank(bakery.id)
+        result['averageRating'] = _rating(rank.average_rating) if rank else None
+        result['reviewCount'] = rank.review_count if rank else 0
+        result['zipPercentile'] = round(rank.percentile, 1) if rank and rank.percentile is not None else None
+    return jsonify({"zipCode": zip_code, "city": zip_city(zip_code), "bakeries": results})
@@ -21,6 +21,45 @@ class Config:
     # Database configuration: use DATABASE_URL env var or default to the instance file
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f"sqlite:////{default_db}"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Optional read replica: GET traffic reads from it (see backend.utils.db_routing)
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {'replica': DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else {}
+
+    # Connection pool (see backend.utils.db_pool): 'auto', 'default' or 'server'
+    DB_POOL_PROFILE = os.environ.get('DB_POOL_PROFILE', 'auto')
+    # Per-setting overrides of the profile; unset keeps the profile's value
+    DB_POOL_SIZE = os.environ.get('DB_POOL_SIZE')
+    DB_MAX_OVERFLOW = os.environ.get('DB_MAX_OVERFLOW')
+    DB_POOL_TIMEOUT = os.environ.get('DB_POOL_TIMEOUT')  # seconds
+    DB_POOL_RECYCLE = os.environ.get('DB_POOL_RECYCLE')  # seconds
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING')
+    DB_STATEMENT_CACHE_SIZE = os.environ.get('DB_STATEMENT_CACHE_SIZE')  # compiled statements per engine
+
+    # Async variants of fan-out read views on an async engine (see backend.utils.async_db); asgi.py turns this on
+    ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'false').lower() == 'true'
+
+    # SQLite connection pragmas (see backend.utils.sqlite_profile): 'performance' or 'default'
+    SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'performance')
+    # Per-pragma overrides, e.g. SQLITE_PRAGMAS="cache_size=-16000,mmap_size=0"
+    SQLITE_PRAGMAS = os.environ.get('SQLITE_PRAGMAS', '')
+
+    # Per-request SQL statistics (see backend.utils.query_stats)
+    QUERY_COUNT_HEADER = os.environ.get('QUERY_COUNT_HEADER', 'false').lower() == 'true'  # X-Query-Count/-Time
+    # Same statement shape this many times in one request is logged as a possible N+1
+    N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 10))
+
+    # Slow query log (see backend.utils.slow_queries); an empty SLOW_QUERY_LOG turns it off
+    SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG', 'logs/slow_queries.jsonl')
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 250))
+    SLOW_QUERY_LOG_MAX_BYTES = int(os.environ.get('SLOW_QUERY_LOG_MAX_BYTES', 1_048_576))
+    SLOW_QUERY_LOG_BACKUPS = int(os.environ.get('SLOW_QUERY_LOG_BACKUPS', 5))
+
+    # Single-writer coordination of service writes on SQLite (see backend.utils.write_coordinator)
+    SQLITE_WRITE_COORDINATOR = os.environ.get('SQLITE_WRITE_COORDINATOR', 'true').lower() == 'true'
+    SQLITE_WRITE_RETRIES = int(os.environ.get('SQLITE_WRITE_RETRIES', 5))
+    SQLITE_WRITE_BACKOFF = float(os.environ.get('SQLITE_WRITE_BACKOFF', 0.05))  # seconds, doubled per retry
+    SQLITE_WRITE_LOCK_TIMEOUT = float(os.environ.get('SQLITE_WRITE_LOCK_TIMEOUT', 10.0))  # seconds
     print(f"Using database URI: {SQLALCHEMY_DATABASE_URI}")
     
     # Security configurations with safe defaults for development
@@ -30,10 +69,45 @@ class Config:
     # CORS configuration
     ALLOWED_ORIGINS = os.environ.get('ALLOWED_ORIGINS', 'http://localhost:5173').split(',')
     
+    # Bearer token a metrics scraper can use for /admin/metrics instead of an admin JWT
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
     # API configurations
     JSON_SORT_KEYS = False
     JSONIFY_PRETTYPRINT_REGULAR = False  # Disable pretty printing for performance
 
+    # Cache warmup: prime hot endpoints before the worker starts serving
+    CACHE_WARMUP_ENABLED = os.environ.get('CACHE_WARMUP_ENABLED', 'false').lower() == 'true'
+    CACHE_WARMUP_CONCURRENCY = int(os.environ.get('CACHE_WARMUP_CONCURRENCY', 4))
+    CACHE_WARMUP_TIME_BUDGET = float(os.environ.get('CACHE_WARMUP_TIME_BUDGET', 10.0))  # seconds
+    CACHE_WARMUP_GRACE = float(os.environ.get('CACHE_WARMUP_GRACE', 2.0))  # seconds to let in-flight requests finish
+
+    # How long misses (unknown ids, empty searches) stay in the negative cache (seconds)
+    NEGATIVE_CACHE_TIMEOUT = int(os.environ.get('NEGATIVE_CACHE_TIMEOUT', 30))
+
+    # Maximum age of the in-process category tree snapshot (seconds)
+    CATEGORY_TREE_MAX_AGE = int(os.environ.get('CATEGORY_TREE_MAX_AGE', 300))
+
+    # Maximum age of the in-process autocomplete index before a full rebuild (seconds)
+    SUGGEST_INDEX_MAX_AGE = int(os.environ.get('SUGGEST_INDEX_MAX_AGE', 600))
+
+    # Maximum age of the in-process facet bitmaps (seconds)
+    FACET_INDEX_MAX_AGE = int(os.environ.get('FACET_INDEX_MAX_AGE', 300))
+
+    # Maximum age of the in-process zip code rollups (seconds)
+    ZIP_ROLLUPS_MAX_AGE = int(os.environ.get('ZIP_ROLLUPS_MAX_AGE', 300))
+
+    # Maximum age of the in-process review vectors before a full rebuild (seconds)
+    REVIEW_VECTORS_MAX_AGE = int(os.environ.get('REVIEW_VECTORS_MAX_AGE', 3600))
+    # Directory of the review vectors built offline with `manage.py build-review-vectors` (optional)
+    REVIEW_VECTORS_PATH = os.environ.get('REVIEW_VECTORS_PATH')
+
+    # Reverse proxy purging: surrogate keys touched by a commit are sent here (disabled when unset)
+    EDGE_PURGE_URL = os.environ.get('EDGE_PURGE_URL')
+    EDGE_PURGE_TIMEOUT = float(os.environ.get('EDGE_PURGE_TIMEOUT', 2.0))  # seconds
+    # Above this many row keys a response is tagged by table instead
+    EDGE_SURROGATE_KEY_LIMIT = int(os.environ.get('EDGE_SURROGATE_KEY_LIMIT', 256))
+
     def __init__(self):
         # Print out the database URI to confirm the configuration
         print(f"SQLALCHEMY_DATABASE_URI: {self.SQLALCHEMY_DATABASE_URI}")
@@ -41,7 +115,10 @@ class Config:
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
-    SQLALCHEMY_ECHO = True  # Log SQL queries
+    # Every statement only on request; the slow query log catches the ones that matter
+    SQLALCHEMY_ECHO = os.environ.get('SQLALCHEMY_ECHO', 'false').lower() == 'true'
+    QUERY_COUNT_HEADER = True
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 50))
 
 class ProductionConfig(Config):
     """Production configuration"""
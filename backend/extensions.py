@@ -5,8 +5,10 @@ from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_caching import Cache
 
+from backend.utils.db_routing import RoutingSession
+
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})  # reads may go to a replica bind
 jwt = JWTManager()
 ma = Marshmallow()
 migrate = Migrate()
@@ -14,6 +14,9 @@ from .product_models import Product
 # Finally import models with relationships to multiple models
 from .review_models import BakeryReview, ProductReview
 
+# Bookkeeping tables
+from .table_version_models import TableVersion
+
 # Define __all_models__ for Flask-Migrate
 __all_models__ = [
     'User',
@@ -22,5 +25,6 @@ __all_models__ = [
     'Bakery',
     'Product',
     'BakeryReview',
-    'ProductReview'
+    'ProductReview',
+    'TableVersion'
 ]
\ No newline at end of file
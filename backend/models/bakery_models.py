@@ -1,7 +1,9 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Float, Index
+from sqlalchemy.orm import relationship, validates
 from backend.extensions import db 
+from backend.utils.collation import danish_sort_key
+from backend.utils.geo import zip_centroid
 
 # Add logging comment that doesn't affect functionality
 # Logger for Bakery model operations - 2025-05-07: Model used for bakery CRUD operations
@@ -12,6 +14,8 @@ class Bakery(db.Model):
     
     id = Column(Integer, primary_key=True)
     name = Column(String(80), nullable=False)
+    # Danish collation key of the name (see backend.utils.collation); order listings by this
+    name_sort_key = Column(String(255), nullable=True)
     zip_code = Column(String(4), nullable=False)
     street_name = Column(String(80), nullable=False)
     street_number = Column(String(10), nullable=False)
@@ -20,6 +24,10 @@ class Bakery(db.Model):
 
     image_url = Column(String(255), nullable=True)
     website_url = Column(String(255), nullable=True)
+
+    # Centroid of the zip code (see backend.utils.geo); None when the code can't be placed
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
     
     # Relationships with cascade deletes
     products = relationship('Product', back_populates='bakery', cascade='all, delete-orphan')
@@ -28,6 +36,8 @@ class Bakery(db.Model):
     # Indexes for faster queries
     __table_args__ = (
         Index('idx_bakery_name', 'name'),
+        Index('idx_bakery_name_sort_key', 'name_sort_key'),
+        Index('idx_bakery_zip_name_sort_key', 'zip_code', 'name_sort_key'),
         Index('idx_bakery_zip', 'zip_code'),
         Index('idx_bakery_street', 'street_name', 'street_number'),
     )
@@ -40,6 +50,16 @@ class Bakery(db.Model):
         self.image_url = image_url
         self.website_url = website_url
 
+    @validates('name')
+    def _set_name_sort_key(self, key, name):
+        self.name_sort_key = danish_sort_key(name)
+        return name
+
+    @validates('zip_code')
+    def _place_at_zip_code(self, key, zip_code):
+        """Keep the coordinates at the centroid of the zip code"""
+        self.latitude, self.longitude = zip_centroid(zip_code) or (None, None)
+        return zip_code
     
     def __repr__(self):
         return f'<Bakery {self.name}>'
@@ -54,6 +74,8 @@ class Bakery(db.Model):
             'streetNumber': self.street_number,
             'imageUrl': self.image_url,
             'websiteUrl': self.website_url,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
\ No newline at end of file
@@ -1,7 +1,8 @@
 from datetime import datetime
 from sqlalchemy import Column, Integer, String, DateTime, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from backend.extensions import db 
+from backend.utils.collation import danish_sort_key
 
 class Category(db.Model):
     """Category model for product categories"""
@@ -9,6 +10,8 @@ class Category(db.Model):
     
     id = Column(Integer, primary_key=True)
     name = Column(String(50), nullable=False, unique=True)
+    # Danish collation key of the name (see backend.utils.collation); order listings by this
+    name_sort_key = Column(String(255), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -19,10 +22,16 @@ class Category(db.Model):
     # Indexes
     __table_args__ = (
         Index('idx_category_name', 'name', unique=True),
+        Index('idx_category_name_sort_key', 'name_sort_key'),
     )
     
     def __init__(self, name):
         self.name = name
+
+    @validates('name')
+    def _set_name_sort_key(self, key, name):
+        self.name_sort_key = danish_sort_key(name)
+        return name
     
     def __repr__(self):
         return f'<Category {self.name}>'
@@ -43,6 +52,7 @@ class Subcategory(db.Model):
     
     id = Column(Integer, primary_key=True)
     name = Column(String(50), nullable=False)
+    name_sort_key = Column(String(255), nullable=True)
     category_id = Column(Integer, db.ForeignKey('category.id', ondelete='CASCADE'), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -56,11 +66,18 @@ class Subcategory(db.Model):
         Index('idx_subcategory_name', 'name'),
         Index('idx_subcategory_category_id', 'category_id'),
         Index('idx_unique_category_subcategory', 'category_id', 'name', unique=True),
+        Index('idx_subcategory_name_sort_key', 'name_sort_key'),
+        Index('idx_subcategory_category_name_sort_key', 'category_id', 'name_sort_key'),
     )
     
     def __init__(self, name, category_id):
         self.name = name
         self.category_id = category_id
+
+    @validates('name')
+    def _set_name_sort_key(self, key, name):
+        self.name_sort_key = danish_sort_key(name)
+        return name
     
     def __repr__(self):
         return f'<Subcategory {self.name}>'
@@ -1,7 +1,8 @@
 from datetime import datetime
 from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from backend.extensions import db  # Fixed import statement
+from backend.utils.collation import danish_sort_key
 
 class Product(db.Model):
     """Product model representing bakery products."""
@@ -9,6 +10,8 @@ class Product(db.Model):
 
     id = Column(Integer, primary_key=True)
     name = Column(String(80), nullable=False)
+    # Danish collation key of the name (see backend.utils.collation); order listings by this
+    name_sort_key = Column(String(255), nullable=True)
     bakery_id = Column(Integer, ForeignKey('bakery.id', ondelete='CASCADE'), nullable=False)
     category_id = Column(Integer, ForeignKey('category.id', ondelete='SET NULL'), nullable=True)
     subcategory_id = Column(Integer, ForeignKey('subcategory.id', ondelete='SET NULL'), nullable=True)
@@ -28,6 +31,10 @@ class Product(db.Model):
         Index('idx_product_bakery_id', 'bakery_id'),
         Index('idx_product_category_id', 'category_id'),
         Index('idx_product_subcategory_id', 'subcategory_id'),
+        Index('idx_product_name_sort_key', 'name_sort_key'),
+        Index('idx_product_bakery_name_sort_key', 'bakery_id', 'name_sort_key'),
+        Index('idx_product_category_name_sort_key', 'category_id', 'name_sort_key'),
+        Index('idx_product_subcategory_name_sort_key', 'subcategory_id', 'name_sort_key'),
     )
 
     def __init__(self, name, bakery_id, category_id=None, subcategory_id=None, image_url=None):
@@ -37,6 +44,11 @@ class Product(db.Model):
         self.subcategory_id = subcategory_id
         self.image_url = image_url
 
+    @validates('name')
+    def _set_name_sort_key(self, key, name):
+        self.name_sort_key = danish_sort_key(name)
+        return name
+
     def __repr__(self):
         return f'<Product {self.name}>'
 
@@ -55,8 +55,13 @@ class BakeryReview(db.Model, BaseReview):
         CheckConstraint('price_rating IS NULL OR price_rating BETWEEN 1 AND 10', name='check_bakery_price_rating'),
         CheckConstraint('atmosphere_rating IS NULL OR atmosphere_rating BETWEEN 1 AND 10', name='check_bakery_atmosphere_rating'),
         CheckConstraint('location_rating IS NULL OR location_rating BETWEEN 1 AND 10', name='check_bakery_location_rating'),
-        Index('idx_bakery_review_bakery_id', 'bakery_id'),
-        Index('idx_bakery_review_user_id', 'user_id'),
+        # Listings newest first, filtered by bakery or user, sorted by the index
+        Index('idx_bakery_review_bakery_created', 'bakery_id', 'created_at', 'id'),
+        Index('idx_bakery_review_user_created', 'user_id', 'created_at', 'id'),
+        Index('idx_bakery_review_created', 'created_at', 'id'),
+        # Covers the rating stats, which then never visit the table
+        Index('idx_bakery_review_bakery_ratings', 'bakery_id', 'overall_rating', 'service_rating',
+              'price_rating', 'atmosphere_rating', 'location_rating'),
     )
     
     def __init__(self, review, overall_rating, service_rating, price_rating, 
@@ -114,8 +119,13 @@ class ProductReview(db.Model, BaseReview):
         CheckConstraint('taste_rating IS NULL OR taste_rating BETWEEN 1 AND 10', name='check_product_taste_rating'),
         CheckConstraint('price_rating IS NULL OR price_rating BETWEEN 1 AND 10', name='check_product_price_rating'),
         CheckConstraint('presentation_rating IS NULL OR presentation_rating BETWEEN 1 AND 10', name='check_product_presentation_rating'),
-        Index('idx_product_review_product_id', 'product_id'),
-        Index('idx_product_review_user_id', 'user_id'),
+        # Listings newest first, filtered by product or user, sorted by the index
+        Index('idx_product_review_product_created', 'product_id', 'created_at', 'id'),
+        Index('idx_product_review_user_created', 'user_id', 'created_at', 'id'),
+        Index('idx_product_review_created', 'created_at', 'id'),
+        # Covers the rating stats, which then never visit the table
+        Index('idx_product_review_product_ratings', 'product_id', 'overall_rating', 'taste_rating',
+              'price_rating', 'presentation_rating'),
     )
     
     def __init__(self, review, overall_rating, taste_rating, price_rating, 
@@ -0,0 +1,16 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+from backend.extensions import db
+
+
+class TableVersion(db.Model):
+    """Change counter per table, behind the conditional GET validators (see backend.utils.conditional)"""
+    __tablename__ = 'table_version'
+
+    table_name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    # UTC time of the last committed change to the table
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<TableVersion {self.table_name} v{self.version}>'
@@ -1,7 +1,8 @@
 from datetime import datetime, timedelta
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from backend.extensions import db  # Fixed import statement
+from backend.utils.collation import danish_sort_key
 from flask_bcrypt import generate_password_hash, check_password_hash
 
 class User(db.Model):
@@ -11,6 +12,12 @@ class User(db.Model):
     id = Column(Integer, primary_key=True)
     username = Column(String(24), nullable=False, unique=True)
     email = Column(String(50), unique=True, nullable=False)
+    # Lowercased with Python's Unicode rules; SQLite's lower() only folds ASCII, so
+    # "Ørsted" couldn't be found as "ør". Case-insensitive prefix search reads these.
+    username_lower = Column(String(48), nullable=True)
+    email_lower = Column(String(100), nullable=True)
+    # Danish collation key of the username (see backend.utils.collation); order listings by this
+    username_sort_key = Column(String(255), nullable=True)
     password_hash = Column(String(128), nullable=False)
     profile_picture = Column(Integer, default=1, nullable=True)
     is_admin = Column(Boolean, default=False)
@@ -27,6 +34,10 @@ class User(db.Model):
     __table_args__ = (
         Index('idx_user_email', 'email', unique=True),
         Index('idx_user_username', 'username', unique=True),
+        # Case-insensitive prefix search (see UserService.search_users)
+        Index('idx_user_username_lower', 'username_lower'),
+        Index('idx_user_email_lower', 'email_lower'),
+        Index('idx_user_username_sort_key', 'username_sort_key'),
     )
     
     def __init__(self, username, email, password, profile_picture=1, is_admin=False):
@@ -35,6 +46,13 @@ class User(db.Model):
         self.set_password(password)
         self.profile_picture = profile_picture
         self.is_admin = is_admin
+
+    @validates('username', 'email')
+    def _set_derived_keys(self, key, value):
+        setattr(self, f'{key}_lower', value.lower() if value is not None else None)
+        if key == 'username':
+            self.username_sort_key = danish_sort_key(value)
+        return value
     
     # Password methods
     def set_password(self, password):
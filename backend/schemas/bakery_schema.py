@@ -1,8 +1,9 @@
 from backend.extensions import ma 
 from backend.models.bakery_models import Bakery
 from marshmallow import fields, validate, post_dump, post_load
+from backend.schemas.batching import BatchLoadingMixin
 
-class BakerySchema(ma.SQLAlchemyAutoSchema):
+class BakerySchema(BatchLoadingMixin, ma.SQLAlchemyAutoSchema):
     """Schema for serializing and deserializing Bakery objects"""
     
     class Meta:
@@ -10,8 +11,8 @@ class BakerySchema(ma.SQLAlchemyAutoSchema):
         load_instance = True
         include_fk = True
         include_relationships = True
-        # Exclude the fields that will be renamed
-        exclude = ("zip_code", "street_name", "street_number", "image_url", "website_url")
+        # Exclude the fields that will be renamed, and the internal sort key
+        exclude = ("zip_code", "street_name", "street_number", "image_url", "website_url", "name_sort_key")
     
     # Field customizations
     id = fields.Integer(dump_only=True)  # Read-only field
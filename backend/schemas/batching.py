@@ -0,0 +1,47 @@
+"""
+Batched relationship loading for schema dumps.
+
+Schemas that mix in ``BatchLoadingMixin`` look at the fields they are about
+to dump before dumping. Every field backed by a relationship (nested
+schemas, related ids, including the ones generated by
+``include_relationships``) is loaded for the whole list with one query
+(see ``backend.utils.batch_loader``), and nested schemas are followed so
+their relationships are batched across all parents too. A list endpoint then
+runs a fixed number of queries however many rows it returns.
+"""
+from marshmallow import fields, pre_dump
+
+from backend.utils.batch_loader import load_relationship
+
+
+def _nested_schema(field):
+    """Schema dumped by a Nested or List(Nested) field, else None"""
+    if isinstance(field, fields.List):
+        field = field.inner
+    if isinstance(field, fields.Nested):
+        return field.schema
+    return None
+
+
+def prefetch(schema, objects):
+    """Load every relationship ``schema`` will dump for all ``objects`` at once"""
+    if not objects:
+        return
+    for name, field in schema.dump_fields.items():
+        related = load_relationship(objects, field.attribute or name)
+        nested = _nested_schema(field)
+        if related and nested is not None:
+            prefetch(nested, related)
+
+
+class BatchLoadingMixin:
+    """Batch-load the relationships a dump reads instead of lazy loading them per row"""
+
+    @pre_dump(pass_many=True)
+    def batch_relationships(self, data, many, **kwargs):
+        if many:
+            if isinstance(data, (list, tuple)):
+                prefetch(self, data)
+        elif data is not None:
+            prefetch(self, [data])
+        return data
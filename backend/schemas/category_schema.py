@@ -1,14 +1,16 @@
 from backend.extensions import ma 
 from backend.models.category_models import Category, Subcategory
 from marshmallow import fields, validate, post_dump
+from backend.schemas.batching import BatchLoadingMixin
 
-class CategorySchema(ma.SQLAlchemyAutoSchema):
+class CategorySchema(BatchLoadingMixin, ma.SQLAlchemyAutoSchema):
     """Schema for serializing and deserializing Category objects"""
     
     class Meta:
         model = Category
         load_instance = True
         include_relationships = True
+        exclude = ("name_sort_key",)
     
     id = fields.Integer(dump_only=True)
     name = fields.String(required=True, validate=validate.Length(min=1, max=50))
@@ -25,7 +27,7 @@ class CategorySchema(ma.SQLAlchemyAutoSchema):
             data['subcategories'] = []
         return data
 
-class SubcategorySchema(ma.SQLAlchemyAutoSchema):
+class SubcategorySchema(BatchLoadingMixin, ma.SQLAlchemyAutoSchema):
     """Schema for serializing and deserializing Subcategory objects"""
     
     class Meta:
@@ -33,7 +35,7 @@ class SubcategorySchema(ma.SQLAlchemyAutoSchema):
         load_instance = True
         include_fk = True
         include_relationships = True
-        exclude = ("category_id",)
+        exclude = ("category_id", "name_sort_key")
     
     id = fields.Integer(dump_only=True)
     name = fields.String(required=True, validate=validate.Length(min=1, max=50))
@@ -1,8 +1,9 @@
 from backend.extensions import ma
 from backend.models.product_models import Product
 from marshmallow import fields, validate, post_dump, post_load
+from backend.schemas.batching import BatchLoadingMixin
 
-class ProductSchema(ma.SQLAlchemyAutoSchema):
+class ProductSchema(BatchLoadingMixin, ma.SQLAlchemyAutoSchema):
     """Schema for serializing and deserializing Product objects"""
     
     class Meta:
@@ -10,8 +11,8 @@ class ProductSchema(ma.SQLAlchemyAutoSchema):
         load_instance = True
         include_fk = True
         include_relationships = True
-        # Exclude fields that will be renamed
-        exclude = ("bakery_id", "category_id", "subcategory_id", "image_url")
+        # Exclude fields that will be renamed, and the internal sort key
+        exclude = ("bakery_id", "category_id", "subcategory_id", "image_url", "name_sort_key")
     
     # Field customizations
     id = fields.Integer(dump_only=True)
@@ -1,6 +1,7 @@
 from backend.extensions import ma 
 from backend.models.review_models import BakeryReview, ProductReview
 from marshmallow import fields, validate, post_dump, post_load
+from backend.schemas.batching import BatchLoadingMixin
 
 class BaseReviewSchema:
     """Base class for review schemas with common attributes"""
@@ -16,7 +17,7 @@ class BaseReviewSchema:
     created_at = fields.DateTime(dump_only=True)
     updated_at = fields.DateTime(dump_only=True)
 
-class BakeryReviewSchema(ma.SQLAlchemyAutoSchema):
+class BakeryReviewSchema(BatchLoadingMixin, ma.SQLAlchemyAutoSchema):
     """Schema for serializing and deserializing BakeryReview objects"""
     
     class Meta:
@@ -132,7 +133,7 @@ class BakeryReviewSchema(ma.SQLAlchemyAutoSchema):
             
         return result
 
-class ProductReviewSchema(ma.SQLAlchemyAutoSchema):
+class ProductReviewSchema(BatchLoadingMixin, ma.SQLAlchemyAutoSchema):
     """Schema for serializing and deserializing ProductReview objects"""
     
     class Meta:
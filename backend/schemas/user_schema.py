@@ -9,7 +9,9 @@ class UserSchema(ma.SQLAlchemyAutoSchema):
         model = User
         load_instance = False
         include_fk = True
-        exclude = ("password_hash", "profile_picture", "is_admin")  # Exclude these fields from default mapping
+        # Exclude these fields from default mapping; the lowercase and sort key columns are for indexing only
+        exclude = ("password_hash", "profile_picture", "is_admin", "username_lower", "email_lower",
+                   "username_sort_key")
     
     # Field customizations
     id = fields.Integer(dump_only=True)  # Read-only field
@@ -0,0 +1,31 @@
+from backend.services.bakery_service import PROFILE_STATEMENTS, profile_from_rows, stats_from_rows
+from backend.utils.async_db import fetch_all
+from backend.utils.caching import is_known_missing, remember_missing
+
+
+class BakeryNotFound(Exception):
+    pass
+
+
+class AsyncBakeryService:
+    """Bakery reads for the async views: the independent queries behind a response run concurrently"""
+
+    async def get_bakery_profile(self, bakery_id):
+        """Same result as ``BakeryService.get_bakery_profile``"""
+        if is_known_missing('bakery', bakery_id):
+            return None
+        profile = profile_from_rows(await fetch_all(PROFILE_STATEMENTS, {'bakery_id': bakery_id}))
+        if profile is None:
+            remember_missing('bakery', bakery_id)
+        return profile
+
+    async def get_bakery_stats(self, bakery_id):
+        """Same result as ``BakeryService.get_bakery_stats``; raises BakeryNotFound"""
+        if is_known_missing('bakery', bakery_id):
+            raise BakeryNotFound("Bakery not found")
+        statements = {part: PROFILE_STATEMENTS[part] for part in ('bakery', 'ratings')}
+        rows = await fetch_all(statements, {'bakery_id': bakery_id})
+        if not rows['bakery']:
+            remember_missing('bakery', bakery_id)
+            raise BakeryNotFound("Bakery not found")
+        return stats_from_rows(rows['bakery'][0], rows['ratings'][0])
@@ -1,29 +1,169 @@
+from flask import has_app_context
 from backend.extensions import db
-from backend.models import Bakery, BakeryReview
+from backend.models import Bakery, BakeryReview, Product, User
 from sqlalchemy.exc import SQLAlchemyError
+from backend.utils.caching import (
+    remember_missing, is_known_missing, forget_missing, invalidate_missing_searches
+)
+from backend.utils.change_tracking import on_commit
+from backend.utils.entity_loader import get_loader, load_entity
+from backend.utils.search_index import FullTextIndex, register_index
+from backend.utils.spatial_index import SpatialIndex, register_spatial_index
+from backend.utils.geo import bounding_box, haversine_km
+from backend.utils.write_coordinator import serialized_write
+from backend.services.zip_rollups import get_zip_rollups
+from sqlalchemy import bindparam, func, select
+
+# Full-text index over bakery name and street; a name hit outranks a street hit
+bakery_search_index = register_index(FullTextIndex(
+    'bakery_fts', Bakery,
+    columns={
+        'name': (10.0, lambda b: b.name),
+        'street': (1.0, lambda b: b.street_name),
+    },
+    watched=('name', 'street_name'),
+))
+
+# R*Tree over the bakery coordinates for proximity queries
+bakery_spatial_index = register_spatial_index(SpatialIndex(
+    'bakery_rtree', Bakery,
+    point=lambda b: (b.latitude, b.longitude),
+    watched=('latitude', 'longitude'),
+))
+
+# Nearby search starts with a small ring and widens it up to this radius (km)
+NEARBY_START_RADIUS_KM = 2.0
+NEARBY_MAX_RADIUS_KM = 500.0
+
+# Highest average overall rating a bakery can have
+MAX_RATING = 10
+
+# Stats rating name -> review column
+RATING_COLUMNS = {
+    'overall': 'overall_rating',
+    'service': 'service_rating',
+    'price': 'price_rating',
+    'atmosphere': 'atmosphere_rating',
+    'location': 'location_rating',
+}
+
+# Latest reviews shown on a bakery profile
+PROFILE_REVIEW_LIMIT = 5
+
+
+# Reads a bakery profile is built from, independent of each other, built once
+# and executed with the bakery_id parameter
+PROFILE_STATEMENTS = {
+    'bakery': select(
+        Bakery.id, Bakery.name, Bakery.zip_code, Bakery.street_name, Bakery.street_number,
+        Bakery.image_url, Bakery.website_url,
+    ).where(Bakery.id == bindparam('bakery_id')),
+    'ratings': select(
+        func.count(BakeryReview.overall_rating),
+        *(func.avg(getattr(BakeryReview, column)) for column in RATING_COLUMNS.values()),
+    ).where(BakeryReview.bakery_id == bindparam('bakery_id')),
+    'products': select(Product.id, Product.name, Product.image_url, Product.category_id, Product.subcategory_id)
+    .where(Product.bakery_id == bindparam('bakery_id'))
+    .order_by(Product.name_sort_key),
+    'reviews': select(
+        BakeryReview.id, BakeryReview.review, BakeryReview.overall_rating, BakeryReview.created_at,
+        BakeryReview.user_id, User.username,
+    )
+    .outerjoin(User, User.id == BakeryReview.user_id)
+    .where(BakeryReview.bakery_id == bindparam('bakery_id'))
+    .order_by(BakeryReview.created_at.desc(), BakeryReview.id.desc())
+    .limit(PROFILE_REVIEW_LIMIT),
+}
+
+# Hot reads, built once rather than per call: SQLAlchemy then finds their
+# compiled form by a cache key memoized on the statement, and the per-call
+# cost is binding the parameters
+_ALL_BAKERIES = select(Bakery).order_by(Bakery.name_sort_key)
+_BAKERIES_BY_ZIP = select(Bakery).where(Bakery.zip_code == bindparam('zip_code')).order_by(Bakery.name_sort_key)
+_RATING_SUMMARIES = select(
+    BakeryReview.bakery_id,
+    func.count(BakeryReview.overall_rating),
+    *(func.avg(getattr(BakeryReview, column)) for column in RATING_COLUMNS.values()),
+).group_by(BakeryReview.bakery_id)
+
+
+def stats_from_rows(bakery_row, ratings_row):
+    """Bakery stats, as ``get_bakery_stats`` returns them, from the 'bakery' and 'ratings' rows"""
+    stats = {
+        "id": bakery_row.id,
+        "name": bakery_row.name,
+        "zipCode": bakery_row.zip_code,
+        "streetName": bakery_row.street_name,
+        "streetNumber": bakery_row.street_number,
+        "imageUrl": bakery_row.image_url,
+        "websiteUrl": bakery_row.website_url,
+        "review_count": 0,
+        "average_rating": 0,
+        "ratings": dict.fromkeys(RATING_COLUMNS, 0),
+        "zip_percentile": None,
+    }
+    rank = get_zip_rollups().rank(bakery_row.id)
+    if rank and rank.percentile is not None:
+        stats["zip_percentile"] = round(rank.percentile, 1)
+
+    review_count, *averages = ratings_row
+    if review_count:
+        ratings = {name: average if average is not None else 0 for name, average in zip(RATING_COLUMNS, averages)}
+        stats.update(review_count=review_count, average_rating=ratings['overall'], ratings=ratings)
+    return stats
+
+
+def profile_from_rows(rows):
+    """Bakery profile from ``{part: rows}`` of ``PROFILE_STATEMENTS``; None if the bakery doesn't exist"""
+    if not rows['bakery']:
+        return None
+    profile = stats_from_rows(rows['bakery'][0], rows['ratings'][0])
+    profile["products"] = [
+        {"id": row.id, "name": row.name, "imageUrl": row.image_url,
+         "categoryId": row.category_id, "subcategoryId": row.subcategory_id}
+        for row in rows['products']
+    ]
+    profile["recentReviews"] = [
+        {"id": row.id, "review": row.review, "overallRating": row.overall_rating,
+         "createdAt": row.created_at.isoformat() if row.created_at else None,
+         "userId": row.user_id, "username": row.username}
+        for row in rows['reviews']
+    ]
+    return profile
+
 
 class BakeryService:
     """Service class for bakery-related business logic"""
 
     def get_all_bakeries(self):
         """Get all bakeries ordered by name"""
-        bakeries = Bakery.query.order_by(Bakery.name).all()
-        
-        # Enhance bakeries with rating information
+        bakeries = db.session.scalars(_ALL_BAKERIES).all()
+
+        # Enhance bakeries with rating information, aggregated for all of them at once
+        ratings = self._rating_summaries()
         for bakery in bakeries:
-            # Add rating information to each bakery
-            stats = self.get_bakery_stats(bakery.id)
-            bakery.average_rating = stats.get('average_rating', 0)
-            bakery.review_count = stats.get('review_count', 0)
-            bakery.ratings = stats.get('ratings', {})
-        
+            bakery.review_count, bakery.ratings = ratings.get(bakery.id, (0, dict.fromkeys(RATING_COLUMNS, 0)))
+            bakery.average_rating = bakery.ratings['overall']
+
         return bakeries
 
-    def get_bakery_by_id(self, bakery_id):
-        """Get a specific bakery by ID"""
-        bakery = Bakery.query.get(bakery_id)
-        if bakery:
-            # Add rating information
+    def _rating_summaries(self):
+        """{bakery id: (review count, {rating: average})} over every reviewed bakery, in one query"""
+        rows = db.session.execute(_RATING_SUMMARIES)
+        return {
+            row[0]: (row[1], {name: float(average or 0) for name, average in zip(RATING_COLUMNS, row[2:])})
+            for row in rows
+        }
+
+    def get_bakery_by_id(self, bakery_id, with_stats=False):
+        """Get a specific bakery by ID, with its rating information if asked for"""
+        if is_known_missing('bakery', bakery_id):
+            return None
+
+        bakery = load_entity(Bakery, bakery_id)
+        if not bakery:
+            remember_missing('bakery', bakery_id)
+        elif with_stats:
             stats = self.get_bakery_stats(bakery_id)
             bakery.average_rating = stats.get('average_rating', 0)
             bakery.review_count = stats.get('review_count', 0)
@@ -32,12 +172,78 @@ class BakeryService:
 
     def get_bakeries_by_zip(self, zip_code):
         """Get bakeries by zip code"""
-        return Bakery.query.filter_by(zip_code=zip_code).order_by(Bakery.name).all()
+        return db.session.scalars(_BAKERIES_BY_ZIP, {'zip_code': zip_code}).all()
+
+    def get_nearby_bakeries(self, lat, lng, radius_km=None, limit=20, rating_weight=0.0):
+        """Bakeries around a point as [(bakery, distance km, average rating)].
+
+        Nearest first, unless ``rating_weight`` is set: then every point of
+        average overall rating counts as that many km less distance. The
+        search ring widens from a couple of km until the best ``limit``
+        bakeries are certain, so a k-nearest query only reads bakeries close by.
+        """
+        max_radius = radius_km or NEARBY_MAX_RADIUS_KM
+        radius = min(NEARBY_START_RADIUS_KM, max_radius)
+        max_bonus = rating_weight * MAX_RATING
+        while True:
+            hits = self._bakeries_within(lat, lng, radius)
+            ratings = self._average_ratings([bakery_id for _, bakery_id in hits]) if rating_weight else {}
+            ranked = sorted(
+                (distance - rating_weight * ratings.get(bakery_id, 0), distance, bakery_id)
+                for distance, bakery_id in hits
+            )[:limit]
+            # Bakeries outside the ring can't score better than radius - max_bonus
+            if (len(ranked) == limit and ranked[-1][0] <= radius - max_bonus) or radius >= max_radius:
+                break
+            radius = min(radius * 2, max_radius)
+
+        ids = [bakery_id for _, _, bakery_id in ranked]
+        if not ratings:
+            ratings = self._average_ratings(ids)
+        bakeries = {bakery.id: bakery for bakery in Bakery.query.filter(Bakery.id.in_(ids))}
+        return [
+            (bakeries[bakery_id], distance, ratings.get(bakery_id, 0))
+            for _, distance, bakery_id in ranked
+            if bakery_id in bakeries
+        ]
+
+    def _bakeries_within(self, lat, lng, radius_km):
+        """[(distance km, bakery id)] within a radius, from the R*Tree or a table scan"""
+        hits = bakery_spatial_index.within_radius(lat, lng, radius_km)
+        if hits is not None:
+            return hits
+        min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+        rows = db.session.execute(
+            select(Bakery.id, Bakery.latitude, Bakery.longitude)
+            .where(Bakery.latitude.between(min_lat, max_lat), Bakery.longitude.between(min_lng, max_lng))
+        )
+        hits = ((haversine_km(lat, lng, row.latitude, row.longitude), row.id) for row in rows)
+        return sorted(hit for hit in hits if hit[0] <= radius_km)
+
+    def _average_ratings(self, bakery_ids):
+        """{bakery id: average overall rating} for the reviewed bakeries among the ids"""
+        if not bakery_ids:
+            return {}
+        statement = select(BakeryReview.bakery_id, func.avg(BakeryReview.overall_rating)) \
+            .group_by(BakeryReview.bakery_id)
+        # Past a few hundred ids, aggregating every bakery beats a long IN list
+        if len(bakery_ids) <= 500:
+            statement = statement.where(BakeryReview.bakery_id.in_(bakery_ids))
+        return {bakery_id: float(average) for bakery_id, average in db.session.execute(statement)}
 
     def search_bakeries(self, search_term):
-        """Search bakeries by name using case-insensitive partial matching"""
-        return Bakery.query.filter(Bakery.name.ilike(f'%{search_term}%')).order_by(Bakery.name).all()
+        """Search bakeries by name and street, best match first (word prefixes, accent-insensitive)"""
+        if is_known_missing('bakery_search', search_term):
+            return []
+
+        bakeries = bakery_search_index.results(search_term)
+        if bakeries is None:
+            bakeries = Bakery.query.filter(Bakery.name.ilike(f'%{search_term}%')).order_by(Bakery.name_sort_key).all()
+        if not bakeries:
+            remember_missing('bakery_search', search_term)
+        return bakeries
     
+    @serialized_write
     def create_bakery(self, name, zip_code, street_name=None, street_number=None, image_url=None, website_url=None):
         """Create a new bakery with transaction support"""
         try:
@@ -56,6 +262,7 @@ class BakeryService:
             db.session.rollback()
             raise Exception(f"Database error: {str(e)}")
     
+    @serialized_write
     def update_bakery(self, bakery_id, name, zip_code, street_name=None, street_number=None, image_url=None, website_url=None):
         """Update an existing bakery with transaction support"""
         try:
@@ -76,6 +283,7 @@ class BakeryService:
             db.session.rollback()
             raise Exception(f"Database error: {str(e)}")
     
+    @serialized_write
     def delete_bakery(self, bakery_id):
         """Delete a bakery"""
         try:
@@ -92,66 +300,33 @@ class BakeryService:
 
     def get_bakery_stats(self, bakery_id):
         """Get statistics for a bakery including review averages"""
-        bakery = Bakery.query.get(bakery_id)
+        if is_known_missing('bakery', bakery_id):
+            raise Exception("Bakery not found")
+
+        bakery = load_entity(Bakery, bakery_id)
         if not bakery:
+            remember_missing('bakery', bakery_id)
             raise Exception("Bakery not found")
 
-        reviews = BakeryReview.query.filter_by(bakery_id=bakery_id).all()
-        
-        # Default stats with zero values
-        stats = {
-            "id": bakery.id,
-            "name": bakery.name,
-            "zipCode": bakery.zip_code,
-            "streetName": bakery.street_name,
-            "streetNumber": bakery.street_number,
-            "imageUrl": bakery.image_url,
-            "websiteUrl": bakery.website_url,
-            "review_count": 0,
-            "average_rating": 0,
-            "ratings": {
-                "overall": 0,
-                "service": 0,
-                "price": 0,
-                "atmosphere": 0,
-                "location": 0
-            }
-        }
-        
-        # If no reviews, return default stats
-        if not reviews:
-            return stats
+        # Computed once per request, however many callers ask
+        return get_loader().derived('bakery_stats', bakery_id, lambda: self._bakery_stats(bakery))
 
-        # Calculate stats based on reviews
-        valid_reviews = [r for r in reviews if isinstance(r.overall_rating, (int, float))]
-        review_count = len(valid_reviews)
-        
-        if review_count > 0:
-            # Calculate averages using valid reviews only
-            def safe_avg(attr):
-                valid_values = [getattr(r, attr) for r in valid_reviews 
-                               if isinstance(getattr(r, attr), (int, float))]
-                return sum(valid_values) / len(valid_values) if valid_values else 0
-            
-            avg_overall = safe_avg('overall_rating')
-            avg_service = safe_avg('service_rating')
-            avg_price = safe_avg('price_rating')
-            avg_atmosphere = safe_avg('atmosphere_rating')
-            avg_location = safe_avg('location_rating')
-            
-            stats.update({
-                "review_count": review_count,
-                "average_rating": avg_overall,
-                "ratings": {
-                    "overall": avg_overall,
-                    "service": avg_service,
-                    "price": avg_price,
-                    "atmosphere": avg_atmosphere,
-                    "location": avg_location
-                }
-            })
-        
-        return stats
+    def get_bakery_profile(self, bakery_id):
+        """Bakery stats with its products and latest reviews, or None if there is no such bakery"""
+        if is_known_missing('bakery', bakery_id):
+            return None
+        rows = {part: db.session.execute(statement, {'bakery_id': bakery_id}).all()
+                for part, statement in PROFILE_STATEMENTS.items()}
+        profile = profile_from_rows(rows)
+        if profile is None:
+            remember_missing('bakery', bakery_id)
+        return profile
+
+    def _bakery_stats(self, bakery):
+        # Averaged in SQL over the rating columns only, which the covering
+        # review index answers without visiting the table
+        ratings = db.session.execute(PROFILE_STATEMENTS['ratings'], {'bakery_id': bakery.id}).one()
+        return stats_from_rows(bakery, ratings)
 
     def get_top_rated_bakeries(self, limit=5):
         """Get top-rated bakeries based on average overall rating"""
@@ -166,4 +341,16 @@ class BakeryService:
         )
         
         # Return the top-rated bakeries up to the limit
-        return top_bakeries[:limit]
\ No newline at end of file
+        return top_bakeries[:limit]
+
+
+@on_commit('bakery')
+def _forget_missing_bakeries(changes):
+    """Drop negative cache entries that a committed bakery write made wrong"""
+    if not has_app_context():
+        return
+    for change in changes:
+        if change.op == 'insert':
+            forget_missing('bakery', change.id)
+    if any(change.op in ('insert', 'update') for change in changes):
+        invalidate_missing_searches('bakery_search')
@@ -1,22 +1,25 @@
 from backend.extensions import db
 from backend.models import Category, Subcategory
 from sqlalchemy.exc import SQLAlchemyError
+from backend.utils.entity_loader import load_entity
+from backend.utils.write_coordinator import serialized_write
 
 class CategoryService:
     """Service class for category-related business logic"""
 
     def get_all_categories(self):
         """Get all categories ordered by name"""
-        return Category.query.order_by(Category.name).all()
+        return Category.query.order_by(Category.name_sort_key).all()
 
     def get_category_by_id(self, category_id):
         """Get a specific category by ID"""
-        return Category.query.get(category_id)
+        return load_entity(Category, category_id)
 
     def get_subcategories_by_category(self, category_id):
         """Get all subcategories for a specific category"""
-        return Subcategory.query.filter_by(category_id=category_id).order_by(Subcategory.name).all()
+        return Subcategory.query.filter_by(category_id=category_id).order_by(Subcategory.name_sort_key).all()
 
+    @serialized_write
     def create_category(self, name):
         """Create a new category"""
         try:
@@ -28,6 +31,7 @@ class CategoryService:
             db.session.rollback()
             raise Exception(f"Database error: {str(e)}")
 
+    @serialized_write
     def update_category(self, category_id, name):
         """Update an existing category"""
         try:
@@ -42,6 +46,7 @@ class CategoryService:
             db.session.rollback()
             raise Exception(f"Database error: {str(e)}")
 
+    @serialized_write
     def delete_category(self, category_id):
         """Delete a category"""
         try:
@@ -61,16 +66,17 @@ class SubcategoryService:
 
     def get_all_subcategories(self):
         """Get all subcategories ordered by name"""
-        return Subcategory.query.order_by(Subcategory.name).all()
+        return Subcategory.query.order_by(Subcategory.name_sort_key).all()
 
     def get_subcategory_by_id(self, subcategory_id):
         """Get a specific subcategory by ID"""
-        return Subcategory.query.get(subcategory_id)
+        return load_entity(Subcategory, subcategory_id)
 
     def get_subcategories_by_category(self, category_id):
         """Get all subcategories for a specific category"""
-        return Subcategory.query.filter_by(category_id=category_id).order_by(Subcategory.name).all()
+        return Subcategory.query.filter_by(category_id=category_id).order_by(Subcategory.name_sort_key).all()
 
+    @serialized_write
     def create_subcategory(self, name, category_id):
         """Create a new subcategory"""
         try:
@@ -82,6 +88,7 @@ class SubcategoryService:
             db.session.rollback()
             raise Exception(f"Database error: {str(e)}")
 
+    @serialized_write
     def update_subcategory(self, subcategory_id, name, category_id=None):
         """Update an existing subcategory"""
         try:
@@ -99,6 +106,7 @@ class SubcategoryService:
             db.session.rollback()
             raise Exception(f"Database error: {str(e)}")
 
+    @serialized_write
     def delete_subcategory(self, subcategory_id):
         """Delete a subcategory"""
         try:
@@ -0,0 +1,244 @@
+"""
+Immutable in-process snapshot of the category tree.
+
+Categories and subcategories change a few times a year, so the whole tree is
+built with a single query and kept per app. Reads and membership checks are
+served from the snapshot; any committed write to categories, subcategories or
+products swaps in a fresh one on the next read.
+"""
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+from flask import current_app, has_app_context
+from sqlalchemy import literal, null, select, union_all
+
+from backend.extensions import db
+from backend.models import Category, Subcategory, Product
+from backend.utils.change_tracking import on_commit
+from backend.utils.db_routing import PRIMARY, read_from
+from backend.utils.collation import danish_sort_key
+
+CategoryNode = namedtuple('CategoryNode', [
+    'id', 'name', 'created_at', 'updated_at', 'subcategory_ids', 'product_ids'
+])
+SubcategoryNode = namedtuple('SubcategoryNode', [
+    'id', 'name', 'category_id', 'created_at', 'updated_at', 'product_ids'
+])
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def _to_id(value):
+    """Coerce ids coming from JSON payloads, which may be strings"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class CategoryTree:
+    """A read-only view of all categories and subcategories"""
+
+    def __init__(self, categories, subcategories, generation):
+        self.generation = generation
+        self.built_at = time.monotonic()
+
+        self.categories = MappingProxyType(categories)
+        self.subcategories = MappingProxyType(subcategories)
+
+        # Pre-serialized payloads, in the same shape as CategorySchema/SubcategorySchema
+        self._subcategory_payloads = MappingProxyType({
+            s.id: self._subcategory_payload(s, categories.get(s.category_id))
+            for s in subcategories.values()
+        })
+        self._category_payloads = MappingProxyType({
+            c.id: self._category_payload(c, subcategories) for c in categories.values()
+        })
+        self._ordered_categories = tuple(
+            self._category_payloads[c.id] for c in sorted(categories.values(), key=lambda c: danish_sort_key(c.name))
+        )
+        self._ordered_subcategories = tuple(
+            self._subcategory_payloads[s.id] for s in sorted(subcategories.values(), key=lambda s: danish_sort_key(s.name))
+        )
+
+    @staticmethod
+    def _subcategory_payload(node, category):
+        return {
+            "id": node.id,
+            "name": node.name,
+            "categoryId": node.category_id,
+            "category": {"id": category.id, "name": category.name} if category else None,
+            "products": list(node.product_ids),
+            "productCount": len(node.product_ids),
+            "created_at": _isoformat(node.created_at),
+            "updated_at": _isoformat(node.updated_at),
+        }
+
+    @staticmethod
+    def _category_payload(node, subcategories):
+        children = sorted((subcategories[i] for i in node.subcategory_ids), key=lambda s: danish_sort_key(s.name))
+        return {
+            "id": node.id,
+            "name": node.name,
+            "subcategories": [
+                {
+                    "id": s.id,
+                    "name": s.name,
+                    "categoryId": s.category_id,
+                    "products": list(s.product_ids),
+                    "productCount": len(s.product_ids),
+                    "created_at": _isoformat(s.created_at),
+                    "updated_at": _isoformat(s.updated_at),
+                }
+                for s in children
+            ],
+            "products": list(node.product_ids),
+            "productCount": len(node.product_ids),
+            "created_at": _isoformat(node.created_at),
+            "updated_at": _isoformat(node.updated_at),
+        }
+
+    # === Reads ===
+
+    def all_categories(self):
+        """Serialized categories ordered by name"""
+        return list(self._ordered_categories)
+
+    def get_category(self, category_id):
+        """Serialized category, or None"""
+        return self._category_payloads.get(category_id)
+
+    def all_subcategories(self):
+        """Serialized subcategories ordered by name"""
+        return list(self._ordered_subcategories)
+
+    def get_subcategory(self, subcategory_id):
+        """Serialized subcategory, or None"""
+        return self._subcategory_payloads.get(subcategory_id)
+
+    def subcategories_of(self, category_id):
+        """Serialized subcategories of a category ordered by name, or None if it doesn't exist"""
+        category = self.categories.get(category_id)
+        if category is None:
+            return None
+        children = sorted((self.subcategories[i] for i in category.subcategory_ids), key=lambda s: danish_sort_key(s.name))
+        return [self._subcategory_payloads[s.id] for s in children]
+
+    # === Validation ===
+
+    def has_category(self, category_id):
+        return _to_id(category_id) in self.categories
+
+    def has_subcategory(self, subcategory_id):
+        return _to_id(subcategory_id) in self.subcategories
+
+    def subcategory_belongs_to(self, subcategory_id, category_id):
+        """True if the subcategory exists and belongs to the category"""
+        node = self.subcategories.get(_to_id(subcategory_id))
+        return node is not None and node.category_id == _to_id(category_id)
+
+
+@read_from(PRIMARY)
+def _load_tree(generation):
+    """Build a CategoryTree from a single UNION ALL query"""
+    statement = union_all(
+        select(
+            literal('category').label('kind'), Category.id, Category.name,
+            null().label('parent_id'), null().label('subcategory_id'),
+            Category.created_at, Category.updated_at,
+        ),
+        select(
+            literal('subcategory'), Subcategory.id, Subcategory.name,
+            Subcategory.category_id, null(),
+            Subcategory.created_at, Subcategory.updated_at,
+        ),
+        select(
+            literal('product'), Product.id, null(),
+            Product.category_id, Product.subcategory_id,
+            null(), null(),
+        ),
+    )
+
+    category_rows, subcategory_rows = {}, {}
+    category_children, category_products, subcategory_products = {}, {}, {}
+    for kind, row_id, name, parent_id, subcategory_id, created_at, updated_at in db.session.execute(statement):
+        if kind == 'category':
+            category_rows[row_id] = (name, created_at, updated_at)
+        elif kind == 'subcategory':
+            subcategory_rows[row_id] = (name, parent_id, created_at, updated_at)
+            category_children.setdefault(parent_id, []).append(row_id)
+        else:
+            if parent_id is not None:
+                category_products.setdefault(parent_id, []).append(row_id)
+            if subcategory_id is not None:
+                subcategory_products.setdefault(subcategory_id, []).append(row_id)
+
+    categories = {
+        cid: CategoryNode(
+            id=cid, name=name, created_at=created_at, updated_at=updated_at,
+            subcategory_ids=tuple(sorted(category_children.get(cid, ()))),
+            product_ids=tuple(sorted(category_products.get(cid, ()))),
+        )
+        for cid, (name, created_at, updated_at) in category_rows.items()
+    }
+    subcategories = {
+        sid: SubcategoryNode(
+            id=sid, name=name, category_id=category_id,
+            created_at=created_at, updated_at=updated_at,
+            product_ids=tuple(sorted(subcategory_products.get(sid, ()))),
+        )
+        for sid, (name, category_id, created_at, updated_at) in subcategory_rows.items()
+    }
+    return CategoryTree(categories, subcategories, generation)
+
+
+class _TreeHolder:
+    """Per-app holder that swaps snapshots atomically"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.tree = None
+
+    def invalidate(self):
+        self.generation += 1
+
+    def get(self, max_age):
+        tree = self.tree
+        if tree is not None and tree.generation == self.generation and time.monotonic() - tree.built_at < max_age:
+            return tree
+
+        with self.lock:
+            tree = self.tree
+            if tree is None or tree.generation != self.generation or time.monotonic() - tree.built_at >= max_age:
+                tree = _load_tree(self.generation)
+                self.tree = tree
+            return tree
+
+
+def _holder():
+    return current_app.extensions.setdefault('category_tree', _TreeHolder())
+
+
+def get_category_tree():
+    """Return the current category tree, rebuilding it if it is stale.
+
+    ``CATEGORY_TREE_MAX_AGE`` bounds how long a snapshot lives, which also
+    limits staleness when another worker process made the write.
+    """
+    return _holder().get(current_app.config.get('CATEGORY_TREE_MAX_AGE', 300))
+
+
+def invalidate_category_tree():
+    """Force the next read to rebuild the tree"""
+    _holder().invalidate()
+
+
+@on_commit('category', 'subcategory', 'product')
+def _invalidate_on_write(changes):
+    if has_app_context():
+        invalidate_category_tree()
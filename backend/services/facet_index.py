@@ -0,0 +1,289 @@
+"""
+Faceted search over bakeries and products using in-memory bitmaps.
+
+For every facet value (a zip code, a category, a minimum rating...) the
+snapshot keeps a bitmap with one bit per bakery or product id, stored as a
+Python int. Filtering ANDs the bitmaps of the selected values together, and
+a facet count is the popcount of a facet value's bitmap ANDed with the
+other filters. The cost depends on the number of facet values, not on how
+many rows match.
+
+The snapshot is built from a handful of aggregate queries. It is swapped
+out on the next read after any committed write to the tables it's built
+from.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import func, select
+
+from backend.extensions import db
+from backend.models import Bakery, Product, BakeryReview, ProductReview
+from backend.utils.change_tracking import on_commit
+from backend.utils.db_routing import PRIMARY, read_from
+from backend.utils.collation import danish_sort_key
+from backend.utils.search_index import fold
+from backend.services.bakery_service import bakery_search_index
+from backend.services.product_service import product_search_index
+
+# Thresholds offered as facet values (overall ratings are 1-10)
+RATING_STEPS = (5, 6, 7, 8, 9)
+REVIEW_COUNT_STEPS = (1, 5, 10, 25, 50)
+
+# Facets that select one or more discrete values
+VALUE_FACETS = ('zipCode', 'category', 'subcategory')
+
+SORTS = ('relevance', 'rating', 'reviews', 'name')
+
+# One page of results: ids in order, total matches, facet counts, and the FacetSet for ratings
+SearchPage = namedtuple('SearchPage', ['ids', 'total', 'facets', 'facet_set'])
+
+
+# === Bitmaps ===
+
+def to_bitmap(ids):
+    """Bitmap with the bit of every id set"""
+    ids = list(ids)
+    if not ids:
+        return 0
+    buffer = bytearray(max(ids) // 8 + 1)
+    for i in ids:
+        buffer[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def bitmap_ids(bitmap):
+    """Ids of the set bits, ascending"""
+    bits = bin(bitmap)[:1:-1]
+    ids = []
+    position = bits.find('1')
+    while position != -1:
+        ids.append(position)
+        position = bits.find('1', position + 1)
+    return ids
+
+
+class FacetSet:
+    """Bitmaps and sort keys for one kind of entity"""
+
+    def __init__(self, names, values, ratings, review_counts):
+        self.names = names                  # id -> name
+        self.ratings = ratings              # id -> average overall rating
+        self.review_counts = review_counts  # id -> number of reviews
+        self.all = to_bitmap(names)
+        self.facets = {
+            facet: {value: to_bitmap(ids) for value, ids in by_value.items()}
+            for facet, by_value in values.items()
+        }
+        self.steps = {
+            'minRating': {step: self._reaching('minRating', step) for step in RATING_STEPS},
+            'minReviews': {step: self._reaching('minReviews', step) for step in REVIEW_COUNT_STEPS},
+        }
+
+    def _reaching(self, facet, threshold):
+        source = self.ratings if facet == 'minRating' else self.review_counts
+        return to_bitmap(i for i, value in source.items() if value >= threshold)
+
+    def at_least(self, facet, threshold):
+        """Bitmap of ids whose rating or review count reaches the threshold.
+
+        Only the facet steps are kept; any other threshold comes from the
+        client and is computed per call, so it can't grow the snapshot.
+        """
+        bitmap = self.steps[facet].get(threshold)
+        return self._reaching(facet, threshold) if bitmap is None else bitmap
+
+    def name_matches(self, term):
+        """Bitmap of ids whose folded name contains the folded term"""
+        term = fold(term)
+        return to_bitmap(i for i, name in self.names.items() if term in fold(name))
+
+    def search(self, selected, min_rating=None, min_reviews=None, within=None):
+        """Filter and count.
+
+        ``selected`` maps a value facet to the values picked for it (OR within
+        a facet, AND across facets). ``within`` restricts everything to a
+        bitmap, e.g. full-text matches. Returns the matching bitmap and facet
+        counts, each facet counted with every filter except its own.
+        """
+        clauses = {}
+        for facet, values in selected.items():
+            bitmaps = self.facets[facet]
+            clause = 0
+            for value in values:
+                clause |= bitmaps.get(value, 0)
+            clauses[facet] = clause
+        if min_rating:
+            clauses['minRating'] = self.at_least('minRating', min_rating)
+        if min_reviews:
+            clauses['minReviews'] = self.at_least('minReviews', min_reviews)
+
+        base = self.all if within is None else self.all & within
+
+        def scope(excluded=None):
+            bitmap = base
+            for facet, clause in clauses.items():
+                if facet != excluded:
+                    bitmap &= clause
+            return bitmap
+
+        counts = {}
+        for facet in VALUE_FACETS:
+            facet_scope = scope(facet)
+            counts[facet] = {
+                value: count
+                for value, bitmap in self.facets[facet].items()
+                if (count := (bitmap & facet_scope).bit_count())
+            }
+        for facet, steps in self.steps.items():
+            facet_scope = scope(facet)
+            counts[facet] = {step: (bitmap & facet_scope).bit_count() for step, bitmap in steps.items()}
+        return scope(), counts
+
+    def order(self, ids, sort):
+        """Sort ids by 'rating', 'reviews' or 'name'"""
+        def by_name(i):
+            return danish_sort_key(self.names[i])
+
+        if sort == 'name':
+            return sorted(ids, key=by_name)
+        if sort == 'reviews':
+            return sorted(ids, key=lambda i: (-self.review_counts.get(i, 0), by_name(i)))
+        return sorted(ids, key=lambda i: (-self.ratings.get(i, 0), -self.review_counts.get(i, 0), by_name(i)))
+
+
+class FacetIndex:
+    """Facet snapshot for bakeries and products"""
+
+    def __init__(self, bakeries, products, generation):
+        self.bakeries = bakeries
+        self.products = products
+        self.generation = generation
+        self.built_at = time.monotonic()
+
+
+def _review_stats(review_model, key_column):
+    statement = select(key_column, func.avg(review_model.overall_rating), func.count(review_model.id)) \
+        .group_by(key_column)
+    ratings, counts = {}, {}
+    for entity_id, average, count in db.session.execute(statement):
+        ratings[entity_id] = float(average or 0)
+        counts[entity_id] = count
+    return ratings, counts
+
+
+def _group(pairs):
+    grouped = {}
+    for value, entity_id in pairs:
+        if value is not None:
+            grouped.setdefault(value, []).append(entity_id)
+    return grouped
+
+
+@read_from(PRIMARY)
+def _build_index(generation):
+    bakery_rows = db.session.execute(select(Bakery.id, Bakery.name, Bakery.zip_code)).all()
+    bakery_categories = db.session.execute(
+        select(Product.bakery_id, Product.category_id, Product.subcategory_id).distinct()
+    ).all()
+    ratings, counts = _review_stats(BakeryReview, BakeryReview.bakery_id)
+    bakeries = FacetSet(
+        names={row.id: row.name for row in bakery_rows},
+        values={
+            'zipCode': _group((row.zip_code, row.id) for row in bakery_rows),
+            'category': _group((category_id, bakery_id) for bakery_id, category_id, _ in bakery_categories),
+            'subcategory': _group((subcategory_id, bakery_id) for bakery_id, _, subcategory_id in bakery_categories),
+        },
+        ratings=ratings,
+        review_counts=counts,
+    )
+
+    product_rows = db.session.execute(
+        select(Product.id, Product.name, Product.category_id, Product.subcategory_id, Bakery.zip_code)
+        .join(Bakery, Product.bakery_id == Bakery.id)
+    ).all()
+    ratings, counts = _review_stats(ProductReview, ProductReview.product_id)
+    products = FacetSet(
+        names={row.id: row.name for row in product_rows},
+        values={
+            'zipCode': _group((row.zip_code, row.id) for row in product_rows),
+            'category': _group((row.category_id, row.id) for row in product_rows),
+            'subcategory': _group((row.subcategory_id, row.id) for row in product_rows),
+        },
+        ratings=ratings,
+        review_counts=counts,
+    )
+    return FacetIndex(bakeries, products, generation)
+
+
+class _IndexHolder:
+    """Per-app holder that swaps snapshots atomically"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.index = None
+
+    def invalidate(self):
+        self.generation += 1
+
+    def get(self, max_age):
+        index = self.index
+        if index is not None and index.generation == self.generation and time.monotonic() - index.built_at < max_age:
+            return index
+        with self.lock:
+            index = self.index
+            if index is None or index.generation != self.generation or time.monotonic() - index.built_at >= max_age:
+                index = _build_index(self.generation)
+                self.index = index
+            return index
+
+
+def _holder():
+    return current_app.extensions.setdefault('facet_index', _IndexHolder())
+
+
+def get_facet_index():
+    """Return the current facet snapshot, rebuilding it if it is stale.
+
+    ``FACET_INDEX_MAX_AGE`` bounds how long a snapshot lives, which also
+    limits staleness when another worker process made the write.
+    """
+    return _holder().get(current_app.config.get('FACET_INDEX_MAX_AGE', 300))
+
+
+def faceted_search(kind, selected, min_rating=None, min_reviews=None, q=None,
+                   sort=None, page=1, page_size=20):
+    """Filter bakeries or products and return one page of ids with facet counts"""
+    index = get_facet_index()
+    facet_set = index.bakeries if kind == 'bakeries' else index.products
+
+    within, text_rank = None, None
+    if q:
+        search_index = bakery_search_index if kind == 'bakeries' else product_search_index
+        text_ids = search_index.search(q)
+        if text_ids is None:
+            within = facet_set.name_matches(q)
+        else:
+            within = to_bitmap(text_ids)
+            text_rank = {entity_id: position for position, entity_id in enumerate(text_ids)}
+
+    matches, counts = facet_set.search(selected, min_rating, min_reviews, within)
+    ids = bitmap_ids(matches)
+    if sort is None:
+        sort = 'relevance' if text_rank is not None else 'rating'
+    if sort == 'relevance' and text_rank is not None:
+        ids.sort(key=text_rank.__getitem__)
+    else:
+        ids = facet_set.order(ids, sort)
+
+    start = (page - 1) * page_size
+    return SearchPage(ids[start:start + page_size], len(ids), counts, facet_set)
+
+
+@on_commit('bakery', 'product', 'bakery_review', 'product_review')
+def _invalidate_on_write(changes):
+    if has_app_context():
+        _holder().invalidate()
@@ -1,36 +1,81 @@
+from flask import has_app_context
 from backend.extensions import db
 from backend.models import Product, ProductReview
-from sqlalchemy import func
+from sqlalchemy import bindparam, func, select
 from sqlalchemy.exc import SQLAlchemyError
 from backend.models import Category, Subcategory
+from backend.utils.caching import (
+    remember_missing, is_known_missing, forget_missing, invalidate_missing_searches
+)
+from backend.utils.change_tracking import on_commit
+from backend.utils.entity_loader import get_loader, load_entity
+from backend.utils.search_index import FullTextIndex, register_index
+from backend.utils.write_coordinator import serialized_write
+
+# Full-text index over product names
+product_search_index = register_index(FullTextIndex(
+    'product_fts', Product,
+    columns={'name': (1.0, lambda p: p.name)},
+    watched=('name',),
+))
+
+# Hot reads, built once and executed with their parameters (see bakery_service)
+_ALL_PRODUCTS = select(Product).order_by(Product.name_sort_key)
+_PRODUCTS_BY = {
+    column: select(Product).where(getattr(Product, column) == bindparam('value')).order_by(Product.name_sort_key)
+    for column in ('bakery_id', 'category_id', 'subcategory_id')
+}
+# Review count and rating averages, read from the covering review index
+_PRODUCT_RATINGS = select(
+    func.count(ProductReview.overall_rating),
+    func.avg(ProductReview.overall_rating),
+    func.avg(ProductReview.taste_rating),
+    func.avg(ProductReview.price_rating),
+    func.avg(ProductReview.presentation_rating),
+).where(ProductReview.product_id == bindparam('product_id'))
 
 class ProductService:
     """Service class for product-related business logic"""
     
     def get_all_products(self):
         """Get all products ordered by name"""
-        return Product.query.order_by(Product.name).all()
+        return db.session.scalars(_ALL_PRODUCTS).all()
     
     def get_product_by_id(self, product_id):
         """Get a specific product by ID"""
-        return Product.query.get(product_id)
+        if is_known_missing('product', product_id):
+            return None
+
+        product = load_entity(Product, product_id)
+        if not product:
+            remember_missing('product', product_id)
+        return product
     
     def get_products_by_bakery(self, bakery_id):
         """Get products for a specific bakery"""
-        return Product.query.filter_by(bakery_id=bakery_id).order_by(Product.name).all()
+        return db.session.scalars(_PRODUCTS_BY['bakery_id'], {'value': bakery_id}).all()
     
     def get_products_by_category(self, category_id):
         """Get products by category"""
-        return Product.query.filter_by(category_id=category_id).order_by(Product.name).all()
+        return db.session.scalars(_PRODUCTS_BY['category_id'], {'value': category_id}).all()
     
     def get_products_by_subcategory(self, subcategory_id):
         """Get products by subcategory"""
-        return Product.query.filter_by(subcategory_id=subcategory_id).order_by(Product.name).all()
+        return db.session.scalars(_PRODUCTS_BY['subcategory_id'], {'value': subcategory_id}).all()
     
     def search_products(self, search_term):
-        """Search products by name"""
-        return Product.query.filter(Product.name.ilike(f'%{search_term}%')).order_by(Product.name).all()
+        """Search products by name, best match first (word prefixes, accent-insensitive)"""
+        if is_known_missing('product_search', search_term):
+            return []
+
+        products = product_search_index.results(search_term)
+        if products is None:
+            products = Product.query.filter(Product.name.ilike(f'%{search_term}%')).order_by(Product.name_sort_key).all()
+        if not products:
+            remember_missing('product_search', search_term)
+        return products
     
+    @serialized_write
     def create_product(self, name, bakery_id, category_id=None, subcategory_id=None, image_url=None):
         """Create a new product"""
         try:
@@ -48,6 +93,7 @@ class ProductService:
             db.session.rollback()
             raise Exception(f"Database error: {str(e)}")
     
+    @serialized_write
     def update_product(self, product_id, name, bakery_id, category_id=None, subcategory_id=None, image_url=None):
         """Update an existing product"""
         try:
@@ -67,6 +113,7 @@ class ProductService:
             db.session.rollback()
             raise Exception(f"Database error: {str(e)}")
     
+    @serialized_write
     def delete_product(self, product_id):
         """Delete a product"""
         try:
@@ -86,11 +133,16 @@ class ProductService:
         product = self.get_product_by_id(product_id)
         if not product:
             raise Exception("Product not found")
-            
-        # Get all reviews for this product
-        reviews = ProductReview.query.filter_by(product_id=product_id).all()
-        
-        if not reviews:
+
+        # Computed once per request, however many callers ask
+        return get_loader().derived('product_stats', product_id, lambda: self._product_stats(product))
+
+    def _product_stats(self, product):
+        review_count, avg_overall, avg_taste, avg_price, avg_presentation = db.session.execute(
+            _PRODUCT_RATINGS, {'product_id': product.id}
+        ).one()
+
+        if not review_count:
             return {
                 "id": product.id,
                 "name": product.name,
@@ -108,13 +160,6 @@ class ProductService:
                 }
             }
         
-        # Calculate averages
-        review_count = len(reviews)
-        avg_overall = sum(r.overall_rating for r in reviews) / review_count
-        avg_taste = sum(r.taste_rating for r in reviews) / review_count
-        avg_price = sum(r.price_rating for r in reviews) / review_count
-        avg_presentation = sum(r.presentation_rating for r in reviews) / review_count
-        
         return {
             "id": product.id,
             "name": product.name,
@@ -126,9 +171,9 @@ class ProductService:
             "average_rating": round(avg_overall, 1),
             "ratings": {
                 "overall": round(avg_overall, 1),
-                "taste": round(avg_taste, 1),
-                "price": round(avg_price, 1),
-                "presentation": round(avg_presentation, 1)
+                "taste": round(avg_taste or 0, 1),
+                "price": round(avg_price or 0, 1),
+                "presentation": round(avg_presentation or 0, 1)
             }
         }
         
@@ -156,4 +201,16 @@ class ProductService:
             }
             top_products.append(product_data)
             
-        return top_products
\ No newline at end of file
+        return top_products
+
+
+@on_commit('product')
+def _forget_missing_products(changes):
+    """Drop negative cache entries that a committed product write made wrong"""
+    if not has_app_context():
+        return
+    for change in changes:
+        if change.op == 'insert':
+            forget_missing('product', change.id)
+    if any(change.op in ('insert', 'update') for change in changes):
+        invalidate_missing_searches('product_search')
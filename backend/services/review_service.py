@@ -1,6 +1,39 @@
 from backend.extensions import db 
+from sqlalchemy import bindparam, select
 from sqlalchemy.exc import SQLAlchemyError
 from backend.models import BakeryReview, ProductReview 
+from backend.utils.search_index import FullTextIndex, register_index
+from backend.utils.entity_loader import load_entity
+from backend.utils.write_coordinator import serialized_write
+
+# Full-text indexes over review text
+bakery_review_search_index = register_index(FullTextIndex(
+    'bakery_review_fts', BakeryReview,
+    columns={'review': (1.0, lambda r: r.review)},
+    watched=('review',),
+))
+product_review_search_index = register_index(FullTextIndex(
+    'product_review_fts', ProductReview,
+    columns={'review': (1.0, lambda r: r.review)},
+    watched=('review',),
+))
+
+
+def _newest_first(model, column=None):
+    """Reviews of ``model`` newest first, filtered by ``column`` == :value when given; built once"""
+    statement = select(model)
+    if column is not None:
+        statement = statement.where(getattr(model, column) == bindparam('value'))
+    return statement.order_by(model.created_at.desc())
+
+
+# Hot reads, built once and executed with their parameters (see bakery_service)
+_ALL_BAKERY_REVIEWS = _newest_first(BakeryReview)
+_BAKERY_REVIEWS_BY_BAKERY = _newest_first(BakeryReview, 'bakery_id')
+_BAKERY_REVIEWS_BY_USER = _newest_first(BakeryReview, 'user_id')
+_ALL_PRODUCT_REVIEWS = _newest_first(ProductReview)
+_PRODUCT_REVIEWS_BY_PRODUCT = _newest_first(ProductReview, 'product_id')
+_PRODUCT_REVIEWS_BY_USER = _newest_first(ProductReview, 'user_id')
 
 class ReviewService:
 
@@ -10,20 +43,29 @@ class ReviewService:
     
     def get_all_bakery_reviews(self):
         """Get all bakery reviews ordered by creation date (newest first)"""
-        return BakeryReview.query.order_by(BakeryReview.created_at.desc()).all()
+        return db.session.scalars(_ALL_BAKERY_REVIEWS).all()
     
     def get_bakery_review_by_id(self, review_id):
         """Get a specific bakery review by ID"""
-        return BakeryReview.query.get(review_id)
+        return load_entity(BakeryReview, review_id)
     
     def get_bakery_reviews_by_bakery(self, bakery_id):
         """Get all reviews for a specific bakery"""
-        return BakeryReview.query.filter_by(bakery_id=bakery_id).order_by(BakeryReview.created_at.desc()).all()
+        return db.session.scalars(_BAKERY_REVIEWS_BY_BAKERY, {'value': bakery_id}).all()
     
     def get_bakery_reviews_by_user(self, user_id):
         """Get all bakery reviews by a specific user"""
-        return BakeryReview.query.filter_by(user_id=user_id).order_by(BakeryReview.created_at.desc()).all()
+        return db.session.scalars(_BAKERY_REVIEWS_BY_USER, {'value': user_id}).all()
+    
+    def search_bakery_reviews(self, search_term, limit=50):
+        """Search bakery review text, best match first"""
+        reviews = bakery_review_search_index.results(search_term, limit)
+        if reviews is None:
+            reviews = BakeryReview.query.filter(BakeryReview.review.ilike(f'%{search_term}%')) \
+                .order_by(BakeryReview.created_at.desc()).limit(limit).all()
+        return reviews
     
+    @serialized_write
     def create_bakery_review(self, review, overall_rating, service_rating, price_rating, 
                          atmosphere_rating, location_rating, user_id=None, bakery_id=None):
         """Create a new bakery review - user_id now optional"""
@@ -45,6 +87,7 @@ class ReviewService:
             db.session.rollback()
             raise Exception(f"Database error: {str(e)}")
     
+    @serialized_write
     def update_bakery_review(self, review_id, review, overall_rating, service_rating, price_rating, 
                          atmosphere_rating, location_rating, user_id=None, bakery_id=None):
         """Update an existing bakery review - user_id now optional"""
@@ -68,6 +111,7 @@ class ReviewService:
             db.session.rollback()
             raise Exception(f"Database error: {str(e)}")
     
+    @serialized_write
     def delete_bakery_review(self, review_id):
         """Delete a bakery review"""
         try:
@@ -86,20 +130,29 @@ class ReviewService:
     
     def get_all_product_reviews(self):
         """Get all product reviews ordered by creation date (newest first)"""
-        return ProductReview.query.order_by(ProductReview.created_at.desc()).all()
+        return db.session.scalars(_ALL_PRODUCT_REVIEWS).all()
     
     def get_product_review_by_id(self, review_id):
         """Get a specific product review by ID"""
-        return ProductReview.query.get(review_id)
+        return load_entity(ProductReview, review_id)
     
     def get_product_reviews_by_product(self, product_id):
         """Get all reviews for a specific product"""
-        return ProductReview.query.filter_by(product_id=product_id).order_by(ProductReview.created_at.desc()).all()
+        return db.session.scalars(_PRODUCT_REVIEWS_BY_PRODUCT, {'value': product_id}).all()
     
     def get_product_reviews_by_user(self, user_id):
         """Get all product reviews by a specific user"""
-        return ProductReview.query.filter_by(user_id=user_id).order_by(ProductReview.created_at.desc()).all()
+        return db.session.scalars(_PRODUCT_REVIEWS_BY_USER, {'value': user_id}).all()
+    
+    def search_product_reviews(self, search_term, limit=50):
+        """Search product review text, best match first"""
+        reviews = product_review_search_index.results(search_term, limit)
+        if reviews is None:
+            reviews = ProductReview.query.filter(ProductReview.review.ilike(f'%{search_term}%')) \
+                .order_by(ProductReview.created_at.desc()).limit(limit).all()
+        return reviews
     
+    @serialized_write
     def create_product_review(self, review, overall_rating, taste_rating, price_rating, 
                          presentation_rating, user_id=None, product_id=None):
         """Create a new product review - user_id now optional"""
@@ -120,6 +173,7 @@ class ReviewService:
             db.session.rollback()
             raise Exception(f"Database error: {str(e)}")
     
+    @serialized_write
     def update_product_review(self, review_id, review, overall_rating, taste_rating, price_rating, 
                          presentation_rating, user_id=None, product_id=None):
         """Update an existing product review - user_id now optional"""
@@ -142,6 +196,7 @@ class ReviewService:
             db.session.rollback()
             raise Exception(f"Database error: {str(e)}")
     
+    @serialized_write
     def delete_product_review(self, review_id):
         """Delete a product review"""
         try:
@@ -0,0 +1,170 @@
+"""
+Relevance-ranked review search and "similar reviews" over TF-IDF vectors.
+
+Bakery and product reviews share one ``TfidfIndex`` (see
+``backend.utils.tfidf``), keyed by ``(type, review id)``, so a query or a
+review is compared against both kinds with the same term weights.
+
+The index is built on first use, from the file written by
+``manage.py build-review-vectors`` when ``REVIEW_VECTORS_PATH`` points at
+one, and otherwise from the database. A loaded file is caught up with the
+reviews written after it was built. Committed review writes are applied to
+the index in place.
+"""
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app, has_app_context
+from sqlalchemy import func, literal, select, union_all
+
+from backend.extensions import db
+from backend.models import BakeryReview, ProductReview
+from backend.utils.change_tracking import on_commit
+from backend.utils.db_routing import PRIMARY, read_from
+from backend.utils.tfidf import TfidfIndex
+
+# Review type -> model
+SOURCES = {
+    'bakery': BakeryReview,
+    'product': ProductReview,
+}
+
+# Table name -> review type
+_TYPES = {model.__tablename__: kind for kind, model in SOURCES.items()}
+
+
+def _review_rows(since=None):
+    """(type, id, text) of every review, or of those written since a timestamp"""
+    selects = []
+    for kind, model in SOURCES.items():
+        statement = select(literal(kind).label('kind'), model.id, model.review).where(model.review.isnot(None))
+        if since is not None:
+            statement = statement.where(model.updated_at >= since)
+        selects.append(statement)
+    return db.session.execute(union_all(*selects))
+
+
+def _watermark():
+    """Latest review write, as an ISO timestamp"""
+    latest = [db.session.scalar(select(func.max(model.updated_at))) for model in SOURCES.values()]
+    latest = [value if isinstance(value, str) else value.isoformat() for value in latest if value is not None]
+    return max(latest) if latest else ''
+
+
+@read_from(PRIMARY)
+def build_index():
+    """Vectorize every review"""
+    index = TfidfIndex()
+    index.built_at = time.monotonic()
+    for kind, review_id, text in _review_rows():
+        index.add((kind, review_id), text)
+    index.refit()
+    return index
+
+
+def save_index(path):
+    """Build the index from the database and write it to ``path``"""
+    watermark = _watermark()
+    index = build_index()
+    index.save(path, watermark=watermark)
+    return index
+
+
+@read_from(PRIMARY)
+def _load_index(path):
+    index, metadata = TfidfIndex.load(path)
+    if index is None:
+        return None
+    index.built_at = time.monotonic()
+    # Rows removed since are skipped when results are loaded
+    if metadata.get('watermark'):
+        for kind, review_id, text in _review_rows(since=datetime.fromisoformat(metadata['watermark'])):
+            index.add((kind, review_id), text)
+    return index
+
+
+class _IndexHolder:
+    """Per-app holder; rebuilds lazily and when the index gets old"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.index = None
+        self.loaded = False
+
+    def get(self, max_age, path):
+        index = self.index
+        if index is not None and time.monotonic() - index.built_at < max_age:
+            return index
+        with self.lock:
+            index = self.index
+            if index is None or time.monotonic() - index.built_at >= max_age:
+                index = None
+                if path and not self.loaded:
+                    index = _load_index(path)
+                    self.loaded = True
+                self.index = index if index is not None else build_index()
+            return self.index
+
+
+def _holder():
+    return current_app.extensions.setdefault('review_vectors', _IndexHolder())
+
+
+def get_review_index():
+    """Return the app's review vectors, building them on first use.
+
+    ``REVIEW_VECTORS_MAX_AGE`` bounds how long they live without a full
+    rebuild, which refreshes the term weights and limits staleness when
+    another worker process made a write.
+    """
+    config = current_app.config
+    return _holder().get(config.get('REVIEW_VECTORS_MAX_AGE', 3600), config.get('REVIEW_VECTORS_PATH'))
+
+
+def _load_reviews(matches):
+    """[(type, review, score)] in match order, skipping reviews deleted since they were indexed"""
+    by_key = {}
+    for kind, model in SOURCES.items():
+        ids = [review_id for (match_kind, review_id), _ in matches if match_kind == kind]
+        if ids:
+            by_key.update(((kind, review.id), review) for review in model.query.filter(model.id.in_(ids)))
+    return [(key[0], by_key[key], score) for key, score in matches if key in by_key]
+
+
+def _accept(kind):
+    return None if kind is None else (lambda key: key[0] == kind)
+
+
+def search_reviews(query, limit=20, kind=None):
+    """Reviews most relevant to a free-text query, optionally of one type"""
+    return _load_reviews(get_review_index().search(query, limit, _accept(kind)))
+
+
+def similar_reviews(review_type, review_id, limit=10, kind=None):
+    """Reviews closest to a review; None when the review has no indexed text"""
+    matches = get_review_index().similar((review_type, review_id), limit, _accept(kind))
+    if matches is None:
+        return None
+    return _load_reviews(matches)
+
+
+@on_commit(*_TYPES)
+def _apply_changes(changes):
+    """Patch the index with committed review text changes"""
+    if not has_app_context():
+        return
+    holder = _holder()
+    index = holder.index
+    if index is None:
+        return
+    for change in changes:
+        key = (_TYPES[change.table], change.id)
+        if change.op == 'delete':
+            index.remove(key)
+        elif 'review' in change.values:
+            index.add(key, change.values['review'])
+        else:
+            # Text wasn't loaded at flush time; SQL can't run here, so rebuild on next use
+            holder.index = None
+            return
@@ -0,0 +1,243 @@
+"""
+In-memory autocomplete index over bakery, product, category and subcategory names.
+
+Names are folded (see ``backend.utils.search_index``) and split into
+words. Each query word is matched against the word vocabulary two ways:
+as a prefix, through a sorted word list, and fuzzily, through a trigram
+index, so "kanelsnegel" still finds "Kanelsnegl". A name matches when every
+query word matches one of its words. Names are ranked by how well they
+match.
+
+The index is built once per app and patched in place from committed
+changes, so a rename costs a few dictionary updates rather than a rebuild.
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter, namedtuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import literal, select, union_all
+
+from backend.extensions import db
+from backend.models import Bakery, Product, Category, Subcategory
+from backend.utils.change_tracking import on_commit
+from backend.utils.db_routing import PRIMARY, read_from
+from backend.utils.search_index import fold, fold_for_index
+
+Suggestion = namedtuple('Suggestion', ['type', 'id', 'name', 'words'])
+
+# Source table -> suggestion type
+SOURCES = {
+    'bakery': Bakery,
+    'product': Product,
+    'category': Category,
+    'subcategory': Subcategory,
+}
+
+# Fuzzy matches below this trigram (Dice) similarity are ignored
+MIN_SIMILARITY = 0.6
+
+# Query words shorter than this only match as prefixes
+MIN_FUZZY_LENGTH = 4
+
+
+def _words(name):
+    return tuple(dict.fromkeys(fold(name).split()))
+
+
+def _indexed_words(name):
+    # Includes the plain o/a spelling of Danish words, so 'rugbrod' is a prefix match
+    return tuple(dict.fromkeys(fold_for_index(name).split()))
+
+
+def _trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SuggestIndex:
+    """Prefix and trigram index over entity names"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.built_at = time.monotonic()
+        self.entries = {}          # (type, id) -> Suggestion
+        self.vocabulary = []       # sorted distinct words
+        self.word_entries = {}     # word -> set of (type, id)
+        self.trigram_words = {}    # trigram -> set of words
+        self.trigram_counts = {}   # word -> number of distinct trigrams
+
+    # === Maintenance ===
+
+    def add(self, kind, entity_id, name):
+        """Insert or replace one entry"""
+        with self.lock:
+            self._remove((kind, entity_id))
+            if not name:
+                return
+            entry = Suggestion(kind, entity_id, name, _indexed_words(name))
+            self.entries[(kind, entity_id)] = entry
+            for word in entry.words:
+                holders = self.word_entries.get(word)
+                if holders is None:
+                    holders = self.word_entries[word] = set()
+                    insort(self.vocabulary, word)
+                    trigrams = _trigrams(word)
+                    self.trigram_counts[word] = len(trigrams)
+                    for trigram in trigrams:
+                        self.trigram_words.setdefault(trigram, set()).add(word)
+                holders.add((kind, entity_id))
+
+    def remove(self, kind, entity_id):
+        with self.lock:
+            self._remove((kind, entity_id))
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for word in entry.words:
+            holders = self.word_entries[word]
+            holders.discard(key)
+            if holders:
+                continue
+            del self.word_entries[word]
+            del self.trigram_counts[word]
+            del self.vocabulary[bisect_left(self.vocabulary, word)]
+            for trigram in _trigrams(word):
+                words = self.trigram_words[trigram]
+                words.discard(word)
+                if not words:
+                    del self.trigram_words[trigram]
+
+    # === Queries ===
+
+    def _prefix_words(self, prefix):
+        start = bisect_left(self.vocabulary, prefix)
+        for word in self.vocabulary[start:]:
+            if not word.startswith(prefix):
+                break
+            yield word
+
+    def _matching_words(self, query_word):
+        """{vocabulary word: score} for one query word"""
+        scores = {word: 1.0 for word in self._prefix_words(query_word)}
+        if query_word in scores:
+            scores[query_word] = 1.1  # exact word beats a longer completion
+
+        # Too short to say anything about typos
+        if len(query_word) < MIN_FUZZY_LENGTH:
+            return scores
+
+        query_trigrams = _trigrams(query_word)
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(self.trigram_words.get(trigram, ()))
+        for word, count in shared.items():
+            if word in scores:
+                continue
+            similarity = 2 * count / (len(query_trigrams) + self.trigram_counts[word])
+            if similarity >= MIN_SIMILARITY:
+                scores[word] = similarity * 0.9  # a typo match ranks below a prefix match
+        return scores
+
+    def suggest(self, query, limit=8, types=None):
+        """Best matching entries for a (partial, possibly misspelled) query"""
+        query_words = _words(query)
+        if not query_words:
+            return []
+
+        with self.lock:
+            totals = None
+            for query_word in query_words:
+                per_entry = {}
+                for word, score in self._matching_words(query_word).items():
+                    for key in self.word_entries[word]:
+                        if score > per_entry.get(key, 0):
+                            per_entry[key] = score
+                if totals is None:
+                    totals = per_entry
+                else:
+                    totals = {key: totals[key] + score for key, score in per_entry.items() if key in totals}
+                if not totals:
+                    return []
+
+            ranked = heapq.nsmallest(
+                limit,
+                (
+                    (score / len(query_words), self.entries[key])
+                    for key, score in totals.items()
+                    if types is None or key[0] in types
+                ),
+                key=lambda item: (-item[0], len(item[1].name), item[1].name.lower(), item[1].id),
+            )
+        return [
+            {"type": entry.type, "id": entry.id, "name": entry.name, "score": round(score, 3)}
+            for score, entry in ranked
+        ]
+
+
+@read_from(PRIMARY)
+def _build_index():
+    """Load every name with a single UNION ALL query"""
+    statement = union_all(*(
+        select(literal(kind).label('kind'), model.id, model.name) for kind, model in SOURCES.items()
+    ))
+    index = SuggestIndex()
+    for kind, entity_id, name in db.session.execute(statement):
+        index.add(kind, entity_id, name)
+    return index
+
+
+class _IndexHolder:
+    """Per-app holder; rebuilds lazily and when the snapshot gets old"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.index = None
+
+    def get(self, max_age):
+        index = self.index
+        if index is not None and time.monotonic() - index.built_at < max_age:
+            return index
+        with self.lock:
+            index = self.index
+            if index is None or time.monotonic() - index.built_at >= max_age:
+                index = _build_index()
+                self.index = index
+            return index
+
+
+def _holder():
+    return current_app.extensions.setdefault('suggest_index', _IndexHolder())
+
+
+def get_suggest_index():
+    """Return the app's suggest index, building it on first use.
+
+    ``SUGGEST_INDEX_MAX_AGE`` bounds how long it lives without a full rebuild,
+    which limits staleness when another worker process made a write.
+    """
+    return _holder().get(current_app.config.get('SUGGEST_INDEX_MAX_AGE', 600))
+
+
+@on_commit(*SOURCES)
+def _apply_changes(changes):
+    """Patch the index with committed name changes"""
+    if not has_app_context():
+        return
+    holder = _holder()
+    index = holder.index
+    if index is None:
+        return
+    for change in changes:
+        if change.op == 'delete':
+            index.remove(change.table, change.id)
+        elif 'name' in change.values:
+            index.add(change.table, change.id, change.values['name'])
+        else:
+            # Name wasn't loaded at flush time; SQL can't run here, so rebuild on next use
+            holder.index = None
+            return
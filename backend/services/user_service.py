@@ -1,8 +1,36 @@
+import base64
+import binascii
+import json
+import logging
 from flask_bcrypt import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import and_, column, literal, or_, select, tuple_, union_all
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
 from backend.extensions import db
 from backend.models.user_models import User
+from backend.utils.search_index import FullTextIndex, register_index
+
+logger = logging.getLogger(__name__)
+
+# Trigram index over username and email for substring search
+user_search_index = register_index(FullTextIndex(
+    'user_trigram', User,
+    columns={
+        'username': (1.0, lambda u: u.username),
+        'email': (1.0, lambda u: u.email),
+    },
+    watched=('username', 'email'),
+    tokenize='trigram',
+    normalize=str.lower,
+))
+
+SEARCH_MODES = ('prefix', 'substring')
+
+# The trigram index can't match terms shorter than this
+MIN_SUBSTRING_LENGTH = 3
+
+# Upper bound on rows read per query while skipping users already listed
+MAX_PREFIX_BATCH = 2000
 
 # Custom exceptions
 class UserAlreadyExists(Exception):
@@ -21,13 +49,47 @@ class PasswordMismatch(Exception):
     """Raised when the current password provided does not match."""
     pass
 
+class InvalidCursor(ValueError):
+    """Raised when a search cursor can't be decoded."""
+    pass
+
+
+def _prefix_range(column, prefix):
+    """``column LIKE 'prefix%'`` as a range, so an index on the column can serve it"""
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return and_(column >= prefix, column < upper)
+
+
+def encode_cursor(sort_key, user_id):
+    """Opaque cursor pointing just past a (sort key, id) position"""
+    return base64.urlsafe_b64encode(json.dumps([sort_key, user_id]).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        sort_key, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError, TypeError, UnicodeError):
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(sort_key, (str, type(None))) or not isinstance(user_id, int):
+        raise InvalidCursor("Invalid cursor")
+    return sort_key, user_id
+
+
+def _page(rows, limit):
+    """Split the limit + 1 fetched (user, sort key) rows into a page and the next cursor"""
+    if len(rows) <= limit:
+        return [user for user, _ in rows], None
+    rows = rows[:limit]
+    user, sort_key = rows[-1]
+    return [user for user, _ in rows], encode_cursor(sort_key, user.id)
+
 
 class UserService:
     """Service class for user-related business logic"""
 
     def get_all_users(self):
-        """Return all users ordered by username."""
-        return User.query.order_by(User.username).all()
+        """Return all users in Danish alphabetical order of their username."""
+        return User.query.order_by(User.username_sort_key).all()
 
     def get_user_by_id(self, user_id):
         """Return a user by their primary key."""
@@ -44,17 +106,80 @@ class UserService:
         """Return a user by username."""
         return User.query.filter_by(username=username).first()
 
-    def search_users(self, search_term):
-        """Search users by username or email substring."""
-        pattern = f"%{search_term}%"
-        return (
-            User.query.filter(
-                (User.username.ilike(pattern)) |
-                (User.email.ilike(pattern))
-            )
-            .order_by(User.username)
-            .all()
-        )
+    def search_users(self, search_term, limit=20, cursor=None, mode='prefix'):
+        """Search users by username or email, case-insensitively, a page at a time.
+
+        'prefix' matches the start of the username or email through the
+        indexed lowercase columns, ordered by the matched text. 'substring'
+        matches anywhere through the trigram index, oldest account first;
+        terms too short for trigrams match as prefixes. Returns the users and
+        the cursor of the next page (None on the last page).
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        term = search_term.strip().lower()
+        if not term:
+            return [], None
+        position = decode_cursor(cursor) if cursor else None
+
+        if mode == 'substring' and len(term) >= MIN_SUBSTRING_LENGTH:
+            if db.engine.dialect.name == 'sqlite':
+                try:
+                    return self._substring_page(term, limit, position)
+                except OperationalError as e:
+                    logger.warning(f"User trigram index unavailable, falling back to LIKE: {e}")
+            pattern = f"%{term}%"
+            statement = select(User, literal(None)).where(or_(User.username.ilike(pattern), User.email.ilike(pattern)))
+            if position:
+                statement = statement.where(User.id > position[1])
+            return _page(db.session.execute(statement.order_by(User.id).limit(limit + 1)).all(), limit)
+
+        return self._prefix_page(term, limit, position)
+
+    def _prefix_page(self, term, limit, position):
+        """Username and email matches, each read in index order and merged.
+
+        A user matching on both appears twice in the merged order and is kept
+        at the first of the two positions only.
+        """
+        page, seen = [], set()
+        batch = limit + 1
+        while True:
+            rows = self._prefix_matches(term, batch, position)
+            for user, sort_key, username_key, email_key in rows:
+                first_match = min(key for key in (username_key, email_key) if key.startswith(term))
+                if sort_key == first_match and user.id not in seen:
+                    seen.add(user.id)
+                    page.append((user, sort_key))
+            if len(page) > limit or len(rows) < batch:
+                return _page(page, limit)
+            # Only second positions so far; read further ahead
+            position = (rows[-1][1], rows[-1][0].id)
+            batch = min(batch * 2, MAX_PREFIX_BATCH)
+
+    def _prefix_matches(self, term, limit, position):
+        username_key, email_key = User.username_lower, User.email_lower
+        arms = []
+        for key in (username_key, email_key):
+            arm = select(User.id.label('id'), key.label('sort_key')).where(_prefix_range(key, term))
+            if position:
+                arm = arm.where(tuple_(key, User.id) > tuple_(*position))
+            arms.append(arm)
+        matches = union_all(*arms).order_by('sort_key', 'id').limit(limit).subquery()
+
+        statement = select(User, matches.c.sort_key, username_key, email_key) \
+            .join(matches, User.id == matches.c.id).order_by(matches.c.sort_key, matches.c.id)
+        return db.session.execute(statement).all()
+
+    def _substring_page(self, term, limit, position):
+        """Trigram matches in rowid order, which FTS5 can stream without sorting"""
+        matches = user_search_index.containing(term)
+        if position:
+            matches = matches.where(column('rowid') > position[1])
+        matches = matches.order_by(column('rowid')).limit(limit + 1).subquery()
+
+        statement = select(User, literal(None)).join(matches, User.id == matches.c.rowid).order_by(User.id)
+        return _page(db.session.execute(statement).all(), limit)
 
     def create_user(self, username, email, password, profile_picture=1, is_admin=False):
         """Create and persist a new user."""
@@ -0,0 +1,140 @@
+"""
+Zip-code level rollups: bakery count, review count and average rating per
+zip code, plus the rating rank of every bakery within its zip code.
+
+The rollups are built from two grouped queries (bakeries per zip code,
+reviews per bakery) and held per app. A committed bakery or bakery review
+write invalidates them and the next read rebuilds them.
+"""
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import func, select
+
+from backend.extensions import db
+from backend.models import Bakery, BakeryReview
+from backend.utils.change_tracking import on_commit
+from backend.utils.db_routing import PRIMARY, read_from
+from backend.utils.collation import danish_sort_key
+
+SORTS = ('rating', 'reviews', 'name')
+
+# Rollup of one zip code; average_rating is over all its reviews, None without any
+ZipRollup = namedtuple('ZipRollup', ['zip_code', 'bakery_count', 'review_count', 'average_rating'])
+
+# Review stats of one bakery; percentile is None for bakeries without reviews
+BakeryRank = namedtuple('BakeryRank', ['zip_code', 'review_count', 'average_rating', 'percentile'])
+
+
+def percentile_ranks(ratings):
+    """{key: percentile rank} of rated items: the share rated lower, counting ties as half"""
+    ordered = sorted(ratings.values())
+    total = len(ordered)
+    ranks = {}
+    for key, rating in ratings.items():
+        lower = bisect_left(ordered, rating)
+        equal = bisect_right(ordered, rating) - lower
+        ranks[key] = 100.0 * (lower + 0.5 * equal) / total
+    return ranks
+
+
+class ZipRollups:
+    """Rollups per zip code and ranks per bakery"""
+
+    def __init__(self, bakery_zips, review_stats, generation):
+        self.generation = generation
+        self.built_at = time.monotonic()
+
+        by_zip = {}
+        for bakery_id, zip_code in bakery_zips.items():
+            by_zip.setdefault(zip_code, []).append(bakery_id)
+
+        self.zips = {}
+        self.bakeries = {}
+        for zip_code, bakery_ids in by_zip.items():
+            ratings = {i: review_stats[i][1] for i in bakery_ids if i in review_stats}
+            ranks = percentile_ranks(ratings)
+            review_count = sum(review_stats[i][0] for i in ratings)
+            rating_sum = sum(review_stats[i][0] * review_stats[i][1] for i in ratings)
+            self.zips[zip_code] = ZipRollup(
+                zip_code, len(bakery_ids), review_count, rating_sum / review_count if review_count else None
+            )
+            for i in bakery_ids:
+                count, average = review_stats.get(i, (0, None))
+                self.bakeries[i] = BakeryRank(zip_code, count, average, ranks.get(i))
+
+    def rank(self, bakery_id):
+        return self.bakeries.get(bakery_id)
+
+    def order(self, bakeries, sort='rating'):
+        """Sort bakeries of a zip code by 'rating', 'reviews' or 'name'"""
+        def stats(bakery):
+            return self.bakeries.get(bakery.id) or BakeryRank(bakery.zip_code, 0, None, None)
+
+        def by_name(bakery):
+            return danish_sort_key(bakery.name)
+
+        if sort == 'name':
+            return sorted(bakeries, key=by_name)
+        if sort == 'reviews':
+            return sorted(bakeries, key=lambda b: (-stats(b).review_count, by_name(b)))
+        return sorted(bakeries, key=lambda b: (-(stats(b).average_rating or 0), -stats(b).review_count, by_name(b)))
+
+
+@read_from(PRIMARY)
+def _build_rollups(generation):
+    bakery_zips = dict(db.session.execute(select(Bakery.id, Bakery.zip_code)).all())
+    statement = select(BakeryReview.bakery_id, func.count(BakeryReview.id), func.avg(BakeryReview.overall_rating)) \
+        .where(BakeryReview.overall_rating.is_not(None)) \
+        .group_by(BakeryReview.bakery_id)
+    review_stats = {
+        bakery_id: (count, float(average))
+        for bakery_id, count, average in db.session.execute(statement)
+        if bakery_id in bakery_zips
+    }
+    return ZipRollups(bakery_zips, review_stats, generation)
+
+
+class _RollupHolder:
+    """Per-app holder that swaps snapshots atomically"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.rollups = None
+
+    def invalidate(self):
+        self.generation += 1
+
+    def get(self, max_age):
+        rollups = self.rollups
+        if rollups is not None and rollups.generation == self.generation and time.monotonic() - rollups.built_at < max_age:
+            return rollups
+        with self.lock:
+            rollups = self.rollups
+            if rollups is None or rollups.generation != self.generation or time.monotonic() - rollups.built_at >= max_age:
+                rollups = _build_rollups(self.generation)
+                self.rollups = rollups
+            return rollups
+
+
+def _holder():
+    return current_app.extensions.setdefault('zip_rollups', _RollupHolder())
+
+
+def get_zip_rollups():
+    """Return the current rollups, rebuilding them if they are stale.
+
+    ``ZIP_ROLLUPS_MAX_AGE`` bounds how long a snapshot lives, which also
+    limits staleness when another worker process made the write.
+    """
+    return _holder().get(current_app.config.get('ZIP_ROLLUPS_MAX_AGE', 300))
+
+
+@on_commit('bakery', 'bakery_review')
+def _invalidate_on_write(changes):
+    if has_app_context():
+        _holder().invalidate()
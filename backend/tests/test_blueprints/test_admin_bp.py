@@ -0,0 +1,89 @@
+import json
+import pytest
+from flask_jwt_extended import create_access_token
+
+from backend.models import User
+from backend.utils.caching import cache
+
+
+def _auth_headers(app, email):
+    # Look the user up here: the fixture's instance is detached once its app context ends
+    with app.app_context():
+        user = User.query.filter_by(email=email).first()
+        token = create_access_token(identity=str(user.id))
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def admin_headers(app, admin_user):
+    return _auth_headers(app, 'admin@test.com')
+
+
+def test_cache_stats_requires_admin(client, regular_user, app):
+    """Test that non-admins cannot read cache statistics."""
+    assert client.get('/admin/cache/stats').status_code == 401
+
+    response = client.get('/admin/cache/stats', headers=_auth_headers(app, 'user@test.com'))
+    assert response.status_code == 403
+
+
+def test_cache_stats_counts_hits_and_misses(client, admin_headers, app):
+    """Test per-prefix hit/miss/set counters."""
+    with app.app_context():
+        assert cache.get('view/products/1') is None
+        cache.set('view/products/1', {'products': [1, 2, 3]})
+        assert cache.get('view/products/1') == {'products': [1, 2, 3]}
+
+    response = client.get('/admin/cache/stats', headers=admin_headers)
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    stats = data['prefixes']['view/products']
+    assert stats['misses'] == 1
+    assert stats['sets'] == 1
+    assert stats['hits'] == 1
+    assert stats['recomputes'] == 1
+    assert stats['max_value_size'] > 0
+
+
+def test_unrefilled_misses_are_not_kept(client, app):
+    """Test that misses without a following set don't pile up."""
+    stats = app.extensions['cache_stats']
+    with app.app_context():
+        for term in range(5_000):
+            cache.get(f'neg/bakery/{term}')
+        assert len(stats._pending_misses()) == stats.MAX_PENDING_MISSES
+
+        client.get('/bakeries/999')
+        assert stats._pending_misses() == {}
+
+
+def test_metrics_exporter(client, admin_headers, app):
+    """Test that cache counters appear in the metrics export."""
+    with app.app_context():
+        cache.set('view/products/1', {'products': []})
+
+    response = client.get('/admin/metrics', headers=admin_headers)
+    assert response.status_code == 200
+    body = response.data.decode()
+    assert '# TYPE bakery_cache_hits_total counter' in body
+    assert 'bakery_cache_sets_total{prefix="view/products"} 1' in body
+
+
+def test_metrics_token(client, app):
+    """Test scraping with the configured metrics token."""
+    app.config['METRICS_TOKEN'] = 'scrape-me'
+    response = client.get('/admin/metrics', headers={'Authorization': 'Bearer scrape-me'})
+    assert response.status_code == 200
+
+
+def test_slow_queries(client, admin_headers, app, tmp_path):
+    """Test browsing the slow query log."""
+    app.config.update(SLOW_QUERY_LOG=str(tmp_path / 'slow.jsonl'), SLOW_QUERY_THRESHOLD_MS=0)
+    client.get('/bakeries/')
+
+    response = client.get('/admin/slow-queries?endpoint=bakery.get_bakeries&limit=5', headers=admin_headers)
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['threshold_ms'] == 0
+    assert 0 < data['count'] <= 5
+    assert all(entry['route']['endpoint'] == 'bakery.get_bakeries' for entry in data['queries'])
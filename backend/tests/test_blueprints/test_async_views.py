@@ -0,0 +1,100 @@
+import inspect
+import shutil
+
+import pytest
+from sqlalchemy import insert
+from backend.app import create_app
+from backend.config import TestingConfig
+from backend.extensions import db
+from backend.models import Bakery, BakeryReview, Product, User
+from backend.utils.async_db import async_database_url
+
+
+@pytest.fixture
+def database(tmp_path):
+    """A SQLite file with a bakery, two products and three reviews"""
+    uri = f"sqlite:///{tmp_path / 'bakery.db'}"
+    app = create_app(type('SeedConfig', (TestingConfig,), {'SQLALCHEMY_DATABASE_URI': uri}))
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(User), [{'username': 'ida', 'email': 'ida@example.com', 'password_hash': 'x'}])
+        bakery = Bakery(name='Bageri', zip_code='2200', street_name='Gade', street_number='1')
+        db.session.add(bakery)
+        db.session.flush()
+        db.session.add_all([Product(name='Rugbrød', bakery_id=bakery.id), Product(name='Boller', bakery_id=bakery.id)])
+        for overall, service in ((8, 6), (6, None), (10, 9)):
+            db.session.add(BakeryReview('God', overall, service, None, None, None, 1, bakery.id))
+        db.session.commit()
+        db.engine.dispose()
+    return uri
+
+
+def _app(uri, async_views):
+    config = type('AsyncConfig', (TestingConfig,), {'SQLALCHEMY_DATABASE_URI': uri, 'ASYNC_VIEWS': async_views})
+    return create_app(config)
+
+
+def test_async_database_url():
+    """Test that sync URLs are mapped to the async driver of the same database."""
+    assert str(async_database_url('sqlite:////tmp/bakery.db')) == 'sqlite+aiosqlite:////tmp/bakery.db'
+    assert str(async_database_url('postgresql://bakery@db/bakery')) == 'postgresql+asyncpg://bakery@db/bakery'
+    assert str(async_database_url('sqlite+aiosqlite:///x.db')) == 'sqlite+aiosqlite:///x.db'
+    with pytest.raises(ValueError):
+        async_database_url('oracle://db/bakery')
+
+
+@pytest.mark.parametrize('path', ['/bakeries/1/profile', '/bakeries/1/stats', '/bakeries/99/profile',
+                                  '/bakeries/99/stats'])
+def test_async_variants_match_sync_views(database, path):
+    """Test that the async variants are swapped in and answer exactly like the sync views."""
+    sync_app, async_app = _app(database, False), _app(database, True)
+    endpoint = path.split('/')[-1]
+    assert not inspect.iscoroutinefunction(inspect.unwrap(sync_app.view_functions[f'bakery.get_bakery_{endpoint}']))
+    assert inspect.iscoroutinefunction(inspect.unwrap(async_app.view_functions[f'bakery.get_bakery_{endpoint}']))
+
+    expected = sync_app.test_client().get(path)
+    response = async_app.test_client().get(path)
+    assert response.status_code == expected.status_code
+    assert response.get_json() == expected.get_json()
+
+
+def test_profile_content(database):
+    """Test the profile of the seeded bakery, served by the async view with its statements counted."""
+    app = _app(database, True)
+    app.config['QUERY_COUNT_HEADER'] = True
+    response = app.test_client().get('/bakeries/1/profile')
+    profile = response.get_json()
+    assert profile['review_count'] == 3
+    assert profile['ratings']['overall'] == 8
+    assert profile['ratings']['service'] == 7.5
+    assert [product['name'] for product in profile['products']] == ['Boller', 'Rugbrød']
+    assert [review['overallRating'] for review in profile['recentReviews']] == [10, 6, 8]
+    assert profile['recentReviews'][0]['username'] == 'ida'
+    assert int(response.headers['X-Query-Count']) >= 4
+
+
+def test_strong_reads_use_sync_view(database, tmp_path):
+    """Test that X-Read-Consistency: strong is served from the primary, not the async engine's replica."""
+    replica = tmp_path / 'replica.db'
+    shutil.copy(database.removeprefix('sqlite:///'), replica)
+    config = type('ReplicaConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': database, 'ASYNC_VIEWS': True,
+        'DATABASE_REPLICA_URL': f"sqlite:///{replica}", 'SQLALCHEMY_BINDS': {'replica': f"sqlite:///{replica}"},
+    })
+    app = create_app(config)
+    with app.app_context():
+        db.session.add(Product(name='Kanelsnegl', bakery_id=1))
+        db.session.commit()
+
+    client = app.test_client()
+    names = [product['name'] for product in client.get('/bakeries/1/profile').get_json()['products']]
+    assert names == ['Boller', 'Rugbrød']
+    response = client.get('/bakeries/1/profile', headers={'X-Read-Consistency': 'strong'})
+    assert [product['name'] for product in response.get_json()['products']] == ['Boller', 'Kanelsnegl', 'Rugbrød']
+
+
+def test_in_memory_database_keeps_sync_views():
+    """Test that there is no async engine, and no swapping, for an in-memory database."""
+    app = _app('sqlite://', True)
+    assert 'async_engine' not in app.extensions
+    assert not inspect.iscoroutinefunction(app.view_functions['bakery.get_bakery_profile'])
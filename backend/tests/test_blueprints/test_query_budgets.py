@@ -0,0 +1,28 @@
+import pytest
+from backend.models import Product
+from backend.utils.query_stats import query_budget
+
+# Statements a cold request may run, caches and session empty; raise a budget
+# only together with the change that needs it.
+BUDGETS = [
+    ('/bakeries/', 8),
+    ('/bakeries/top', 8),
+    ('/bakeries/{bakery}', 7),
+    ('/bakeries/{bakery}/stats', 4),
+    ('/bakeries/{bakery}/products', 5),
+    ('/products/', 6),
+    ('/products/{product}', 6),
+]
+
+
+@pytest.mark.parametrize('path, budget', BUDGETS)
+def test_endpoint_query_budget(app, client, sample_product, path, budget):
+    """Test that read endpoints stay within their statement budget."""
+    # Look the product up here: the fixture's instance is detached once its app context ends
+    with app.app_context():
+        product = Product.query.filter_by(name='Test Product').one()
+        url = path.format(bakery=product.bakery_id, product=product.id)
+    with app.app_context():
+        with query_budget(budget):
+            response = client.get(url)
+    assert response.status_code == 200
@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import event, insert
+from backend.extensions import db
+from backend.models import Bakery, BakeryReview, Category, Product, Subcategory, User
+
+
+def _catalog(start, size):
+    """Bakeries ``start``.., each with two products and two reviews by its own user"""
+    category = Category.query.filter_by(name='Brød').first()
+    if category is None:
+        category = Category(name='Brød')
+        db.session.add(category)
+        db.session.flush()
+        db.session.add(Subcategory(name='Rugbrød', category_id=category.id))
+        db.session.flush()
+    subcategory = Subcategory.query.filter_by(name='Rugbrød').one()
+    # Users straight into the table, skipping the slow password hashing
+    db.session.execute(insert(User), [
+        {'username': f'user{i}', 'email': f'user{i}@example.com', 'password_hash': 'x'}
+        for i in range(start, start + size)
+    ])
+    users = {user.username: user.id for user in User.query}
+    for i in range(start, start + size):
+        bakery = Bakery(name=f'Bageri {i}', zip_code='2200', street_name='Gade', street_number=str(i))
+        db.session.add(bakery)
+        db.session.flush()
+        for j in range(2):
+            db.session.add(Product(name=f'Brød {i}.{j}', bakery_id=bakery.id, category_id=category.id,
+                                   subcategory_id=subcategory.id))
+            db.session.add(BakeryReview(f'Review {i}.{j}', 8, None, None, None, None, users[f'user{i}'], bakery.id))
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def _queries(client, url):
+    count = 0
+
+    def counter(*args):
+        nonlocal count
+        count += 1
+
+    event.listen(db.engine, 'before_cursor_execute', counter)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', counter)
+    assert response.status_code == 200
+    db.session.expunge_all()
+    return count, response.get_json()
+
+
+@pytest.mark.parametrize('url', ['/bakeryreviews/', '/bakeryreviews/bakery/1', '/products/',
+                                 '/products/subcategory/1', '/bakeries/', '/bakeries/top?limit=20'])
+def test_list_query_count_is_constant(app, client, url):
+    """Test that a list endpoint runs as many queries for 12 rows as for 3."""
+    with app.app_context():
+        _catalog(0, 3)
+        small, _ = _queries(client, url)
+        _catalog(3, 9)
+        large, _ = _queries(client, url)
+        assert large == small
+
+
+def test_batched_dump_matches_lazy_dump(app, client):
+    """Test that batched relationships serialize the same as lazily loaded ones."""
+    with app.app_context():
+        _catalog(0, 3)
+        _, data = _queries(client, '/bakeryreviews/')
+        review = next(r for r in data['bakeryReviews'] if r['review'] == 'Review 1.0')
+        assert review['user'] == {'id': review['userId'], 'username': 'user1'}
+        assert review['bakery'] == {'id': review['bakeryId'], 'name': 'Bageri 1'}
+
+        _, data = _queries(client, '/products/')
+        product = data['products'][0]
+        assert product['bakery']['name'].startswith('Bageri')
+        assert product['category']['name'] == 'Brød'
+        assert product['subcategory']['name'] == 'Rugbrød'
@@ -0,0 +1,44 @@
+import pytest
+from backend.extensions import db
+from backend.models import Bakery, Category, Product, Subcategory
+from backend.schemas import BakerySchema, CategorySchema, ProductSchema, SubcategorySchema, UserSchema
+
+# schema -> columns that exist for indexing only
+INTERNAL_COLUMNS = [
+    (BakerySchema, ('name_sort_key',)),
+    (ProductSchema, ('name_sort_key',)),
+    (CategorySchema, ('name_sort_key',)),
+    (SubcategorySchema, ('name_sort_key',)),
+    (UserSchema, ('username_lower', 'email_lower', 'username_sort_key')),
+]
+
+
+@pytest.mark.parametrize('schema, columns', INTERNAL_COLUMNS)
+def test_internal_columns_are_not_exposed(schema, columns):
+    """Test that index-only columns are neither dumped nor loaded."""
+    fields = schema().fields
+    for column in columns:
+        assert column not in fields
+
+
+def test_dumps_leave_out_sort_keys(app):
+    """Test that serialized bakeries, products and categories carry no sort key."""
+    with app.app_context():
+        category = Category(name='Brød')
+        bakery = Bakery(name='Ørsted Bageri', zip_code='2200', street_name='Gade', street_number='1')
+        db.session.add_all([category, bakery])
+        db.session.flush()
+        subcategory = Subcategory(name='Rugbrød', category_id=category.id)
+        product = Product(name='Æbleskiver', bakery_id=bakery.id, category_id=category.id)
+        db.session.add_all([subcategory, product])
+        db.session.commit()
+
+        bakery_data = BakerySchema().dump(bakery)
+        assert 'name_sort_key' not in bakery_data
+        assert all('name_sort_key' not in p for p in bakery_data['products'])
+        assert 'name_sort_key' not in ProductSchema().dump(product)
+        assert 'name_sort_key' not in CategorySchema().dump(category)
+        assert 'name_sort_key' not in SubcategorySchema().dump(subcategory)
+
+        errors = BakerySchema().validate({'name': 'Bageri', 'zipCode': '2200', 'name_sort_key': 'a'})
+        assert 'name_sort_key' in errors
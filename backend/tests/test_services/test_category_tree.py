@@ -0,0 +1,56 @@
+from backend.extensions import db
+from backend.models import Category
+from backend.services.category_tree import get_category_tree
+
+
+def test_tree_contains_categories_and_counts(app, sample_product, sample_category, sample_subcategory):
+    """Test that the snapshot holds every node with its product count."""
+    with app.app_context():
+        tree = get_category_tree()
+
+        category = tree.get_category(sample_category.id)
+        assert category['name'] == 'Test Category'
+        assert category['productCount'] == 1
+        assert category['subcategories'][0]['id'] == sample_subcategory.id
+
+        subcategory = tree.get_subcategory(sample_subcategory.id)
+        assert subcategory['category'] == {'id': sample_category.id, 'name': 'Test Category'}
+        assert subcategory['productCount'] == 1
+
+
+def test_tree_is_reused_until_a_write(app, sample_category):
+    """Test that reads share one snapshot and a commit swaps it."""
+    with app.app_context():
+        first = get_category_tree()
+        assert get_category_tree() is first
+
+        db.session.add(Category(name='Another Category'))
+        db.session.commit()
+
+        second = get_category_tree()
+        assert second is not first
+        assert [c['name'] for c in second.all_categories()] == ['Another Category', 'Test Category']
+
+
+def test_subcategory_membership(app, sample_category, sample_subcategory):
+    """Test subcategory to category validation."""
+    with app.app_context():
+        tree = get_category_tree()
+        assert tree.subcategory_belongs_to(sample_subcategory.id, sample_category.id)
+        assert tree.subcategory_belongs_to(str(sample_subcategory.id), str(sample_category.id))
+        assert not tree.subcategory_belongs_to(sample_subcategory.id, sample_category.id + 1)
+        assert not tree.has_subcategory(999)
+
+
+def test_category_routes_served_from_tree(client, sample_category, sample_subcategory):
+    """Test the category endpoints."""
+    response = client.get('/categories')
+    assert response.status_code == 200
+    assert response.get_json()['categories'][0]['name'] == 'Test Category'
+
+    response = client.get(f'/categories/{sample_category.id}/subcategories')
+    assert response.status_code == 200
+    assert response.get_json()['subcategories'][0]['name'] == 'Test Subcategory'
+
+    assert client.get('/categories/999').status_code == 404
+    assert client.get('/categories/999/subcategories').status_code == 404
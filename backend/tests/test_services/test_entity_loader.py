@@ -0,0 +1,68 @@
+from sqlalchemy import event
+from backend.extensions import db
+from backend.models import BakeryReview
+from backend.services.bakery_service import BakeryService
+from backend.services.review_service import ReviewService
+
+
+# The stats' review query; the lazy load of a bakery's reviews reads "WHERE ? = bakery_review.bakery_id"
+STATS_QUERY = 'WHERE bakery_review.bakery_id = ?'
+BAKERY_QUERY = 'FROM bakery \nWHERE bakery.id = ?'
+
+
+class StatementLog:
+    """Collect the statements executed on the engine"""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(db.engine, 'before_cursor_execute', self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(db.engine, 'before_cursor_execute', self)
+
+    def count(self, fragment):
+        return sum(fragment in statement for statement in self.statements)
+
+
+def test_entity_and_stats_loaded_once(app, sample_bakery):
+    """Test that repeated lookups and stats within a request hit the database once."""
+    with app.app_context():
+        service = BakeryService()
+        db.session.expire_all()
+        with StatementLog() as log:
+            for _ in range(3):
+                assert service.get_bakery_by_id(sample_bakery.id).name == 'Test Bakery'
+                service.get_bakery_stats(sample_bakery.id)
+            assert service.get_bakery_by_id(sample_bakery.id, with_stats=True).review_count == 0
+        assert log.count(BAKERY_QUERY) == 1
+        assert log.count(STATS_QUERY) == 1
+
+
+def test_writes_refresh_the_loader(app, sample_bakery):
+    """Test that stats computed before a commit are not served after it."""
+    with app.app_context():
+        service = BakeryService()
+        assert service.get_bakery_stats(sample_bakery.id)['review_count'] == 0
+        ReviewService().create_bakery_review('Fine', 8, None, None, None, None, None, sample_bakery.id)
+        assert service.get_bakery_stats(sample_bakery.id)['review_count'] == 1
+
+
+def test_update_skips_stats(client, app, sample_bakery):
+    """Test that a bakery update fetches the bakery once and computes no stats."""
+    with app.app_context():
+        db.session.add(BakeryReview('Good', 8, None, None, None, None, None, sample_bakery.id))
+        db.session.commit()
+        db.session.expire_all()
+
+        with StatementLog() as log:
+            response = client.patch(f'/bakeries/update/{sample_bakery.id}', json={'name': 'Renamed'})
+        assert response.status_code == 200
+        assert log.count(STATS_QUERY) == 0
+        # Once before the update and once to reload the committed row for the response
+        assert log.count(BAKERY_QUERY) == 2
@@ -0,0 +1,105 @@
+import pytest
+from backend.extensions import db
+from backend.models import Bakery, Product, BakeryReview
+from backend.services.facet_index import to_bitmap, bitmap_ids, get_facet_index
+
+
+def _review(bakery_id, rating):
+    return BakeryReview(review='ok', overall_rating=rating, service_rating=None, price_rating=None,
+                        atmosphere_rating=None, location_rating=None, user_id=None, bakery_id=bakery_id)
+
+
+@pytest.fixture
+def catalog(app, sample_category, sample_subcategory):
+    """Three bakeries in two zip codes with products and reviews"""
+    with app.app_context():
+        north = Bakery(name='Nord Bageri', zip_code='2200', street_name='A', street_number='1')
+        south = Bakery(name='Syd Bageri', zip_code='2300', street_name='B', street_number='2')
+        other = Bakery(name='Anden Nord', zip_code='2200', street_name='C', street_number='3')
+        db.session.add_all([north, south, other])
+        db.session.flush()
+        db.session.add_all([
+            Product(name='Kanelsnegl', bakery_id=north.id, category_id=sample_category.id,
+                    subcategory_id=sample_subcategory.id),
+            Product(name='Rugbrød', bakery_id=south.id),
+            _review(north.id, 9), _review(north.id, 7),
+            _review(south.id, 5),
+        ])
+        db.session.commit()
+        return {'north': north.id, 'south': south.id, 'other': other.id}
+
+
+def test_bitmap_round_trip():
+    """Test conversion between id lists and bitmaps."""
+    ids = [0, 3, 8, 64, 1000]
+    assert bitmap_ids(to_bitmap(ids)) == ids
+    assert to_bitmap([]) == 0
+    assert bitmap_ids(0) == []
+
+
+def test_filters_and_facet_counts(app, catalog, sample_category):
+    """Test filtering and that each facet is counted without its own filter."""
+    with app.app_context():
+        bakeries = get_facet_index().bakeries
+
+        matches, counts = bakeries.search({'zipCode': ['2200']})
+        assert sorted(bitmap_ids(matches)) == sorted([catalog['north'], catalog['other']])
+        assert counts['zipCode'] == {'2200': 2, '2300': 1}
+        assert counts['category'] == {sample_category.id: 1}
+
+        matches, counts = bakeries.search({'zipCode': ['2200']}, min_rating=8)
+        assert bitmap_ids(matches) == [catalog['north']]
+        assert counts['minRating'] == {5: 1, 6: 1, 7: 1, 8: 1, 9: 0}
+        assert counts['zipCode'] == {'2200': 1}
+
+
+def test_arbitrary_thresholds_are_not_kept(app, catalog):
+    """Test that client-chosen thresholds filter correctly without growing the snapshot."""
+    with app.app_context():
+        bakeries = get_facet_index().bakeries
+        before = {facet: dict(steps) for facet, steps in bakeries.steps.items()}
+        attributes = set(vars(bakeries))
+
+        for n in range(1, 50):
+            matches, _ = bakeries.search({}, min_rating=5 + n / 10000)
+            assert bitmap_ids(matches) == [catalog['north']]
+        assert bakeries.at_least('minRating', 8.0) is bakeries.steps['minRating'][8]
+        assert bakeries.steps == before
+        assert set(vars(bakeries)) == attributes
+
+
+def test_snapshot_refreshes_on_write(app, catalog):
+    """Test that a committed review is reflected in the next snapshot."""
+    with app.app_context():
+        before = get_facet_index()
+        db.session.add(_review(catalog['other'], 10))
+        db.session.commit()
+
+        after = get_facet_index()
+        assert after is not before
+        assert after.bakeries.review_counts[catalog['other']] == 1
+
+
+def test_search_endpoint(client, catalog, sample_category):
+    """Test the /search endpoint with filters, sorting and facets."""
+    response = client.get('/search?type=bakeries&zipCode=2200,2300&minReviews=1')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['total'] == 2
+    assert [r['name'] for r in data['results']] == ['Nord Bageri', 'Syd Bageri']
+    assert data['results'][0]['averageRating'] == 8.0
+    assert data['results'][0]['reviewCount'] == 2
+    assert {'value': '2200', 'count': 1} in data['facets']['zipCode']
+    assert {'value': 1, 'count': 2} in data['facets']['minReviews']
+
+    response = client.get(f'/search?type=products&category={sample_category.id}')
+    data = response.get_json()
+    assert [r['name'] for r in data['results']] == ['Kanelsnegl']
+    assert data['facets']['category'] == [{'id': sample_category.id, 'name': 'Test Category', 'count': 1}]
+
+    response = client.get('/search?type=bakeries&q=nord&sort=name&pageSize=1&page=2')
+    data = response.get_json()
+    assert data['total'] == 2
+    assert [r['name'] for r in data['results']] == ['Nord Bageri']
+
+    assert client.get('/search?type=users').status_code == 400
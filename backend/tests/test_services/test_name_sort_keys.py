@@ -0,0 +1,89 @@
+from sqlalchemy import event
+from backend.extensions import db
+from backend.models import Bakery, Category, Product, User
+from backend.services.bakery_service import BakeryService
+from backend.services.category_service import CategoryService
+from backend.services.product_service import ProductService
+from backend.services.user_service import UserService
+from backend.utils.collation import danish_sort_key
+
+NAMES = ['Ås Bageri', 'abe', 'Zebra', 'Øst', 'Aalborg', 'Æble', 'Élan', 'Ebbe', 'Brød', 'brød', 'Brod']
+DANISH_ORDER = ['abe', 'Brod', 'Brød', 'brød', 'Ebbe', 'Élan', 'Zebra', 'Æble', 'Øst', 'Aalborg', 'Ås Bageri']
+
+
+def test_danish_sort_key_order():
+    """Test that the key orders æ, ø, å (and aa) after z, ignoring case and accents."""
+    assert sorted(NAMES, key=danish_sort_key) == DANISH_ORDER
+    assert sorted(['Ändring', 'Öl', 'Zulu'], key=danish_sort_key) == ['Zulu', 'Ändring', 'Öl']
+    assert danish_sort_key(None) is None
+
+
+def test_only_word_initial_aa_is_aa():
+    """Test that "aa" counts as å at the start of a word only, not across a compound seam."""
+    assert sorted(['Ekstrb', 'Ekstraarbejde', 'Ekstra'], key=danish_sort_key) == ['Ekstra', 'Ekstraarbejde', 'Ekstrb']
+    assert sorted(['Vester Aaby', 'Vester Zulu', 'Vester Åby'], key=danish_sort_key) == \
+        ['Vester Zulu', 'Vester Aaby', 'Vester Åby']
+
+
+def test_users_listed_in_danish_order(app):
+    """Test that the user listing follows the username sort key, not binary order."""
+    usernames = ['Østergaard', 'aase', 'Bo', 'Åge', 'anne', 'Zenia']
+    with app.app_context():
+        db.session.add_all([User(name, f'{i}@example.dk', 'password') for i, name in enumerate(usernames)])
+        db.session.commit()
+        assert [user.username for user in UserService().get_all_users()] == \
+            ['anne', 'Bo', 'Zenia', 'Østergaard', 'Åge', 'aase']
+
+
+def test_sort_key_follows_name(app):
+    """Test that the key is set on insert and recomputed on update."""
+    with app.app_context():
+        category = CategoryService().create_category('Æblekager')
+        assert category.name_sort_key == danish_sort_key('Æblekager')
+
+        CategoryService().update_category(category.id, 'Brød')
+        db.session.expire_all()
+        assert db.session.get(Category, category.id).name_sort_key == danish_sort_key('Brød')
+
+
+def _query_plans(run):
+    """EXPLAIN QUERY PLAN details of every statement ``run`` executes"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        run()
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    with engine.connect() as connection:
+        return [
+            ' | '.join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+            for statement, parameters in statements
+        ]
+
+
+def test_listings_are_index_ordered(app):
+    """Test that name-ordered listings come back in Danish order straight from an index."""
+    with app.app_context():
+        bakeries = [Bakery(name=name, zip_code='2200', street_name='S', street_number='1') for name in NAMES]
+        db.session.add_all(bakeries)
+        db.session.flush()
+        db.session.add_all([Product(name=name, bakery_id=bakeries[0].id) for name in NAMES])
+        db.session.commit()
+
+        assert [b.name for b in BakeryService().get_all_bakeries()] == DANISH_ORDER
+        assert [b.name for b in BakeryService().get_bakeries_by_zip('2200')] == DANISH_ORDER
+        assert [p.name for p in ProductService().get_products_by_bakery(bakeries[0].id)] == DANISH_ORDER
+
+        for run, index in [
+            (lambda: BakeryService().get_bakeries_by_zip('2200'), 'idx_bakery_zip_name_sort_key'),
+            (lambda: ProductService().get_products_by_bakery(bakeries[0].id), 'idx_product_bakery_name_sort_key'),
+            (lambda: CategoryService().get_all_categories(), 'idx_category_name_sort_key'),
+        ]:
+            plan = ' '.join(_query_plans(run))
+            assert index in plan
+            assert 'TEMP B-TREE' not in plan
@@ -0,0 +1,115 @@
+import random
+import time
+
+import pytest
+from sqlalchemy import text
+from backend.extensions import db
+from backend.models import Bakery, BakeryReview
+from backend.services.bakery_service import BakeryService
+from backend.utils.geo import zip_centroid, haversine_km
+
+# Kongens Nytorv, Copenhagen
+HERE = (55.6805, 12.5855)
+
+
+def _review(bakery_id, rating):
+    return BakeryReview(review='ok', overall_rating=rating, service_rating=None, price_rating=None,
+                        atmosphere_rating=None, location_rating=None, user_id=None, bakery_id=bakery_id)
+
+
+@pytest.fixture
+def bakeries(app):
+    """Bakeries in central Copenhagen, Østerbro and Aarhus"""
+    with app.app_context():
+        centre = Bakery(name='Centrum', zip_code='1050', street_name='A', street_number='1')
+        oesterbro = Bakery(name='Østerbro', zip_code='2100', street_name='B', street_number='2')
+        aarhus = Bakery(name='Aarhus', zip_code='8000', street_name='C', street_number='3')
+        db.session.add_all([centre, oesterbro, aarhus])
+        db.session.flush()
+        db.session.add_all([_review(centre.id, 2), _review(oesterbro.id, 10)])
+        db.session.commit()
+        return {'centre': centre.id, 'oesterbro': oesterbro.id, 'aarhus': aarhus.id}
+
+
+def test_zip_centroids():
+    """Test exact lookups, same-area fallback and unknown codes."""
+    assert zip_centroid('8000') == (56.1567, 10.2108)
+    assert zip_centroid('1172') == zip_centroid('1150')
+    assert zip_centroid('0100') is None
+    assert zip_centroid(None) is None
+    assert 150 < haversine_km(*zip_centroid('1050'), *zip_centroid('8000')) < 165
+
+
+def test_bakeries_follow_their_zip_code(client, bakeries):
+    """Test that coordinates and the R*Tree follow zip code changes."""
+    bakery = db.session.get(Bakery, bakeries['aarhus'])
+    assert (bakery.latitude, bakery.longitude) == zip_centroid('8000')
+
+    response = client.patch(f"/bakeries/update/{bakeries['aarhus']}", json={'zipCode': '2200'})
+    assert response.status_code == 200
+    nearby = BakeryService().get_nearby_bakeries(*HERE, radius_km=10)
+    assert [b.name for b, _, _ in nearby] == ['Centrum', 'Aarhus', 'Østerbro']
+
+
+def test_nearest_first_within_radius(app, bakeries):
+    """Test ordering by distance and the radius cut-off."""
+    with app.app_context():
+        service = BakeryService()
+        nearby = service.get_nearby_bakeries(*HERE)
+        assert [b.name for b, _, _ in nearby] == ['Centrum', 'Østerbro', 'Aarhus']
+        assert nearby[0][1] == pytest.approx(0, abs=0.01)
+
+        assert [b.name for b, _, _ in service.get_nearby_bakeries(*HERE, radius_km=10)] == ['Centrum', 'Østerbro']
+        assert [b.name for b, _, _ in service.get_nearby_bakeries(*HERE, limit=1)] == ['Centrum']
+
+
+def test_rating_weight(app, bakeries):
+    """Test that a rating weight lets a better bakery a little further away rank first."""
+    with app.app_context():
+        nearby = BakeryService().get_nearby_bakeries(*HERE, limit=2, rating_weight=1.0)
+        assert [(b.name, rating) for b, _, rating in nearby] == [('Østerbro', 10), ('Centrum', 2)]
+
+
+def test_nearby_endpoint(client, bakeries):
+    """Test the response shape and validation of /bakeries/nearby."""
+    response = client.get(f'/bakeries/nearby?lat={HERE[0]}&lng={HERE[1]}&radius=10')
+    assert response.status_code == 200
+    results = response.json['bakeries']
+    assert [r['name'] for r in results] == ['Centrum', 'Østerbro']
+    assert results[1]['averageRating'] == 10
+    assert 2 < results[1]['distanceKm'] < 5
+
+    assert client.get('/bakeries/nearby?lat=55.6').status_code == 400
+    assert client.get('/bakeries/nearby?lat=95&lng=12').status_code == 400
+    assert client.get(f'/bakeries/nearby?lat={HERE[0]}&lng={HERE[1]}&radius=-1').status_code == 400
+
+
+def test_knn_matches_brute_force_and_is_fast(app):
+    """Test k-nearest results against a full scan over 30k bakeries, and their speed."""
+    with app.app_context():
+        rng = random.Random(7)
+        rows = [
+            {'id': i, 'lat': rng.uniform(54.6, 57.7), 'lng': rng.uniform(8.1, 12.7)}
+            for i in range(1, 30001)
+        ]
+        db.session.execute(text(
+            "INSERT INTO bakery (id, name, zip_code, street_name, street_number, latitude, longitude) "
+            "VALUES (:id, 'B', '1000', 'S', '1', :lat, :lng)"
+        ), rows)
+        db.session.execute(text(
+            "INSERT INTO bakery_rtree SELECT id, latitude, latitude, longitude, longitude FROM bakery"
+        ))
+        db.session.commit()
+
+        service = BakeryService()
+        timings = []
+        for _ in range(20):
+            lat, lng = rng.uniform(54.8, 57.5), rng.uniform(8.3, 12.5)
+            start = time.perf_counter()
+            nearby = service.get_nearby_bakeries(lat, lng, limit=10)
+            timings.append(time.perf_counter() - start)
+
+            expected = sorted(rows, key=lambda r: haversine_km(lat, lng, r['lat'], r['lng']))[:10]
+            assert [b.id for b, _, _ in nearby] == [r['id'] for r in expected]
+
+        assert sorted(timings)[len(timings) // 2] < 0.010
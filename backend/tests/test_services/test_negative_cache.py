@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import event
+from backend.extensions import db
+from backend.services.bakery_service import BakeryService
+from backend.services.product_service import ProductService
+
+
+class QueryCounter:
+    """Count statements executed on the engine"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(db.engine, 'before_cursor_execute', self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(db.engine, 'before_cursor_execute', self)
+
+
+def test_missing_bakery_is_not_queried_twice(app):
+    """Test that a repeated miss is answered from the negative cache."""
+    with app.app_context():
+        service = BakeryService()
+        assert service.get_bakery_by_id(999) is None
+
+        with QueryCounter() as counter:
+            assert service.get_bakery_by_id(999) is None
+            with pytest.raises(Exception):
+                service.get_bakery_stats(999)
+        assert counter.count == 0
+
+
+def test_created_bakery_clears_negative_entry(app):
+    """Test that creating an entity invalidates its negative entry."""
+    with app.app_context():
+        service = BakeryService()
+        assert service.get_bakery_by_id(1) is None
+
+        bakery = service.create_bakery(
+            name='Fresh Bakery', zip_code='2100', street_name='Street', street_number='1'
+        )
+        assert bakery.id == 1
+        assert service.get_bakery_by_id(1) is not None
+
+
+def test_empty_search_invalidated_by_new_match(app):
+    """Test that an empty search result is dropped when a matching entity appears."""
+    with app.app_context():
+        service = BakeryService()
+        assert service.search_bakeries('  Kanel ') == []
+
+        with QueryCounter() as counter:
+            assert service.search_bakeries('kanel') == []
+        assert counter.count == 0
+
+        service.create_bakery(name='Kanel Bageri', zip_code='2200', street_name='Street', street_number='2')
+        assert [b.name for b in service.search_bakeries('kanel')] == ['Kanel Bageri']
+
+
+def test_missing_product_then_created(app, sample_bakery):
+    """Test negative caching for products."""
+    with app.app_context():
+        service = ProductService()
+        assert service.get_product_by_id(1) is None
+        assert service.search_products('croissant') == []
+
+        service.create_product(name='Croissant', bakery_id=sample_bakery.id)
+        assert service.get_product_by_id(1).name == 'Croissant'
+        assert len(service.search_products('croissant')) == 1
+
+
+def test_missing_bakery_route(client):
+    """Test the 404 path still answers after being cached."""
+    assert client.get('/bakeries/999').status_code == 404
+    assert client.get('/bakeries/999').status_code == 404
+    assert client.get('/bakeries/999/stats').status_code == 404
@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy import event
+from backend.extensions import db
+from backend.models import Bakery, Category, Product, Subcategory
+from backend.services.bakery_service import BakeryService
+from backend.services.product_service import ProductService
+from backend.services.review_service import ReviewService
+
+bakeries, products, reviews = BakeryService(), ProductService(), ReviewService()
+
+# (service call, fragment of the statement to explain, index it must use)
+HOT_QUERIES = [
+    (lambda: reviews.get_bakery_reviews_by_bakery(1), 'FROM bakery_review', 'idx_bakery_review_bakery_created'),
+    (lambda: reviews.get_bakery_reviews_by_user(1), 'FROM bakery_review', 'idx_bakery_review_user_created'),
+    (reviews.get_all_bakery_reviews, 'FROM bakery_review', 'idx_bakery_review_created'),
+    (lambda: reviews.get_product_reviews_by_product(1), 'FROM product_review', 'idx_product_review_product_created'),
+    (lambda: reviews.get_product_reviews_by_user(1), 'FROM product_review', 'idx_product_review_user_created'),
+    (reviews.get_all_product_reviews, 'FROM product_review', 'idx_product_review_created'),
+    (lambda: bakeries.get_bakery_stats(1), 'count(bakery_review.overall_rating)', 'idx_bakery_review_bakery_ratings'),
+    (bakeries.get_all_bakeries, 'count(bakery_review.overall_rating)', 'idx_bakery_review_bakery_ratings'),
+    (bakeries.get_all_bakeries, 'FROM bakery ORDER BY', 'idx_bakery_name_sort_key'),
+    (lambda: bakeries.get_bakeries_by_zip('2200'), 'FROM bakery', 'idx_bakery_zip_name_sort_key'),
+    (lambda: bakeries.get_bakery_profile(1), 'FROM bakery_review LEFT OUTER JOIN', 'idx_bakery_review_bakery_created'),
+    (lambda: bakeries.get_bakery_profile(1), 'count(bakery_review.overall_rating)', 'idx_bakery_review_bakery_ratings'),
+    (lambda: bakeries.get_bakery_profile(1), 'FROM product', 'idx_product_bakery_name_sort_key'),
+    (lambda: products.get_product_stats(1), 'count(product_review.overall_rating)', 'idx_product_review_product_ratings'),
+    (products.get_all_products, 'FROM product', 'idx_product_name_sort_key'),
+    (lambda: products.get_products_by_bakery(1), 'FROM product', 'idx_product_bakery_name_sort_key'),
+    (lambda: products.get_products_by_category(1), 'FROM product', 'idx_product_category_name_sort_key'),
+    (lambda: products.get_products_by_subcategory(1), 'FROM product', 'idx_product_subcategory_name_sort_key'),
+]
+
+
+def _query_plans(call, fragment):
+    """EXPLAIN QUERY PLAN details of the statements ``call()`` runs that contain ``fragment``"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if fragment in ' '.join(statement.split()):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        call()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+    assert statements, f"no statement with '{fragment}' ran"
+    with db.engine.connect() as connection:
+        return [
+            [row[3] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+            for statement, parameters in statements
+        ]
+
+
+@pytest.mark.parametrize('call, fragment, index', HOT_QUERIES)
+def test_hot_queries_use_an_index_without_sorting(app, call, fragment, index):
+    """Test that each hot service query is answered from its index, with no temp B-tree sort."""
+    with app.app_context():
+        category = Category(name='Brød')
+        db.session.add_all([category, Bakery(name='Bageri', zip_code='2200', street_name='Gade', street_number='1')])
+        db.session.flush()
+        db.session.add(Subcategory(name='Rugbrød', category_id=category.id))
+        db.session.add(Product(name='Rugbrød', bakery_id=1, category_id=category.id))
+        db.session.commit()
+
+        for plan in _query_plans(call, fragment):
+            assert any(f'INDEX {index} ' in detail or detail.endswith(f'INDEX {index}') for detail in plan), plan
+            assert not any('TEMP B-TREE' in detail for detail in plan), plan
+            if 'rating' in index:
+                assert any(f'COVERING INDEX {index}' in detail for detail in plan), plan
@@ -0,0 +1,112 @@
+import pytest
+from backend.extensions import db
+from backend.models import Bakery, BakeryReview, Product, ProductReview
+from backend.services import review_vectors
+from backend.utils.tfidf import TfidfIndex
+
+BAKERY_REVIEWS = [
+    'Sourdough with a thick, dark crust and an open crumb',
+    'Flaky croissant, lots of butter, crisp layers',
+    'Slow service and a long queue, friendly staff though',
+    'The crust on the sourdough was perfect',
+]
+PRODUCT_REVIEWS = [
+    'Very flaky croissant with real butter',
+    'Dense rye bread, good with cheese',
+]
+
+
+@pytest.fixture
+def reviews(app):
+    """Bakery and product reviews; returns {text: (type, id)}"""
+    with app.app_context():
+        bakery = Bakery(name='Bageriet', zip_code='2200', street_name='S', street_number='1')
+        db.session.add(bakery)
+        db.session.flush()
+        product = Product(name='Croissant', bakery_id=bakery.id)
+        db.session.add(product)
+        db.session.flush()
+        rows = [('bakery', BakeryReview(text, 8, None, None, None, None, None, bakery.id)) for text in BAKERY_REVIEWS]
+        rows += [('product', ProductReview(text, 8, None, None, None, None, product.id)) for text in PRODUCT_REVIEWS]
+        db.session.add_all(review for _, review in rows)
+        db.session.commit()
+        return {review.review: (kind, review.id) for kind, review in rows}
+
+
+def _texts(matches):
+    return [review.review for _, review, _ in matches]
+
+
+def test_search_ranks_by_relevance(app, reviews):
+    """Test that reviews mentioning the query terms come first, across review types."""
+    with app.app_context():
+        results = review_vectors.search_reviews('sourdough crust')
+        assert set(_texts(results)[:2]) == {BAKERY_REVIEWS[0], BAKERY_REVIEWS[3]}
+        assert [score for _, _, score in results] == sorted((score for _, _, score in results), reverse=True)
+
+        assert _texts(review_vectors.search_reviews('flaky croissant', kind='product')) == [PRODUCT_REVIEWS[0]]
+        assert review_vectors.search_reviews('marzipan') == []
+
+
+def test_similar_reviews(app, reviews):
+    """Test that the closest review comes first and the review itself is left out."""
+    with app.app_context():
+        kind, review_id = reviews[BAKERY_REVIEWS[1]]
+        results = review_vectors.similar_reviews(kind, review_id)
+        assert _texts(results)[0] == PRODUCT_REVIEWS[0]
+        assert BAKERY_REVIEWS[1] not in _texts(results)
+        assert review_vectors.similar_reviews('bakery', 999_999) is None
+
+
+def test_index_follows_commits(app, reviews):
+    """Test that new, edited and deleted reviews are applied without a rebuild."""
+    with app.app_context():
+        index = review_vectors.get_review_index()
+        kind, review_id = reviews[BAKERY_REVIEWS[2]]
+
+        review = db.session.get(BakeryReview, review_id)
+        review.review = 'Cardamom buns still warm from the oven'
+        db.session.commit()
+        assert _texts(review_vectors.search_reviews('cardamom')) == ['Cardamom buns still warm from the oven']
+
+        db.session.delete(review)
+        db.session.commit()
+        assert review_vectors.search_reviews('cardamom') == []
+        assert review_vectors.get_review_index() is index
+
+
+def test_saved_index_is_caught_up(app, reviews, tmp_path):
+    """Test that a saved index loads and picks up reviews written after it was built."""
+    with app.app_context():
+        review_vectors.save_index(str(tmp_path))
+        product_id = db.session.get(ProductReview, reviews[PRODUCT_REVIEWS[0]][1]).product_id
+        db.session.add(ProductReview('Marzipan layer was too sweet', 5, None, None, None, None, product_id))
+        db.session.commit()
+
+        index, metadata = TfidfIndex.load(str(tmp_path))
+        assert len(index) == len(BAKERY_REVIEWS) + len(PRODUCT_REVIEWS)
+        assert metadata['watermark']
+
+        app.config['REVIEW_VECTORS_PATH'] = str(tmp_path)
+        app.extensions.pop('review_vectors', None)
+        assert _texts(review_vectors.search_reviews('marzipan')) == ['Marzipan layer was too sweet']
+
+
+def test_endpoints(client, reviews):
+    """Test the search and similar endpoints and their validation."""
+    response = client.get('/reviews/search?q=sourdough+crust&limit=2')
+    assert response.status_code == 200
+    results = response.get_json()['reviews']
+    assert len(results) == 2
+    assert {r['type'] for r in results} == {'bakery'}
+    assert results[0]['score'] >= results[1]['score']
+
+    kind, review_id = reviews[PRODUCT_REVIEWS[0]]
+    response = client.get(f'/reviews/{kind}/{review_id}/similar?type=bakery')
+    assert response.status_code == 200
+    assert response.get_json()['reviews'][0]['review']['review'] == BAKERY_REVIEWS[1]
+
+    assert client.get('/reviews/search?q=a').status_code == 400
+    assert client.get('/reviews/search?q=crust&type=cake').status_code == 400
+    assert client.get('/reviews/cake/1/similar').status_code == 404
+    assert client.get('/reviews/bakery/999999/similar').status_code == 404
@@ -0,0 +1,84 @@
+from backend.extensions import db
+from backend.models import Bakery, Product, BakeryReview
+from backend.services.bakery_service import BakeryService
+from backend.services.product_service import ProductService
+from backend.services.review_service import ReviewService
+from backend.utils.search_index import fold, fold_for_index, match_query
+
+
+def test_danish_folding():
+    """Test that Danish letters and accents fold to the spellings people type."""
+    assert fold('Smørrebrød') == 'smoerrebroed'
+    assert fold('Århus Café') == 'aarhus cafe'
+    assert fold_for_index('Smørrebrød') == 'smoerrebroed smorrebrod'
+    assert match_query('Rug brød') == '"rug"* "broed"*'
+    assert match_query('  !! ') is None
+
+
+def test_bakery_search_by_name_and_street(app):
+    """Test prefix, accent-insensitive search over name and street."""
+    with app.app_context():
+        db.session.add_all([
+            Bakery(name='Smørrebrød Bageriet', zip_code='8000', street_name='Åboulevarden', street_number='1'),
+            Bakery(name='Kanel Huset', zip_code='2100', street_name='Smørgade', street_number='2'),
+            Bakery(name='Andet Sted', zip_code='2100', street_name='Vesterbrogade', street_number='3'),
+        ])
+        db.session.commit()
+
+        service = BakeryService()
+        assert [b.name for b in service.search_bakeries('smorrebrod')] == ['Smørrebrød Bageriet']
+        assert [b.name for b in service.search_bakeries('aboulev')] == ['Smørrebrød Bageriet']
+        # A name match outranks a street match
+        assert [b.name for b in service.search_bakeries('smør')] == ['Smørrebrød Bageriet', 'Kanel Huset']
+
+
+def test_index_follows_updates_and_deletes(app, sample_bakery):
+    """Test that renames and deletes are reflected in the index."""
+    with app.app_context():
+        service = BakeryService()
+        bakery = db.session.get(Bakery, sample_bakery.id)
+        bakery.name = 'Wienerbrød Specialisten'
+        db.session.commit()
+
+        assert service.search_bakeries('Test Bakery') == []
+        assert [b.id for b in service.search_bakeries('wiener')] == [sample_bakery.id]
+
+        db.session.delete(bakery)
+        db.session.commit()
+        assert service.search_bakeries('wiener') == []
+
+
+def test_product_search_ranks_by_relevance(app, sample_bakery):
+    """Test BM25 ranking of product names."""
+    with app.app_context():
+        db.session.add_all([
+            Product(name='Stor lagkage med lidt kanel og flødeskum', bakery_id=sample_bakery.id),
+            Product(name='Rugbrød', bakery_id=sample_bakery.id),
+            Product(name='Kanelsnegl', bakery_id=sample_bakery.id),
+        ])
+        db.session.commit()
+
+        names = [p.name for p in ProductService().search_products('kanel')]
+        assert names == ['Kanelsnegl', 'Stor lagkage med lidt kanel og flødeskum']
+
+
+def test_review_text_search(app, client, sample_bakery):
+    """Test the new review text search."""
+    with app.app_context():
+        db.session.add_all([
+            BakeryReview(review='Fantastisk tebirkes og god kaffe', overall_rating=9, service_rating=None,
+                         price_rating=None, atmosphere_rating=None, location_rating=None,
+                         user_id=None, bakery_id=sample_bakery.id),
+            BakeryReview(review='Lidt tørt brød', overall_rating=4, service_rating=None,
+                         price_rating=None, atmosphere_rating=None, location_rating=None,
+                         user_id=None, bakery_id=sample_bakery.id),
+        ])
+        db.session.commit()
+
+        results = ReviewService().search_bakery_reviews('TØRT')
+        assert [r.review for r in results] == ['Lidt tørt brød']
+
+    response = client.get('/bakeryreviews/search?q=tebirk')
+    assert response.status_code == 200
+    assert len(response.get_json()['bakeryReviews']) == 1
+    assert client.get('/bakeryreviews/search?q=t').status_code == 400
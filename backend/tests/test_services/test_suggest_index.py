@@ -0,0 +1,100 @@
+import random
+import string
+import time
+
+from backend.extensions import db
+from backend.models import Bakery, Product
+from backend.services.suggest_index import SuggestIndex, get_suggest_index
+
+
+def _names(suggestions):
+    return [s['name'] for s in suggestions]
+
+
+def test_prefix_and_typo_matches():
+    """Test prefix completion and misspelled words."""
+    index = SuggestIndex()
+    index.add('product', 1, 'Kanelsnegl')
+    index.add('product', 2, 'Kanelstang')
+    index.add('product', 3, 'Rugbrød')
+    index.add('bakery', 1, 'Bageriet Brød & Co')
+
+    assert _names(index.suggest('kanel')) == ['Kanelsnegl', 'Kanelstang']
+    assert _names(index.suggest('kanelsnegel')) == ['Kanelsnegl']
+    assert _names(index.suggest('rugbrod')) == ['Rugbrød']
+    assert _names(index.suggest('brød bag')) == ['Bageriet Brød & Co']
+    assert index.suggest('xyz') == []
+
+
+def test_exact_prefix_ranks_above_typo():
+    """Test that a prefix match ranks above a fuzzy match."""
+    index = SuggestIndex()
+    index.add('product', 1, 'Spandauer')
+    index.add('product', 2, 'Spanske kager')
+
+    suggestions = index.suggest('spand')
+    assert suggestions[0]['name'] == 'Spandauer'
+
+
+def test_incremental_updates():
+    """Test that renames and removals patch the index."""
+    index = SuggestIndex()
+    index.add('bakery', 1, 'Gammel Bager')
+    index.add('bakery', 1, 'Ny Bager')
+    assert _names(index.suggest('gammel')) == []
+    assert _names(index.suggest('ny')) == ['Ny Bager']
+
+    index.remove('bakery', 1)
+    assert index.suggest('bager') == []
+    assert index.vocabulary == []
+    assert index.trigram_words == {}
+
+
+def test_follows_commits(app, sample_bakery):
+    """Test that committed writes reach an already built index."""
+    with app.app_context():
+        index = get_suggest_index()
+        assert _names(index.suggest('test bak')) == ['Test Bakery']
+
+        db.session.add(Product(name='Hindbærsnitter', bakery_id=sample_bakery.id))
+        bakery = db.session.get(Bakery, sample_bakery.id)
+        bakery.name = 'Omdøbt Bageri'
+        db.session.commit()
+
+        assert get_suggest_index() is index
+        assert _names(index.suggest('hindbaer')) == ['Hindbærsnitter']
+        assert _names(index.suggest('test bak')) == []
+        assert _names(index.suggest('omdobt')) == ['Omdøbt Bageri']
+
+
+def test_suggest_endpoint(client, app, sample_product):
+    """Test the /search/suggest endpoint."""
+    with app.app_context():
+        product_id = Product.query.filter_by(name='Test Product').one().id
+    response = client.get('/search/suggest?q=test%20prod')
+    assert response.status_code == 200
+    suggestions = response.get_json()['suggestions']
+    assert suggestions[0] == {'type': 'product', 'id': product_id, 'name': 'Test Product', 'score': 1.05}
+
+    response = client.get('/search/suggest?q=test&types=category')
+    assert _names(response.get_json()['suggestions']) == ['Test Category']
+    assert client.get('/search/suggest?q=test&types=nope').status_code == 400
+
+
+def test_suggest_is_fast_on_large_catalog():
+    """Test that a lookup over 20k names stays within a few milliseconds."""
+    rng = random.Random(7)
+    index = SuggestIndex()
+    for i in range(20000):
+        words = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10))) for _ in range(3)]
+        index.add('product', i, ' '.join(words))
+    index.add('product', 20000, 'Kanelsnegl')
+
+    timings = []
+    for query in ['kanelsnegel', 'kan', 'ab', 'kanelsnegl med']:
+        start = time.perf_counter()
+        index.suggest(query)
+        timings.append(time.perf_counter() - start)
+
+    assert _names(index.suggest('kanelsnegel'))[0] == 'Kanelsnegl'
+    assert sorted(timings)[len(timings) // 2] < 0.005
@@ -0,0 +1,170 @@
+import re
+
+import pytest
+from sqlalchemy import event
+from backend.extensions import db
+from backend.models import User
+from backend.services.user_service import UserService, InvalidCursor
+
+NAMES = [
+    ('MartinH', 'martin.hansen@mail.dk'),
+    ('marie', 'marie@gmail.com'),
+    ('Mads', 'mads@outlook.dk'),
+    ('sofie', 'martha.s@gmail.com'),
+    ('Jens', 'jens@hotmail.com'),
+]
+
+
+@pytest.fixture
+def users(app):
+    with app.app_context():
+        for username, email in NAMES:
+            db.session.add(User(username=username, email=email, password='password'))
+        db.session.commit()
+
+
+def _usernames(page):
+    users, _ = page
+    return [u.username for u in users]
+
+
+def test_prefix_search_on_username_and_email(app, users):
+    """Test case-insensitive prefix matching on username or email, ordered by the matched text."""
+    with app.app_context():
+        service = UserService()
+        # sofie matches through martha.s@gmail.com
+        assert _usernames(service.search_users('MAR')) == ['marie', 'sofie', 'MartinH']
+        assert _usernames(service.search_users('ma')) == ['Mads', 'marie', 'sofie', 'MartinH']
+        assert _usernames(service.search_users('gmail')) == []
+        assert _usernames(service.search_users('jens@')) == ['Jens']
+
+
+def test_cursor_pagination(app, users):
+    """Test that pages follow each other without gaps or repeats."""
+    with app.app_context():
+        service = UserService()
+        first, cursor = service.search_users('ma', limit=2)
+        assert [u.username for u in first] == ['Mads', 'marie']
+        second, cursor = service.search_users('ma', limit=2, cursor=cursor)
+        assert [u.username for u in second] == ['sofie', 'MartinH']
+        assert cursor is None
+
+        with pytest.raises(InvalidCursor):
+            service.search_users('ma', cursor='not a cursor')
+
+
+def test_substring_search(app, users):
+    """Test substring matching through the trigram index."""
+    with app.app_context():
+        service = UserService()
+        assert _usernames(service.search_users('gmail', mode='substring')) == ['marie', 'sofie']
+        assert _usernames(service.search_users('TIN', mode='substring')) == ['MartinH']
+        # Too short for trigrams: matched as a prefix
+        assert _usernames(service.search_users('je', mode='substring')) == ['Jens']
+
+
+def test_prefix_search_folds_non_ascii_case(app, users):
+    """Test that uppercase Æ, Ø and Å match their lowercase forms, also after a rename."""
+    with app.app_context():
+        db.session.add_all([
+            User(username='Ørsted', email='h.c@mail.dk', password='password'),
+            User(username='ærø', email='ÅSE@Mail.dk', password='password'),
+        ])
+        db.session.commit()
+
+        service = UserService()
+        assert _usernames(service.search_users('ør')) == ['Ørsted']
+        assert _usernames(service.search_users('ØR')) == ['Ørsted']
+        assert _usernames(service.search_users('Æ')) == ['ærø']
+        assert _usernames(service.search_users('åse@')) == ['ærø']
+
+        user = User.query.filter_by(username='Ørsted').one()
+        user.username = 'Østerby'
+        db.session.commit()
+        assert _usernames(service.search_users('ør')) == []
+        assert _usernames(service.search_users('øs')) == ['Østerby']
+
+
+def test_trigram_index_follows_writes(app, users):
+    """Test that renames and deletes reach the trigram index."""
+    with app.app_context():
+        service = UserService()
+        user = User.query.filter_by(username='Jens').one()
+        user.username = 'Jensine'
+        db.session.commit()
+        assert _usernames(service.search_users('sine', mode='substring')) == ['Jensine']
+
+        db.session.delete(user)
+        db.session.commit()
+        assert _usernames(service.search_users('sine', mode='substring')) == []
+
+
+def _query_plans(run):
+    """EXPLAIN QUERY PLAN details of every statement ``run`` executes"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        run()
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    with engine.connect() as connection:
+        return [
+            ' | '.join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+            for statement, parameters in statements
+        ]
+
+
+def test_searches_use_indexes(app, users):
+    """Test that neither mode scans the user table."""
+    with app.app_context():
+        service = UserService()
+        _, cursor = service.search_users('ma', limit=1)
+
+        prefix_plan = ' '.join(_query_plans(lambda: service.search_users('ma', limit=1, cursor=cursor)))
+        assert 'idx_user_username_lower' in prefix_plan
+        assert 'idx_user_email_lower' in prefix_plan
+        assert not re.search(r'SCAN user\b', prefix_plan)
+        assert 'MERGE (UNION ALL)' in prefix_plan
+
+        substring_plan = ' '.join(_query_plans(lambda: service.search_users('gmail', mode='substring')))
+        assert 'VIRTUAL TABLE INDEX' in substring_plan
+        assert not re.search(r'SCAN user\b', substring_plan)
+
+
+def test_search_endpoint(client, users):
+    """Test paging and validation on /users/search."""
+    response = client.get('/users/search?q=ma&limit=3')
+    assert response.status_code == 200
+    assert [u['username'] for u in response.json['users']] == ['Mads', 'marie', 'sofie']
+    assert 'username_lower' not in response.json['users'][0]
+    assert 'email_lower' not in response.json['users'][0]
+
+    response = client.get(f"/users/search?q=ma&limit=3&cursor={response.json['nextCursor']}")
+    assert [u['username'] for u in response.json['users']] == ['MartinH']
+    assert response.json['nextCursor'] is None
+
+    assert client.get('/users/search?q=ma&mode=fuzzy').status_code == 400
+    assert client.get('/users/search?q=ma&cursor=bogus').status_code == 400
+
+
+def test_users_matching_twice_listed_once(app):
+    """Test that a user whose username and email both match is listed once, across pages."""
+    with app.app_context():
+        for i in range(4):
+            db.session.add(User(username=f'anna{i}', email=f'anna.{i}@mail.dk', password='password'))
+        db.session.commit()
+
+        service = UserService()
+        seen, cursor = [], None
+        while True:
+            users, cursor = service.search_users('anna', limit=3, cursor=cursor)
+            seen += [u.username for u in users]
+            if cursor is None:
+                break
+        # 'anna.0@...' sorts before 'anna0', so every user is listed at their email
+        assert seen == ['anna0', 'anna1', 'anna2', 'anna3']
@@ -0,0 +1,91 @@
+import pytest
+from backend.extensions import db
+from backend.models import Bakery, BakeryReview
+from backend.services.bakery_service import BakeryService
+from backend.services.zip_rollups import get_zip_rollups, percentile_ranks
+
+
+def _review(bakery_id, rating):
+    return BakeryReview(review='ok', overall_rating=rating, service_rating=None, price_rating=None,
+                        atmosphere_rating=None, location_rating=None, user_id=None, bakery_id=bakery_id)
+
+
+@pytest.fixture
+def neighbourhood(app):
+    """Three reviewed bakeries and one unreviewed in 2200, one in 8000"""
+    with app.app_context():
+        names = [('Alfa', '2200'), ('Beta', '2200'), ('Gamma', '2200'), ('Delta', '2200'), ('Aarhus', '8000')]
+        bakeries = {name: Bakery(name=name, zip_code=zip_code, street_name='S', street_number='1')
+                    for name, zip_code in names}
+        db.session.add_all(bakeries.values())
+        db.session.flush()
+        db.session.add_all([
+            _review(bakeries['Alfa'].id, 9), _review(bakeries['Alfa'].id, 7),
+            _review(bakeries['Beta'].id, 6),
+            _review(bakeries['Gamma'].id, 4), _review(bakeries['Gamma'].id, 6),
+            _review(bakeries['Aarhus'].id, 10),
+        ])
+        db.session.commit()
+        return {name: bakery.id for name, bakery in bakeries.items()}
+
+
+def test_percentile_ranks():
+    """Test the share rated lower, with ties counted as half."""
+    assert percentile_ranks({'a': 8, 'b': 6, 'c': 5}) == pytest.approx({'a': 500 / 6, 'b': 50, 'c': 100 / 6})
+    assert percentile_ranks({'a': 5, 'b': 5}) == {'a': 50, 'b': 50}
+    assert percentile_ranks({}) == {}
+
+
+def test_rollups(app, neighbourhood):
+    """Test per-zip counts, review-weighted averages and per-bakery ranks."""
+    with app.app_context():
+        rollups = get_zip_rollups()
+        zip_2200 = rollups.zips['2200']
+        assert (zip_2200.bakery_count, zip_2200.review_count) == (4, 5)
+        assert zip_2200.average_rating == pytest.approx(32 / 5)
+        assert rollups.zips['8000'].average_rating == 10
+
+        # Alfa 8, Beta 6, Gamma 5 -> Beta is above one of three
+        assert rollups.rank(neighbourhood['Beta']).percentile == pytest.approx(50)
+        assert rollups.rank(neighbourhood['Delta']).percentile is None
+        assert rollups.rank(neighbourhood['Aarhus']).percentile == 50
+
+
+def test_rollups_follow_writes(client, neighbourhood):
+    """Test that committed review writes rebuild the rollups."""
+    before = get_zip_rollups()
+    db.session.add(_review(neighbourhood['Delta'], 10))
+    db.session.commit()
+
+    rollups = get_zip_rollups()
+    assert rollups is not before
+    assert rollups.zips['2200'].review_count == 6
+    assert rollups.rank(neighbourhood['Delta']).percentile == pytest.approx(87.5)
+
+
+def test_zip_percentile_in_stats(app, neighbourhood):
+    """Test that bakery stats carry the percentile rank within the zip code."""
+    with app.app_context():
+        service = BakeryService()
+        assert service.get_bakery_stats(neighbourhood['Alfa'])['zip_percentile'] == pytest.approx(83.3)
+        assert service.get_bakery_stats(neighbourhood['Delta'])['zip_percentile'] is None
+
+
+def test_zipcode_endpoints(client, neighbourhood):
+    """Test /zipcodes and the per-zip ranking."""
+    response = client.get('/zipcodes')
+    assert response.status_code == 200
+    assert response.json['zipCodes'][0] == {
+        'zipCode': '2200', 'city': 'København N', 'bakeryCount': 4, 'reviewCount': 5, 'averageRating': 6.4,
+    }
+
+    response = client.get('/zipcodes/2200/bakeries')
+    assert [b['name'] for b in response.json['bakeries']] == ['Alfa', 'Beta', 'Gamma', 'Delta']
+    assert response.json['bakeries'][0]['zipPercentile'] == pytest.approx(83.3)
+
+    response = client.get('/zipcodes/2200/bakeries?sort=reviews')
+    assert [b['name'] for b in response.json['bakeries']] == ['Alfa', 'Gamma', 'Beta', 'Delta']
+
+    assert client.get('/zipcodes/2200/bakeries?sort=price').status_code == 400
+    assert client.get('/zipcodes/22/bakeries').status_code == 400
+    assert client.get('/zipcodes/9999/bakeries').json['bakeries'] == []
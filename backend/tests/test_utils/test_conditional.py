@@ -0,0 +1,160 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import event
+from werkzeug.http import parse_date
+from backend.extensions import db
+from backend.models import Category, Product, TableVersion
+from backend.utils.conditional import table_fingerprints
+
+
+def test_list_sets_validators(client, sample_bakery):
+    """Test that list endpoints carry an ETag and Last-Modified."""
+    response = client.get('/bakeries')
+    assert response.status_code == 200
+    assert response.headers.get('ETag')
+    assert response.headers.get('Last-Modified')
+
+
+def test_if_none_match_returns_304(client, sample_bakery):
+    """Test that a matching ETag is answered with an empty 304."""
+    etag = client.get('/bakeries').headers['ETag']
+
+    response = client.get('/bakeries', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+
+def test_if_modified_since_returns_304(client, sample_category):
+    """Test that an unchanged resource is not re-sent after Last-Modified."""
+    last_modified = client.get('/categories').headers['Last-Modified']
+
+    response = client.get('/categories', headers={'If-Modified-Since': last_modified})
+    assert response.status_code == 304
+
+
+def test_review_listing_last_modified_is_utc(client, sample_bakery, regular_user):
+    """Test that review listings (UTC+2 updated_at) still answer If-Modified-Since with 304."""
+    response = client.post('/bakeryreviews/create', json={
+        'review': 'Godt brød', 'overallRating': 8, 'bakeryId': sample_bakery.id,
+    })
+    assert response.status_code == 201
+
+    last_modified = client.get('/bakeryreviews/').headers['Last-Modified']
+    assert parse_date(last_modified) <= datetime.now(timezone.utc)
+
+    response = client.get('/bakeryreviews/', headers={'If-Modified-Since': last_modified})
+    assert response.status_code == 304
+
+
+def test_versions_follow_committed_writes(app):
+    """Test that a commit bumps the table version and a rollback leaves it alone."""
+    with app.app_context():
+        db.session.add(Category(name='Brød'))
+        db.session.commit()
+        version, changed_at = table_fingerprints('category')['category']
+        assert version == 1 and changed_at is not None
+
+        db.session.add(Category(name='Kager'))
+        db.session.flush()
+        db.session.rollback()
+        assert table_fingerprints('category')['category'] == (version, changed_at)
+
+        db.session.get(Category, 1).name = 'Rugbrød'
+        db.session.commit()
+        assert table_fingerprints('category')['category'][0] == version + 1
+        assert db.session.get(TableVersion, 'category').version == version + 1
+
+
+def test_fingerprints_use_primary_key(app):
+    """Test that reading the validators is a primary-key lookup, not a table scan."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            table_fingerprints('bakery', 'bakery_review', 'product')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+        assert len(statements) == 1
+        with db.engine.connect() as connection:
+            plan = [row[3] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statements[0][0]}',
+                                                                 statements[0][1])]
+    assert not any(step.startswith('SCAN') for step in plan), plan
+
+
+def test_etag_changes_on_update_and_delete(client, sample_bakery):
+    """Test that writes to a dependent table change the ETag."""
+    first = client.get('/bakeries').headers['ETag']
+
+    client.patch(f'/bakeries/update/{sample_bakery.id}', json={'name': 'Renamed Bakery'})
+    second = client.get('/bakeries').headers['ETag']
+    assert second != first
+
+    response = client.get('/bakeries', headers={'If-None-Match': first})
+    assert response.status_code == 200
+    assert response.get_json()['bakeries'][0]['name'] == 'Renamed Bakery'
+
+    client.delete(f'/bakeries/delete/{sample_bakery.id}')
+    assert client.get('/bakeries').headers['ETag'] not in (first, second)
+
+
+@pytest.mark.parametrize('path, create, payload', [
+    ('/bakeries/', '/bakeryreviews/create', {'bakeryId': '{bakery}'}),
+    ('/bakeries/{bakery}', '/bakeryreviews/create', {'bakeryId': '{bakery}'}),
+    ('/bakeries/{bakery}', '/productreviews/create', {'productId': '{product}'}),
+    ('/products/{product}', '/productreviews/create', {'productId': '{product}'}),
+])
+def test_etag_changes_on_new_review(client, app, sample_bakery, path, create, payload):
+    """Test that a new review, listed in the payload by id, changes the ETag."""
+    with app.app_context():
+        product = Product(name='Review Bread', bakery_id=sample_bakery.id)
+        db.session.add(product)
+        db.session.commit()
+        ids = {'bakery': sample_bakery.id, 'product': product.id}
+    url = path.format(**ids)
+    first = client.get(url).headers['ETag']
+
+    body = {key: int(value.format(**ids)) for key, value in payload.items()}
+    response = client.post(create, json={'review': 'Lækkert', 'overallRating': 9, **body})
+    assert response.status_code == 201
+
+    response = client.get(url, headers={'If-None-Match': first})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != first
+
+
+def test_etag_depends_on_query_string(client, sample_bakery):
+    """Test that different query strings get different ETags."""
+    first = client.get('/bakeries/top?limit=1').headers['ETag']
+    second = client.get('/bakeries/top?limit=2').headers['ETag']
+    assert first != second
+
+
+def test_not_modified_skips_view(client, sample_bakery):
+    """Test that the 304 is answered before the view queries run."""
+    etag = client.get('/bakeries').headers['ETag']
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        response = client.get('/bakeries', headers={'If-None-Match': etag})
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+
+    assert response.status_code == 304
+    assert len(statements) == 1
+
+
+def test_errors_have_no_validators(client):
+    """Test that 404 responses are passed through untouched."""
+    response = client.get('/bakeries/999')
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from backend.app import create_app
+from backend.config import TestingConfig
+from backend.extensions import db
+from backend.utils.db_pool import TimedQueuePool, engine_options, pool_stats
+from backend.utils.metrics import render_metrics
+
+
+def test_profiles_and_overrides():
+    """Test that server databases get the server profile, with single settings and explicit options on top."""
+    options = engine_options({
+        'SQLALCHEMY_DATABASE_URI': 'postgresql://bakery@db/bakery',
+        'DB_POOL_SIZE': '20', 'DB_POOL_PRE_PING': 'false', 'DB_STATEMENT_CACHE_SIZE': '1000',
+        'SQLALCHEMY_ENGINE_OPTIONS': {'pool_recycle': 300},
+    })
+    assert options == {
+        'pool_size': 20, 'max_overflow': 20, 'pool_timeout': 5, 'pool_recycle': 300, 'pool_pre_ping': False,
+        'query_cache_size': 1000, 'poolclass': TimedQueuePool,
+    }
+
+    assert engine_options({'SQLALCHEMY_DATABASE_URI': 'sqlite:////tmp/bakery.db'}) == {'poolclass': TimedQueuePool}
+    assert engine_options({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'DB_POOL_PROFILE': 'server',
+                           'DB_STATEMENT_CACHE_SIZE': '50'}) == {'query_cache_size': 50}
+    with pytest.raises(ValueError):
+        engine_options({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'DB_POOL_PROFILE': 'huge'})
+
+
+def test_checkout_metrics(tmp_path):
+    """Test that checkouts, saturation and pool timeouts are recorded and exported."""
+    config = type('PoolConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'pool.db'}",
+        'DB_POOL_SIZE': '1', 'DB_MAX_OVERFLOW': '0', 'DB_POOL_TIMEOUT': '0.05',
+    })
+    app = create_app(config)
+    with app.app_context():
+        assert isinstance(db.engine.pool, TimedQueuePool)
+        before = pool_stats()
+
+        with db.engine.connect() as connection:
+            stats = pool_stats()
+            assert stats['checkouts'] == before['checkouts'] + 1
+            assert (stats['size'], stats['max_overflow'], stats['checked_out']) == (1, 0, 1)
+            assert 'bakery_db_pool_saturation 1.0' in render_metrics()
+
+            with pytest.raises(PoolTimeout):
+                db.engine.connect()
+            assert pool_stats()['timeouts'] == before['timeouts'] + 1
+
+        output = render_metrics()
+        assert 'bakery_db_pool_saturation 0.0' in output
+        assert 'bakery_db_pool_checkout_waits_total{le="+Inf"}' in output
+        db.engine.dispose()
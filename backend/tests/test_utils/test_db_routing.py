@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import text
+from backend.app import create_app
+from backend.config import TestingConfig
+from backend.extensions import db
+from backend.models import Bakery
+from backend.services.suggest_index import get_suggest_index
+from backend.utils.db_routing import current_bind, read_from
+
+INSERT_BAKERY = "INSERT INTO bakery (id, name, zip_code, street_name, street_number) VALUES (1, :name, '2200', 'Gade', '1')"
+
+
+@pytest.fixture
+def routed_app(tmp_path):
+    """App with two SQLite files as primary and replica, holding different names for bakery 1"""
+    config = type('ReplicaConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'primary.db'}",
+        'SQLALCHEMY_BINDS': {'replica': f"sqlite:///{tmp_path / 'replica.db'}"},
+    })
+    app = create_app(config)
+    with app.app_context():
+        for engine, name in ((db.engines[None], 'Primær'), (db.engines['replica'], 'Replika')):
+            db.metadata.create_all(engine)
+            with engine.begin() as connection:
+                connection.execute(text(INSERT_BAKERY), {'name': name})
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def test_get_requests_read_from_replica(routed_app):
+    """Test that GETs are served by the replica unless the client asks for a strong read."""
+    client = routed_app.test_client()
+    assert client.get('/bakeries/1').get_json()['name'] == 'Replika'
+    assert client.get('/bakeries/1', headers={'X-Read-Consistency': 'strong'}).get_json()['name'] == 'Primær'
+
+
+def test_writes_go_to_primary(routed_app):
+    """Test that writes, and reads within the same request after them, use the primary."""
+    client = routed_app.test_client()
+    response = client.patch('/bakeries/update/1', json={'name': 'Ny Primær'})
+    assert response.status_code == 200
+    assert response.get_json()['bakery']['name'] == 'Ny Primær'
+
+    with routed_app.app_context():
+        assert db.session.execute(text("SELECT name FROM bakery WHERE id = 1")).scalar() == 'Ny Primær'
+        with db.engines['replica'].connect() as connection:
+            assert connection.execute(text("SELECT name FROM bakery WHERE id = 1")).scalar() == 'Replika'
+
+    with routed_app.test_request_context('/bakeries/1', method='GET'):
+        assert current_bind() == 'replica'
+        assert db.session.get(Bakery, 1).name == 'Replika'
+        db.session.add(Bakery(name='Nyt Bageri', zip_code='2100', street_name='Vej', street_number='2'))
+        db.session.flush()
+        assert current_bind() == 'primary'
+        assert db.session.query(Bakery).count() == 2
+        db.session.rollback()
+        db.session.remove()
+
+
+def test_read_from_override(routed_app):
+    """Test that read_from pins reads to a bind, also outside requests."""
+    with routed_app.app_context():
+        assert current_bind() == 'primary'
+        with read_from('replica'):
+            assert db.session.execute(text("SELECT name FROM bakery WHERE id = 1")).scalar() == 'Replika'
+            with read_from('primary'):
+                assert current_bind() == 'primary'
+        with pytest.raises(ValueError):
+            read_from('secondary')
+
+
+def test_snapshots_build_from_primary(routed_app):
+    """Test that a snapshot rebuilt during a replica-routed request reads the primary."""
+    with routed_app.test_request_context('/search/suggest', method='GET'):
+        assert current_bind() == 'replica'
+        names = [entry['name'] for entry in get_suggest_index().suggest('Pri')]
+        assert names == ['Primær']
+        assert current_bind() == 'replica'
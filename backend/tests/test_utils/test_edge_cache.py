@@ -0,0 +1,122 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from backend.models import Product
+from backend.utils.change_tracking import Change
+from backend.utils.edge_cache import keys_for_changes, wait_for_purges
+
+
+class StandInProxy:
+    """A tiny shared cache in front of the app that honours Surrogate-Key purges"""
+
+    def __init__(self, client):
+        self.client = client
+        self.entries = {}  # path -> (response, keys)
+        self.hits = 0
+        self.purged = []
+
+        proxy = self
+
+        class PurgeHandler(BaseHTTPRequestHandler):
+            def do_PURGE(self):
+                keys = set(self.headers.get('Surrogate-Key', '').split())
+                proxy.purged.append(keys)
+                for path, (_, tags) in list(proxy.entries.items()):
+                    if tags & keys:
+                        del proxy.entries[path]
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), PurgeHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def purge_url(self):
+        return f'http://127.0.0.1:{self.server.server_port}/'
+
+    def get(self, path):
+        if path in self.entries:
+            self.hits += 1
+            return self.entries[path][0]
+        response = self.client.get(path)
+        cache_control = response.cache_control
+        if response.status_code == 200 and cache_control.public and cache_control.s_maxage and not cache_control.no_store:
+            self.entries[path] = (response, set(response.headers.get('Surrogate-Key', '').split()))
+        return response
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def proxy(app, client):
+    proxy = StandInProxy(client)
+    app.config['EDGE_PURGE_URL'] = proxy.purge_url
+    yield proxy
+    app.config['EDGE_PURGE_URL'] = None
+    proxy.close()
+
+
+def test_policy_headers(client, app, sample_product):
+    """Test Cache-Control, Vary and Surrogate-Key on a cacheable route."""
+    with app.app_context():
+        product = Product.query.filter_by(name='Test Product').one()
+        product_id, bakery_id = product.id, product.bakery_id
+    response = client.get(f'/bakeries/{bakery_id}')
+    assert response.status_code == 200
+    assert response.cache_control.public
+    assert response.cache_control.max_age == 0
+    assert response.cache_control.s_maxage == 300
+    assert 'Origin' in response.headers['Vary']
+
+    keys = response.headers['Surrogate-Key'].split()
+    assert f'bakery/{bakery_id}' in keys
+    assert f'product/{product_id}' in keys
+
+
+def test_routes_without_policy_are_not_stored(client, regular_user):
+    """Test that responses without a declared policy are marked no-store."""
+    response = client.get('/users')
+    assert response.cache_control.no_store
+
+
+def test_keys_for_changes_include_parents():
+    """Test that a product change purges the product, its list and its bakery."""
+    changes = [Change('product', 7, 'insert', {'id': 7, 'bakery_id': 3, 'category_id': None})]
+    assert keys_for_changes(changes) == ['bakery/3', 'product', 'product/7']
+
+
+def test_commit_purges_proxy(client, proxy, sample_bakery):
+    """Test that updating a bakery purges it from the proxy."""
+    path = f'/bakeries/{sample_bakery.id}'
+    assert proxy.get(path).get_json()['name'] == 'Test Bakery'
+    proxy.get(path)
+    assert proxy.hits == 1
+
+    client.patch(f'/bakeries/update/{sample_bakery.id}', json={'name': 'Purged Bakery'})
+    wait_for_purges(timeout=5)
+
+    assert path not in proxy.entries
+    assert proxy.get(path).get_json()['name'] == 'Purged Bakery'
+
+
+def test_child_insert_purges_parent(client, proxy, sample_bakery):
+    """Test that adding a product purges the cached bakery and bakery list."""
+    proxy.get(f'/bakeries/{sample_bakery.id}')
+    proxy.get('/bakeries')
+    proxy.get('/categories')
+
+    client.post('/products/create', json={'name': 'New Bread', 'bakeryId': sample_bakery.id})
+    wait_for_purges(timeout=5)
+
+    assert f'/bakeries/{sample_bakery.id}' not in proxy.entries
+    assert '/bakeries' not in proxy.entries
+    assert '/categories' not in proxy.entries
+    products = proxy.get(f'/bakeries/{sample_bakery.id}').get_json()['products']
+    assert [p['name'] for p in products] == ['New Bread']
@@ -0,0 +1,70 @@
+import logging
+
+import pytest
+from backend.extensions import db
+from backend.models import Bakery
+from backend.services.review_service import ReviewService
+from backend.utils.metrics import render_metrics
+from backend.utils.query_stats import compile_cache_stats, normalize_sql, query_budget
+
+
+def test_normalize_sql():
+    """Test that statements differing only in parameters and IN list length share a shape."""
+    assert normalize_sql("SELECT *\n  FROM bakery WHERE id IN (?, ?, ?)") == "SELECT * FROM bakery WHERE id IN (?...)"
+    assert normalize_sql("SELECT * FROM bakery WHERE id IN (?)") == "SELECT * FROM bakery WHERE id IN (?...)"
+    assert normalize_sql("INSERT INTO t (a, b) VALUES (?, ?), (?, ?)") == "INSERT INTO t (a, b) VALUES (?...)"
+
+
+def test_header_and_n_plus_one_log(app, client, caplog):
+    """Test that responses carry the query count and repeated statements are logged with the endpoint."""
+    with app.app_context():
+        db.session.add_all(
+            Bakery(name=f'Bageri {i}', zip_code='2200', street_name='Gade', street_number=str(i)) for i in range(3)
+        )
+        db.session.commit()
+        ids = ','.join(str(bakery.id) for bakery in Bakery.query)
+    app.config.update(QUERY_COUNT_HEADER=True, N_PLUS_ONE_THRESHOLD=3)
+
+    with caplog.at_level(logging.WARNING):
+        response = client.get(f'/bakeries/stats?ids={ids}')
+    assert response.status_code == 200
+    assert int(response.headers['X-Query-Count']) >= 3
+    assert float(response.headers['X-Query-Time']) >= 0
+    suspects = [r.getMessage() for r in caplog.records if 'Possible N+1' in r.getMessage()]
+    assert suspects and 'bakery.get_multiple_bakery_stats' in suspects[0]
+    assert 'bakery_review.bakery_id = ?' in ' '.join(suspects)
+
+    app.config['QUERY_COUNT_HEADER'] = False
+    assert 'X-Query-Count' not in client.get('/bakeries/').headers
+
+
+def test_query_budget(app):
+    """Test that exceeding a budget fails with the statements listed."""
+    with app.app_context():
+        with query_budget(2) as budget:
+            db.session.get(Bakery, 1)
+        assert budget.count == 1
+
+        with pytest.raises(AssertionError, match=r'3 queries, budget 2:\n  3x SELECT'):
+            with query_budget(2):
+                for bakery_id in range(1, 4):
+                    db.session.get(Bakery, bakery_id)
+
+
+def test_compile_cache_stats(app):
+    """Test that executions of statements built once are counted as compiled cache hits and exported."""
+    with app.app_context():
+        service = ReviewService()
+        service.get_bakery_reviews_by_bakery(1)
+        before = compile_cache_stats()
+        for bakery_id in range(2, 5):
+            service.get_bakery_reviews_by_bakery(bakery_id)
+        after = compile_cache_stats([db.engine])
+        assert after['hit'] - before['hit'] == 3
+        assert after['miss'] == before['miss']
+        assert 0 < after['hit_ratio'] <= 1
+        assert 0 < after['entries'] <= after['capacity']
+
+        body = render_metrics()
+    assert 'bakery_sql_compile_cache_total{result="hit"}' in body
+    assert 'bakery_sql_compile_cache_hit_ratio ' in body
@@ -0,0 +1,58 @@
+import json
+
+from backend.extensions import db
+from backend.models import Bakery
+from backend.utils.slow_queries import get_slow_queries, parameter_shape
+
+
+def test_parameter_shape():
+    """Test that only parameter types are kept."""
+    assert parameter_shape((3, 'Brød', None)) == ['int', 'str', 'null']
+    assert parameter_shape({'zip': '2200'}) == {'zip': 'str'}
+    assert parameter_shape([(1, 'a'), (2, 'b')], executemany=True) == {'rows': 2, 'row': ['int', 'str']}
+
+
+def test_slow_statements_logged_with_plan(app, client, tmp_path):
+    """Test that statements over the threshold are logged with route, shape and SQLite query plan."""
+    path = tmp_path / 'slow.jsonl'
+    app.config.update(SLOW_QUERY_LOG=str(path), SLOW_QUERY_THRESHOLD_MS=0)
+    with app.app_context():
+        db.session.add(Bakery(name='Bageri', zip_code='2200', street_name='Gade', street_number='1'))
+        db.session.commit()
+    assert client.get('/bakeries/?zip_code=2200').status_code == 200
+
+    entries = [json.loads(line) for line in path.read_text().splitlines()]
+    assert entries[0]['sql'].startswith('INSERT INTO bakery')
+    listing = [e for e in entries if (e['route'] or {}).get('endpoint') == 'bakery.get_bakeries'
+               and e['sql'].startswith('SELECT') and 'FROM bakery' in e['sql']]
+    assert listing
+    assert listing[0]['route']['method'] == 'GET'
+    assert listing[0]['duration_ms'] >= 0
+    assert 'Gade' not in json.dumps(listing)
+    assert any('bakery' in line for line in listing[0]['plan'])
+
+    with app.app_context():
+        newest = get_slow_queries(limit=2, endpoint='bakery.get_bakeries')
+        assert len(newest) == 2 and newest[0] == [e for e in entries if e['route']][-1]
+
+    app.config['SLOW_QUERY_THRESHOLD_MS'] = 10_000
+    client.get('/bakeries/')
+    assert len(path.read_text().splitlines()) == len(entries)
+
+
+def test_log_rotates(app, tmp_path):
+    """Test that the log rotates, keeps the configured backups and reads on into them."""
+    path = tmp_path / 'slow.jsonl'
+    app.config.update(SLOW_QUERY_LOG=str(path), SLOW_QUERY_THRESHOLD_MS=0,
+                      SLOW_QUERY_LOG_MAX_BYTES=2000, SLOW_QUERY_LOG_BACKUPS=2)
+    with app.app_context():
+        for bakery_id in range(40):
+            db.session.get(Bakery, bakery_id)
+        kept = [path, tmp_path / 'slow.jsonl.1', tmp_path / 'slow.jsonl.2']
+        assert sorted(p.name for p in tmp_path.iterdir()) == sorted(p.name for p in kept)
+        lines = sum(len(p.read_text().splitlines()) for p in kept)
+
+        entries = get_slow_queries(limit=500)
+        assert 0 < len(entries) == lines < 40
+        assert entries[0]['params'] == ['int']
+        assert len(get_slow_queries(limit=3)) == 3
@@ -0,0 +1,44 @@
+import pytest
+from backend.app import create_app
+from backend.config import TestingConfig
+from backend.extensions import db
+from backend.utils.sqlite_profile import current_pragmas, profile_pragmas
+
+PRAGMAS = ('journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'temp_store', 'busy_timeout', 'foreign_keys')
+
+
+def _pragmas_of(tmp_path, **settings):
+    config = type('FileConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'profile.db'}", **settings,
+    })
+    app = create_app(config)
+    with app.app_context():
+        with db.engine.connect() as connection:
+            pragmas = current_pragmas(connection, PRAGMAS)
+        db.engine.dispose()
+    return pragmas
+
+
+def test_performance_profile(tmp_path):
+    """Test that new connections get WAL and the tuned pragmas, with overrides applied."""
+    pragmas = _pragmas_of(tmp_path, SQLITE_PROFILE='performance', SQLITE_PRAGMAS='cache_size=-2000')
+    assert pragmas == {
+        'journal_mode': 'wal', 'synchronous': 1, 'mmap_size': 256 * 1024 * 1024, 'cache_size': -2000,
+        'temp_store': 2, 'busy_timeout': 5000, 'foreign_keys': 1,
+    }
+
+
+def test_default_profile(tmp_path):
+    """Test that the default profile only turns on foreign keys."""
+    pragmas = _pragmas_of(tmp_path, SQLITE_PROFILE='default')
+    assert pragmas['journal_mode'] == 'delete'
+    assert pragmas['synchronous'] == 2
+    assert pragmas['foreign_keys'] == 1
+
+
+def test_invalid_settings():
+    """Test that unknown profiles and malformed pragma names are rejected."""
+    with pytest.raises(ValueError):
+        profile_pragmas('fastest')
+    with pytest.raises(ValueError):
+        profile_pragmas('default', {'cache_size; DROP TABLE user': 1})
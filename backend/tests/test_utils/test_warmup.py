@@ -0,0 +1,48 @@
+import time
+from backend.utils import warmup
+from backend.utils.warmup import warm_cache, get_hot_keys
+
+
+def test_hot_keys_registered(app):
+    """Test that the blueprints register their hot endpoints."""
+    names = [name for name, _ in get_hot_keys()]
+    assert 'bakeries' in names
+    assert 'top_bakeries' in names
+    assert 'categories' in names
+    assert 'subcategory_products' in names
+
+
+def test_warm_cache_reports_each_key(app, sample_bakery, sample_subcategory):
+    """Test warming every hot key and reporting timings."""
+    report = warm_cache(app, concurrency=2, time_budget=30)
+    paths = {entry['path']: entry for entry in report}
+
+    assert paths['/bakeries']['status'] == 200
+    assert paths['/categories']['status'] == 200
+    assert paths[f'/products/subcategory/{sample_subcategory.id}']['status'] == 200
+    assert all(entry['elapsed_ms'] is not None for entry in report)
+
+
+def test_warm_cache_respects_time_budget(app, sample_bakery):
+    """Test that nothing is requested once the time budget is spent."""
+    report = warm_cache(app, concurrency=1, time_budget=0)
+    assert report
+    assert all(entry['status'] in ('skipped', 'timeout') for entry in report)
+
+
+def test_in_flight_requests_finish_within_grace(app, monkeypatch):
+    """Test that a request running at the deadline reports its real status, and queued ones are skipped."""
+    def slow(n):
+        time.sleep(0.3)
+        return 'ok'
+
+    app.add_url_rule('/slow/<int:n>', 'slow', slow)
+    monkeypatch.setattr(warmup, '_hot_keys', [('slow', '/slow/1'), ('slow', '/slow/2')])
+
+    report = {entry['path']: entry for entry in warm_cache(app, concurrency=1, time_budget=0.1, grace=2)}
+    assert report['/slow/1']['status'] == 200
+    assert report['/slow/1']['elapsed_ms'] >= 300
+    assert report['/slow/2']['status'] == 'skipped'
+
+    report = {entry['path']: entry for entry in warm_cache(app, concurrency=1, time_budget=0.1, grace=0)}
+    assert report['/slow/1']['status'] == 'timeout'
@@ -0,0 +1,97 @@
+import sqlite3
+import threading
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from backend.app import create_app
+from backend.config import TestingConfig
+from backend.extensions import db
+from backend.models import Bakery, BakeryReview
+from backend.services.review_service import ReviewService
+from backend.utils.write_coordinator import DatabaseBusy, busy_response, is_lock_error, serialized_write
+
+
+def _locked():
+    return OperationalError('INSERT INTO bakery_review ...', {}, sqlite3.OperationalError('database is locked'))
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    config = type('FileConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'writes.db'}",
+        'SQLITE_WRITE_BACKOFF': 0.001,
+    })
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_is_lock_error():
+    """Test that lock errors are recognized, also when a service re-raised them."""
+    assert is_lock_error(_locked())
+    try:
+        try:
+            raise _locked()
+        except OperationalError as e:
+            raise Exception(f"Database error: {str(e)}")
+    except Exception as wrapped:
+        assert is_lock_error(wrapped)
+    assert not is_lock_error(OperationalError('SELECT', {}, sqlite3.OperationalError('no such table: bakery')))
+    assert not is_lock_error(ValueError('database is locked'))
+
+
+def test_retries_then_gives_up(file_app):
+    """Test that lock errors are retried and turn into DatabaseBusy once the retries run out."""
+    calls = []
+
+    @serialized_write
+    def write(failures):
+        calls.append(1)
+        if len(calls) <= failures:
+            raise _locked()
+        return 'written'
+
+    assert write(2) == 'written'
+    assert len(calls) == 3
+
+    calls.clear()
+    file_app.config['SQLITE_WRITE_RETRIES'] = 2
+    with pytest.raises(DatabaseBusy):
+        write(10)
+    assert len(calls) == 3
+
+    with file_app.test_request_context():
+        response = busy_response(DatabaseBusy(retry_after=2))
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '2'
+
+
+def test_concurrent_writers(file_app):
+    """Test that writers in several threads all get their reviews in without lock errors."""
+    bakery = Bakery(name='Bageriet', zip_code='2200', street_name='S', street_number='1')
+    db.session.add(bakery)
+    db.session.commit()
+    bakery_id = bakery.id
+    errors = []
+
+    def writer():
+        with file_app.app_context():
+            service = ReviewService()
+            for i in range(20):
+                try:
+                    service.create_bakery_review('Sprød', i % 10 + 1, None, None, None, None, None, bakery_id)
+                except Exception as e:
+                    errors.append(e)
+            db.session.remove()
+
+    threads = [threading.Thread(target=writer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert db.session.query(BakeryReview).count() == 80
@@ -0,0 +1,92 @@
+"""
+Async database access for the async view variants.
+
+With ``ASYNC_VIEWS`` on, ``init_async_db`` creates an ``AsyncEngine`` next
+to Flask-SQLAlchemy's engine, on the async driver for the same database
+(``aiosqlite`` for SQLite, ``asyncpg`` for PostgreSQL). The async views only
+read, so it points at the read replica when there is one; requests that ask
+for a strong read are served by the sync views instead.
+
+Flask runs every async view in an event loop of its own, so connections
+can't be kept across requests; the engine opens one per use (``NullPool``,
+which is what SQLAlchemy picks for aiosqlite anyway). ``fetch_all`` runs
+independent statements concurrently, each on its own connection.
+
+An in-memory SQLite database can't be shared with a second engine, so there
+is no async engine for it and the sync views stay in place.
+"""
+import asyncio
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+from backend.extensions import db
+
+# Sync driver -> async driver
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql',
+}
+
+
+def async_database_url(url):
+    """The URL of the same database with an async driver"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if url.get_dialect().is_async:
+        return url
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for '{backend}', expected one of: {', '.join(ASYNC_DRIVERS)}")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def init_async_db(app, on_connect=None):
+    """Create the app's async engine when ASYNC_VIEWS is on; returns it or None.
+
+    ``on_connect`` is attached to the engine's ``connect`` event, e.g. to
+    set the same SQLite pragmas as the sync engine.
+    """
+    if not app.config.get('ASYNC_VIEWS'):
+        return None
+    url = make_url(app.config.get('DATABASE_REPLICA_URL') or app.config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        app.logger.info("Async views disabled: an in-memory SQLite database can't be shared with an async engine")
+        return None
+
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(async_database_url(url), poolclass=NullPool)
+    if on_connect is not None and url.get_backend_name() == 'sqlite':
+        event.listen(engine.sync_engine, 'connect', on_connect)
+    app.extensions['async_engine'] = engine
+    return engine
+
+
+def get_async_engine():
+    """The current app's async engine, or None"""
+    return current_app.extensions.get('async_engine')
+
+
+def instrumented_engines(app):
+    """Sync engines to attach statement listeners to: Flask-SQLAlchemy's and the async engine's"""
+    with app.app_context():
+        engines = list(db.engines.values())
+    async_engine = app.extensions.get('async_engine')
+    if async_engine is not None:
+        engines.append(async_engine.sync_engine)
+    return engines
+
+
+async def fetch_all(statements, parameters=None):
+    """{name: rows} for a dict of independent statements, run concurrently with the same parameters"""
+    engine = get_async_engine()
+
+    async def fetch(statement):
+        async with engine.connect() as connection:
+            return (await connection.execute(statement, parameters)).all()
+
+    results = await asyncio.gather(*(fetch(statement) for statement in statements.values()))
+    return dict(zip(statements, results))
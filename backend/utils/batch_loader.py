@@ -0,0 +1,132 @@
+"""
+Batched relationship loading.
+
+Serializing a list of reviews reads ``review.user`` and ``review.bakery`` on
+every row, and each of those is a lazy load: one query per row and
+relationship. ``load_relationship`` resolves one relationship for a whole
+list of instances the way a DataLoader does: it collects the keys the rows
+need, answers what it can from the session's identity map (which lives for
+the request, so rows loaded earlier in the request are reused) and fetches
+the rest with one ``IN`` query, then sets the attribute on every instance as
+if it had been loaded. Instances that already have the attribute loaded are
+left alone, so calling it again costs nothing.
+
+Only relationships over a single column pair are batched; anything else is
+left to its normal lazy load.
+"""
+from collections import defaultdict
+
+from sqlalchemy import inspect, select
+from sqlalchemy.exc import NoInspectionAvailable
+from sqlalchemy.orm import attributes, interfaces
+from sqlalchemy.orm.util import identity_key
+
+from backend.extensions import db
+
+# Keys per IN query; longer lists are split
+BATCH_SIZE = 500
+
+
+def _chunks(values):
+    values = list(values)
+    for start in range(0, len(values), BATCH_SIZE):
+        yield values[start:start + BATCH_SIZE]
+
+
+def _unloaded(objects, key):
+    """Persistent instances among ``objects`` whose ``key`` attribute isn't loaded yet"""
+    pending = []
+    for obj in objects:
+        state = inspect(obj)
+        if state.persistent and key not in state.dict:
+            pending.append(obj)
+    return pending
+
+
+def _column_key(mapper, column):
+    return mapper.get_property_by_column(column).key
+
+
+def _load_many_to_one(session, objects, prop, local_column, remote_column):
+    target = prop.mapper
+    local_key = _column_key(prop.parent, local_column)
+    wanted = {getattr(obj, local_key) for obj in objects} - {None}
+
+    found = {}
+    simple_key = len(target.primary_key) == 1 and target.primary_key[0] is remote_column
+    missing = set()
+    for value in wanted:
+        cached = session.identity_map.get(identity_key(target.class_, value)) if simple_key else None
+        if cached is not None and not inspect(cached).expired:
+            found[value] = cached
+        else:
+            missing.add(value)
+
+    remote_key = _column_key(target, remote_column)
+    for chunk in _chunks(missing):
+        for row in session.scalars(select(target).where(remote_column.in_(chunk))):
+            found[getattr(row, remote_key)] = row
+
+    for obj in objects:
+        attributes.set_committed_value(obj, prop.key, found.get(getattr(obj, local_key)))
+
+
+def _load_one_to_many(session, objects, prop, local_column, remote_column):
+    target = prop.mapper
+    local_key = _column_key(prop.parent, local_column)
+    remote_key = _column_key(target, remote_column)
+    wanted = {getattr(obj, local_key) for obj in objects} - {None}
+
+    grouped = defaultdict(list)
+    for chunk in _chunks(wanted):
+        statement = select(target).where(remote_column.in_(chunk))
+        if prop.order_by:
+            statement = statement.order_by(*prop.order_by)
+        for row in session.scalars(statement):
+            grouped[getattr(row, remote_key)].append(row)
+
+    for obj in objects:
+        rows = grouped.get(getattr(obj, local_key), [])
+        attributes.set_committed_value(obj, prop.key, rows if prop.uselist else (rows[0] if rows else None))
+
+
+def load_relationship(objects, key):
+    """Load relationship ``key`` on all ``objects`` (instances of one model) with one query.
+
+    Returns the related instances of all ``objects``, for batching the next
+    level. Objects that aren't mapped, or relationships that can't be batched,
+    are skipped (they load lazily as before).
+    """
+    objects = [obj for obj in objects if obj is not None]
+    if not objects:
+        return []
+    try:
+        mapper = inspect(type(objects[0]))
+    except NoInspectionAvailable:
+        return []
+    prop = mapper.relationships.get(key)
+    if prop is None or prop.secondary is not None or len(prop.local_remote_pairs) != 1:
+        return []
+
+    pending = _unloaded(objects, key)
+    if pending:
+        session = db.session()
+        local_column, remote_column = prop.local_remote_pairs[0]
+        if prop.direction is interfaces.MANYTOONE:
+            _load_many_to_one(session, pending, prop, local_column, remote_column)
+        elif prop.direction is interfaces.ONETOMANY:
+            _load_one_to_many(session, pending, prop, local_column, remote_column)
+        else:
+            return []
+    return _related(objects, key)
+
+
+def _related(objects, key):
+    """Related instances already loaded on ``objects``, without duplicates"""
+    related = {}
+    for obj in objects:
+        value = inspect(obj).dict.get(key)
+        for item in (value if isinstance(value, (list, tuple)) else [value]):
+            if item is not None:
+                related[id(item)] = item
+    return list(related.values())
@@ -2,7 +2,11 @@ from flask_caching import Cache
 from flask import request, current_app
 import hashlib
 import json
+import pickle
+import threading
+import time
 from backend.config import DevelopmentConfig, ProductionConfig
+from backend.utils.metrics import Metric, register_collector
 
 
 # Initialize cache
@@ -29,9 +33,223 @@ def configure_cache(app):
     
     # Initialize with app
     cache.init_app(app, config=cache_config)
+
+    # Wrap the backend so every get/set/delete is counted
+    stats = CacheStats()
+    app.extensions['cache'][cache] = InstrumentedCacheBackend(app.extensions['cache'][cache], stats)
+    app.extensions['cache_stats'] = stats
+
+    @app.teardown_request
+    def _forget_pending_misses(exc):
+        # A miss the request did not refill is not going to be refilled later
+        stats.forget_pending_misses()
     
     return cache
 
+# === Instrumentation ===
+
+def cache_key_prefix(key):
+    """Group a cache key by its first two path segments.
+
+    'view//categories/' -> 'view/categories', 'neg/bakery/5' -> 'neg/bakery'.
+    Keys without a path (memoized functions) are grouped under 'other'.
+    """
+    parts = [part for part in str(key).split('/') if part]
+    if len(parts) < 2:
+        return 'other'
+    return f"{parts[0]}/{parts[1]}"
+
+class _PrefixStats:
+    """Counters for one key prefix"""
+
+    __slots__ = ('hits', 'misses', 'sets', 'deletes', 'evictions', 'expirations',
+                 'bytes_written', 'max_value_size', 'recomputes', 'recompute_ms')
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def to_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "sets": self.sets,
+            "deletes": self.deletes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "avg_value_size": round(self.bytes_written / self.sets) if self.sets else 0,
+            "max_value_size": self.max_value_size,
+            "recomputes": self.recomputes,
+            "avg_recompute_ms": round(self.recompute_ms / self.recomputes, 3) if self.recomputes else None,
+        }
+
+class CacheStats:
+    """Per-key-prefix cache statistics, safe to update from several threads.
+
+    Evictions are inferred: a miss on a key we stored and never deleted means
+    the backend dropped it, either because it expired or because it was pruned.
+    Recompute latency is the time between a miss and the next set of that key
+    on the same thread, i.e. how long the view took to rebuild the value.
+    Misses that are never followed by a set (negative lookups, generation
+    keys) are forgotten at the end of the request, and in any case once they
+    are older than PENDING_MISS_TTL or more than MAX_PENDING_MISSES are waiting.
+    """
+
+    # Upper bound on how many stored keys are remembered for eviction tracking
+    MAX_TRACKED_KEYS = 10_000
+    # Bounds on the misses per thread still waiting for their set
+    MAX_PENDING_MISSES = 1_000
+    PENDING_MISS_TTL = 60  # seconds
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._prefixes = {}
+        self._stored = {}  # key -> expiry (monotonic seconds) or None
+        self._local = threading.local()
+
+    def _get(self, key):
+        prefix = cache_key_prefix(key)
+        stats = self._prefixes.get(prefix)
+        if stats is None:
+            stats = self._prefixes[prefix] = _PrefixStats()
+        return stats
+
+    def _pending_misses(self):
+        pending = getattr(self._local, 'pending', None)
+        if pending is None:
+            pending = self._local.pending = {}
+        return pending
+
+    def record_hit(self, key):
+        with self._lock:
+            self._get(key).hits += 1
+
+    def record_miss(self, key):
+        now = time.monotonic()
+        with self._lock:
+            stats = self._get(key)
+            stats.misses += 1
+            if key in self._stored:
+                expires = self._stored.pop(key)
+                if expires is not None and expires <= now:
+                    stats.expirations += 1
+                else:
+                    stats.evictions += 1
+        pending = self._pending_misses()
+        pending.pop(key, None)  # keep the oldest miss first
+        if len(pending) >= self.MAX_PENDING_MISSES:
+            pending.pop(next(iter(pending)))
+        pending[key] = time.perf_counter()
+
+    def forget_pending_misses(self):
+        """Drop the misses this thread has not refilled"""
+        self._local.pending = {}
+
+    def record_set(self, key, value, timeout):
+        try:
+            size = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            size = 0
+        started = self._pending_misses().pop(key, None)
+        if started is not None and time.perf_counter() - started > self.PENDING_MISS_TTL:
+            started = None
+        expires = time.monotonic() + timeout if timeout else None
+
+        with self._lock:
+            stats = self._get(key)
+            stats.sets += 1
+            stats.bytes_written += size
+            stats.max_value_size = max(stats.max_value_size, size)
+            if started is not None:
+                stats.recomputes += 1
+                stats.recompute_ms += (time.perf_counter() - started) * 1000
+            if len(self._stored) >= self.MAX_TRACKED_KEYS and key not in self._stored:
+                self._stored.pop(next(iter(self._stored)))
+            self._stored[key] = expires
+
+    def record_delete(self, key):
+        with self._lock:
+            self._get(key).deletes += 1
+            self._stored.pop(key, None)
+
+    def record_clear(self):
+        with self._lock:
+            self._stored.clear()
+
+    def snapshot(self):
+        """Return the counters per prefix plus overall totals"""
+        with self._lock:
+            prefixes = {prefix: stats.to_dict() for prefix, stats in sorted(self._prefixes.items())}
+            tracked_keys = len(self._stored)
+        totals = {
+            name: sum(p[name] for p in prefixes.values())
+            for name in ('hits', 'misses', 'sets', 'deletes', 'evictions', 'expirations', 'recomputes')
+        }
+        lookups = totals['hits'] + totals['misses']
+        totals['hit_ratio'] = round(totals['hits'] / lookups, 4) if lookups else None
+        totals['tracked_keys'] = tracked_keys
+        return {"totals": totals, "prefixes": prefixes}
+
+    def reset(self):
+        with self._lock:
+            self._prefixes.clear()
+            self._stored.clear()
+
+class InstrumentedCacheBackend:
+    """Proxy around a flask_caching backend that feeds CacheStats"""
+
+    def __init__(self, backend, stats):
+        self._backend = backend
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._backend, name)
+
+    def _timeout(self, timeout):
+        if timeout is None:
+            timeout = getattr(self._backend, 'default_timeout', 0)
+        return timeout
+
+    def get(self, key):
+        value = self._backend.get(key)
+        if value is None:
+            self._stats.record_miss(key)
+        else:
+            self._stats.record_hit(key)
+        return value
+
+    def set(self, key, value, timeout=None):
+        result = self._backend.set(key, value, timeout=timeout)
+        if result:
+            self._stats.record_set(key, value, self._timeout(timeout))
+        return result
+
+    def add(self, key, value, timeout=None):
+        result = self._backend.add(key, value, timeout=timeout)
+        if result:
+            self._stats.record_set(key, value, self._timeout(timeout))
+        return result
+
+    def delete(self, key):
+        self._stats.record_delete(key)
+        return self._backend.delete(key)
+
+    def delete_many(self, *keys):
+        for key in keys:
+            self._stats.record_delete(key)
+        return self._backend.delete_many(*keys)
+
+    def clear(self):
+        self._stats.record_clear()
+        return self._backend.clear()
+
+def get_cache_stats():
+    """Return the current app's cache statistics"""
+    stats = current_app.extensions.get('cache_stats')
+    return stats.snapshot() if stats else {"totals": {}, "prefixes": {}}
+
 def cache_key_with_query():
     """Generate a cache key including the query parameters"""
     path = request.path
@@ -124,3 +342,70 @@ def cache_query_result(model_name, query_func, timeout=300):
 def clear_all_cache():
     """Clear the entire cache"""
     return cache.clear()
+
+
+# === Negative caching ===
+#
+# Lookups that found nothing (unknown ids, searches with no results) are
+# remembered for a short time so repeated misses don't reach the database.
+# Entity misses are keyed by id and forgotten when that id is created. Search
+# misses are keyed by the normalized term under a per-kind generation that is
+# bumped whenever an entity of that kind is created or changed.
+
+def normalize_search_term(term):
+    """Normalize a search term for use in cache keys"""
+    return ' '.join((term or '').casefold().split())
+
+def _negative_generation(kind):
+    return cache.get(f"neg/{kind}/generation") or 0
+
+def _negative_key(kind, key):
+    if kind.endswith('_search'):
+        term_hash = hashlib.md5(normalize_search_term(key).encode('utf-8')).hexdigest()
+        return f"neg/{kind}/{_negative_generation(kind)}/{term_hash}"
+    return f"neg/{kind}/{key}"
+
+def remember_missing(kind, key, timeout=None):
+    """Record that a lookup for ``key`` found nothing"""
+    if timeout is None:
+        timeout = current_app.config.get('NEGATIVE_CACHE_TIMEOUT', 30)
+    cache.set(_negative_key(kind, key), True, timeout=timeout)
+
+def is_known_missing(kind, key):
+    """True if a recent lookup for ``key`` found nothing"""
+    return bool(cache.get(_negative_key(kind, key)))
+
+def forget_missing(kind, key):
+    """Drop the negative entry for ``key``"""
+    cache.delete(_negative_key(kind, key))
+
+def invalidate_missing_searches(kind):
+    """Drop every negative search entry of ``kind`` by moving to a new generation"""
+    generation_key = f"neg/{kind}/generation"
+    cache.set(generation_key, _negative_generation(kind) + 1, timeout=0)
+
+
+@register_collector
+def _cache_metrics():
+    """Export cache statistics per key prefix"""
+    prefixes = get_cache_stats()['prefixes']
+    counters = {
+        'hits': Metric('bakery_cache_hits_total', 'counter', 'Cache lookups that found a value'),
+        'misses': Metric('bakery_cache_misses_total', 'counter', 'Cache lookups that found nothing'),
+        'sets': Metric('bakery_cache_sets_total', 'counter', 'Values written to the cache'),
+        'deletes': Metric('bakery_cache_deletes_total', 'counter', 'Explicit cache deletions'),
+        'evictions': Metric('bakery_cache_evictions_total', 'counter', 'Stored values pruned by the backend'),
+        'expirations': Metric('bakery_cache_expirations_total', 'counter', 'Stored values that expired'),
+    }
+    avg_size = Metric('bakery_cache_value_size_bytes_avg', 'gauge', 'Average pickled size of written values')
+    max_size = Metric('bakery_cache_value_size_bytes_max', 'gauge', 'Largest pickled size of a written value')
+    recompute = Metric('bakery_cache_recompute_ms_avg', 'gauge', 'Average time from a miss to the value being stored')
+
+    for prefix, stats in prefixes.items():
+        for name, metric in counters.items():
+            metric.add(stats[name], prefix=prefix)
+        avg_size.add(stats['avg_value_size'], prefix=prefix)
+        max_size.add(stats['max_value_size'], prefix=prefix)
+        recompute.add(stats['avg_recompute_ms'], prefix=prefix)
+
+    return list(counters.values()) + [avg_size, max_size, recompute]
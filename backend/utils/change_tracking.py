@@ -0,0 +1,118 @@
+"""
+Commit-time change notifications.
+
+Every flush records which rows were inserted, updated or deleted. Once the
+transaction commits, the collected changes are handed to the listeners
+registered with ``on_commit``; a rollback discards them. Listeners use this to
+drop or rebuild in-process snapshots without each write path having to know
+about them. Listeners registered with ``on_flush`` get each flush's changes
+while its transaction is still open, to write bookkeeping rows that commit or
+roll back together with the change.
+"""
+import logging
+from collections import namedtuple
+from sqlalchemy import event, inspect
+
+from backend.extensions import db
+
+logger = logging.getLogger(__name__)
+
+# A single row change. ``values`` holds the column values loaded at flush time.
+Change = namedtuple('Change', ['table', 'id', 'op', 'values'])
+
+# Registered listeners: (set of table names or None for all tables, callback)
+_listeners = []
+_flush_listeners = []
+
+
+def on_commit(*tables):
+    """Register a callback for committed changes to the given tables.
+
+    The callback receives the list of ``Change`` tuples for those tables.
+    Without table names it receives every change.
+    """
+    def decorator(fn):
+        _listeners.append((frozenset(tables) or None, fn))
+        return fn
+    return decorator
+
+
+def on_flush(*tables):
+    """Register a callback for the changes of every flush to the given tables.
+
+    The callback receives the session and the list of ``Change`` tuples, and
+    runs inside the flushing transaction: it may execute Core statements on
+    ``session.connection()`` but must not add or modify ORM objects. Errors
+    propagate and fail the flush.
+    """
+    def decorator(fn):
+        _flush_listeners.append((frozenset(tables) or None, fn))
+        return fn
+    return decorator
+
+
+def _column_values(state):
+    """Column values already loaded on an instance (never triggers a load)"""
+    return {
+        attr.key: state.dict[attr.key]
+        for attr in state.mapper.column_attrs
+        if attr.key in state.dict
+    }
+
+
+def _record_changes(session, flush_context):
+    """Collect the rows touched by this flush until the transaction ends"""
+    changes = []
+    for op, instances in (('insert', session.new), ('update', session.dirty), ('delete', session.deleted)):
+        for obj in instances:
+            if op == 'update' and not session.is_modified(obj, include_collections=False):
+                continue
+            state = inspect(obj)
+            # Identity keys of new rows are only assigned after this hook, so
+            # read the primary key straight from the instance state
+            identity = tuple(
+                state.dict.get(state.mapper.get_property_by_column(column).key)
+                for column in state.mapper.primary_key
+            )
+            changes.append(Change(
+                table=state.mapper.local_table.name,
+                id=identity[0] if len(identity) == 1 else identity,
+                op=op,
+                values=_column_values(state),
+            ))
+    session.info.setdefault('pending_changes', []).extend(changes)
+
+    for tables, callback in _flush_listeners:
+        relevant = changes if tables is None else [c for c in changes if c.table in tables]
+        if relevant:
+            callback(session, relevant)
+
+
+def _dispatch_changes(session):
+    """Hand committed changes to the registered listeners"""
+    changes = session.info.pop('pending_changes', None)
+    if not changes:
+        return
+
+    for tables, callback in _listeners:
+        relevant = changes if tables is None else [c for c in changes if c.table in tables]
+        if not relevant:
+            continue
+        try:
+            callback(relevant)
+        except Exception as e:
+            logger.error(f"Change listener {callback.__name__} failed: {e}")
+
+
+def _discard_changes(session):
+    """Forget changes from a rolled back transaction"""
+    session.info.pop('pending_changes', None)
+
+
+def init_change_tracking():
+    """Attach the session listeners (safe to call more than once)"""
+    if event.contains(db.session, 'after_flush', _record_changes):
+        return
+    event.listen(db.session, 'after_flush', _record_changes)
+    event.listen(db.session, 'after_commit', _dispatch_changes)
+    event.listen(db.session, 'after_rollback', _discard_changes)
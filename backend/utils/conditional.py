@@ -0,0 +1,116 @@
+"""
+HTTP conditional GET (ETag / Last-Modified).
+
+A list endpoint declares which tables its response is built from. Every flush
+that inserts, updates or deletes rows of a table bumps that table's row in
+``table_version`` inside the same transaction, so the change is visible to
+every worker the moment it commits. Before the view runs, one primary-key
+lookup reads the version and (UTC) change time of each table; together they
+fingerprint the response without having to build or serialize it. Matching
+``If-None-Match`` / ``If-Modified-Since`` requests are answered with 304
+straight away.
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import request, make_response
+from sqlalchemy import insert, select, update
+from werkzeug.http import http_date
+
+from backend.extensions import db
+from backend.models import TableVersion
+from backend.utils.change_tracking import on_flush
+
+# Bump to invalidate every ETag handed out so far (e.g. after a payload shape change)
+ETAG_VERSION = '2'
+
+_versions = TableVersion.__table__
+
+
+@on_flush()
+def _bump_table_versions(session, changes):
+    """Count the flushed changes against their tables, in the writing transaction"""
+    tables = sorted({change.table for change in changes})
+    now = datetime.utcnow()
+    connection = session.connection()
+    bumped = connection.execute(
+        update(_versions)
+        .where(_versions.c.table_name.in_(tables))
+        .values(version=_versions.c.version + 1, changed_at=now)
+    )
+    if bumped.rowcount < len(tables):
+        # First change to a table the migration did not seed (e.g. create_all databases)
+        known = set(connection.execute(
+            select(_versions.c.table_name).where(_versions.c.table_name.in_(tables))
+        ).scalars())
+        connection.execute(insert(_versions), [
+            {'table_name': name, 'version': 1, 'changed_at': now}
+            for name in tables if name not in known
+        ])
+
+
+def table_fingerprints(*tables):
+    """Return {table: (version, changed_at)}; tables never written to are (0, None)"""
+    rows = db.session.execute(
+        select(_versions.c.table_name, _versions.c.version, _versions.c.changed_at)
+        .where(_versions.c.table_name.in_(tables))
+    )
+    found = {name: (version, changed_at) for name, version, changed_at in rows}
+    return {name: found.get(name, (0, None)) for name in tables}
+
+
+def _last_modified(tables, fingerprints):
+    """Latest change across the tables in UTC, truncated to seconds"""
+    changed = [fingerprints[name][1] for name in tables if fingerprints[name][1] is not None]
+    if not changed:
+        return None
+    return max(changed).replace(microsecond=0, tzinfo=timezone.utc)
+
+
+def _etag(tables, fingerprints):
+    digest = hashlib.sha1(ETAG_VERSION.encode())
+    digest.update(request.full_path.encode())
+    for name in tables:
+        digest.update(repr((name,) + fingerprints[name]).encode())
+    return digest.hexdigest()
+
+
+def _not_modified(etag, last_modified):
+    """Evaluate the request preconditions (RFC 7232 section 6)"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def conditional(*tables):
+    """Serve a GET view with ETag/Last-Modified derived from the given tables.
+
+    Matching conditional requests get an empty 304 without the view being
+    called. Successful responses carry the ETag and Last-Modified headers.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+
+            fingerprints = table_fingerprints(*tables)
+            etag = _etag(tables, fingerprints)
+            last_modified = _last_modified(tables, fingerprints)
+
+            if _not_modified(etag, last_modified):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified:
+                response.headers['Last-Modified'] = http_date(last_modified)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,165 @@
+"""
+Connection pool profiles and pool metrics.
+
+``configure_pool`` builds ``SQLALCHEMY_ENGINE_OPTIONS`` before the engine is
+created, from the profile in ``DB_POOL_PROFILE``:
+
+- ``default`` keeps SQLAlchemy's pool (5 connections, 10 overflow, 30 s
+  timeout, no recycling, no pre-ping). Fine for SQLite, where connections
+  are local files and never go stale.
+- ``server`` is for server databases behind ``DATABASE_URL``: a larger pool
+  that fails fast when it runs dry, recycles connections before the server
+  or a proxy drops them, and pings a connection before handing it out.
+- ``auto`` (the default) picks ``default`` for SQLite and ``server`` for
+  everything else.
+
+Single settings override the profile (``DB_POOL_SIZE``, ``DB_MAX_OVERFLOW``,
+``DB_POOL_TIMEOUT``, ``DB_POOL_RECYCLE``, ``DB_POOL_PRE_PING``,
+``DB_STATEMENT_CACHE_SIZE``), and anything set in ``SQLALCHEMY_ENGINE_OPTIONS``
+itself wins over both.
+
+Queue pools are swapped for ``TimedQueuePool``, which records how long each
+checkout waited. Together with the pool's occupancy this is exported as
+metrics, to size workers and pools against the database's connection limit.
+"""
+import bisect
+import threading
+import time
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import QueuePool
+
+from backend.extensions import db
+from backend.utils.metrics import Metric, register_collector
+
+POOL_PROFILES = {
+    'default': {},
+    'server': {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_timeout': 5,       # seconds; better a quick 500 than a request stuck behind the pool
+        'pool_recycle': 1800,    # seconds
+        'pool_pre_ping': True,
+    },
+}
+
+# config key -> (engine option, parser)
+_SETTINGS = {
+    'DB_POOL_SIZE': ('pool_size', int),
+    'DB_MAX_OVERFLOW': ('max_overflow', int),
+    'DB_POOL_TIMEOUT': ('pool_timeout', float),
+    'DB_POOL_RECYCLE': ('pool_recycle', int),
+    'DB_POOL_PRE_PING': ('pool_pre_ping', lambda value: str(value).lower() in ('1', 'true', 'yes')),
+    'DB_STATEMENT_CACHE_SIZE': ('query_cache_size', int),
+}
+# Options only a queue pool accepts
+_QUEUE_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout')
+
+# Upper bounds (seconds) of the checkout wait buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+_stats = {'checkouts': 0, 'timeouts': 0, 'wait_seconds': 0.0, 'buckets': [0] * (len(WAIT_BUCKETS) + 1)}
+_stats_lock = threading.Lock()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeout:
+            with _stats_lock:
+                _stats['timeouts'] += 1
+            raise
+        waited = time.perf_counter() - started
+        with _stats_lock:
+            _stats['checkouts'] += 1
+            _stats['wait_seconds'] += waited
+            _stats['buckets'][bisect.bisect_left(WAIT_BUCKETS, waited)] += 1
+        return connection
+
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database, profile and overrides"""
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    profile = config.get('DB_POOL_PROFILE') or 'auto'
+    if profile == 'auto':
+        profile = 'default' if url.get_backend_name() == 'sqlite' else 'server'
+    if profile not in POOL_PROFILES:
+        raise ValueError(f"Unknown pool profile '{profile}', expected auto or one of: {', '.join(POOL_PROFILES)}")
+
+    options = dict(POOL_PROFILES[profile])
+    for key, (option, parse) in _SETTINGS.items():
+        value = config.get(key)
+        if value not in (None, ''):
+            options[option] = parse(value)
+    options.update(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+
+    if _is_memory_sqlite(url):
+        # One shared connection (StaticPool); there is no pool to size
+        for option in _QUEUE_OPTIONS + ('pool_recycle', 'pool_pre_ping'):
+            options.pop(option, None)
+    else:
+        options.setdefault('poolclass', TimedQueuePool)
+    return options
+
+
+def configure_pool(app):
+    """Set SQLALCHEMY_ENGINE_OPTIONS; call before the database extension is initialised"""
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+
+
+def pool_stats():
+    """Checkout counters, plus the occupancy of the app's pool when it is a queue pool"""
+    with _stats_lock:
+        stats = {**_stats, 'buckets': list(_stats['buckets'])}
+    pool = db.engine.pool
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+        )
+    return stats
+
+
+@register_collector
+def _pool_metrics():
+    """Export pool checkout latency and saturation"""
+    stats = pool_stats()
+    waits = Metric('bakery_db_pool_checkout_waits_total', 'counter',
+                   'Pool checkouts by wait time, cumulative per upper bound in seconds')
+    cumulative = 0
+    for bound, count in zip(WAIT_BUCKETS + ('+Inf',), stats['buckets']):
+        cumulative += count
+        waits.add(cumulative, le=bound)
+    metrics = [
+        Metric('bakery_db_pool_checkouts_total', 'counter', 'Connections checked out of the pool')
+        .add(stats['checkouts']),
+        Metric('bakery_db_pool_checkout_wait_seconds_total', 'counter', 'Time spent waiting for a pool connection')
+        .add(round(stats['wait_seconds'], 6)),
+        waits,
+        Metric('bakery_db_pool_timeouts_total', 'counter', 'Checkouts that gave up after pool_timeout')
+        .add(stats['timeouts']),
+    ]
+    if 'size' in stats:
+        # max_overflow -1 means unbounded, so there is no ceiling to be saturated against
+        capacity = stats['size'] + stats['max_overflow'] if stats['max_overflow'] >= 0 else None
+        metrics += [
+            Metric('bakery_db_pool_size', 'gauge', 'Configured pool size').add(stats['size']),
+            Metric('bakery_db_pool_max_overflow', 'gauge', 'Connections allowed beyond the pool size')
+            .add(stats['max_overflow']),
+            Metric('bakery_db_pool_checked_out', 'gauge', 'Connections currently in use').add(stats['checked_out']),
+            Metric('bakery_db_pool_idle', 'gauge', 'Connections idle in the pool').add(stats['idle']),
+            Metric('bakery_db_pool_saturation', 'gauge', 'Connections in use as a share of pool size plus overflow')
+            .add(round(stats['checked_out'] / capacity, 4) if capacity else None),
+        ]
+    return metrics
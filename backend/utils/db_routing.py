@@ -0,0 +1,114 @@
+"""
+Read-replica routing.
+
+With a ``replica`` entry in ``SQLALCHEMY_BINDS`` (``DATABASE_REPLICA_URL``),
+``db.session`` is a ``RoutingSession`` that sends reads to the replica when
+they are safe to serve slightly stale:
+
+- Reads during GET/HEAD requests go to the replica, so list, detail and
+  stats traffic, and the service read methods behind it, stay off the
+  primary.
+- Writes, and every read after the session has flushed anything (read after
+  write), go to the primary, as does everything during other requests and
+  outside requests.
+- A request can ask for the primary with the ``X-Read-Consistency: strong``
+  header, e.g. right after a client's own write; code can pin a bind with
+  ``read_from('primary')`` / ``read_from('replica')`` as a context manager
+  or decorator.
+- The in-process snapshots (category tree, suggest and facet indexes, zip
+  rollups, review vectors) are built from the primary: a rebuild is
+  triggered by a commit, and one read from a lagging replica would be kept
+  until the snapshot's max age runs out.
+
+Without a replica bind all of this is a no-op.
+"""
+from contextlib import ContextDecorator
+
+import sqlalchemy as sa
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA = 'replica'
+PRIMARY = 'primary'
+CONSISTENCY_HEADER = 'X-Read-Consistency'
+# Methods whose reads may be served by the replica
+READ_METHODS = frozenset(('GET', 'HEAD'))
+
+
+class RoutingSession(Session):
+    """Session that sends safe reads to the replica bind and everything else to the primary"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._reads_from_replica(clause):
+            return self._db.engines[REPLICA]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_replica(self, clause):
+        if REPLICA not in self._db.engines or self._flushing or self.info.get('wrote'):
+            return False
+        if isinstance(clause, sa.sql.dml.UpdateBase):  # INSERT/UPDATE/DELETE statements
+            return False
+        pinned = self.info.get('read_from')
+        if pinned:
+            return pinned[-1] == REPLICA
+        if not has_request_context():
+            return False
+        return request.method in READ_METHODS and not strong_consistency_requested()
+
+
+def strong_consistency_requested():
+    """True if the current request asked to read from the primary (``X-Read-Consistency: strong``)"""
+    return has_request_context() and request.headers.get(CONSISTENCY_HEADER, '').lower() == 'strong'
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_written(session, flush_context):
+    # From here on this session (i.e. this request) reads its own writes from the primary
+    session.info['wrote'] = True
+
+
+class read_from(ContextDecorator):
+    """Pin reads of ``db.session`` to 'primary' or 'replica' within a block or function"""
+
+    def __init__(self, bind):
+        if bind not in (PRIMARY, REPLICA):
+            raise ValueError(f"Expected '{PRIMARY}' or '{REPLICA}', got '{bind}'")
+        self.bind = bind
+
+    def _recreate_cm(self):
+        # A fresh instance per decorated call, as __enter__ keeps the session on it
+        return read_from(self.bind)
+
+    def __enter__(self):
+        from backend.extensions import db
+
+        self.session = db.session()
+        self.session.info.setdefault('read_from', []).append(self.bind)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.session.info['read_from'].pop()
+        return False
+
+
+def init_routing():
+    """Call after the database extension is initialised.
+
+    Flask-SQLAlchemy makes an empty MetaData for every bind key. The replica
+    has no models of its own (it mirrors the primary's tables), so drop it
+    again; otherwise create_all/drop_all and migrations would look for a
+    replica in every app, including those without one.
+    """
+    from backend.extensions import db
+
+    metadata = db.metadatas.get(REPLICA)
+    if metadata is not None and not metadata.tables:
+        del db.metadatas[REPLICA]
+
+
+def current_bind():
+    """'replica' or 'primary': where a plain read of ``db.session`` would go right now"""
+    from backend.extensions import db
+
+    return REPLICA if db.session()._reads_from_replica(None) else PRIMARY
@@ -0,0 +1,162 @@
+"""
+Edge (reverse proxy) caching: Cache-Control policies, surrogate keys, purging.
+
+Routes declare how long a shared cache may keep their responses with
+``cache_policy``. Every such response is tagged with a ``Surrogate-Key``
+header naming the rows it was built from (``bakery/5``, ``product/12``) plus
+the collections it lists (``bakery``). When a transaction commits, the keys
+it made stale are purged at the proxy, so the edge can hold responses for a
+long time without serving outdated data.
+
+Responses from routes without a policy are marked ``no-store``.
+"""
+import logging
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import wraps
+
+from flask import current_app, g, has_app_context, has_request_context, make_response
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from backend.extensions import db
+from backend.utils.change_tracking import on_commit
+
+logger = logging.getLogger(__name__)
+
+# Purge requests are sent off the request thread, one at a time
+_purge_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='edge-purge')
+_pending_purges = set()
+
+
+def entity_key(table, entity_id):
+    return f"{table}/{entity_id}"
+
+
+def cache_policy(max_age=0, s_maxage=300, stale_while_revalidate=None, collections=(), vary=('Origin',)):
+    """Declare the shared-cache policy of a GET route.
+
+    ``max_age`` applies to browsers, ``s_maxage`` to the proxy. ``collections``
+    names the tables whose row set the response lists; they become surrogate
+    keys next to the keys of the rows loaded while building the response.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response = make_response(view(*args, **kwargs))
+            if response.status_code not in (200, 304):
+                return response
+
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+            response.cache_control.s_maxage = s_maxage
+            if stale_while_revalidate:
+                response.cache_control['stale-while-revalidate'] = str(stale_while_revalidate)
+            for header in vary:
+                response.vary.add(header)
+            # A 304 tells the proxy to keep the tags of the response it already has
+            if response.status_code == 200:
+                response.headers['Surrogate-Key'] = ' '.join(surrogate_keys(collections))
+            return response
+        return wrapper
+    return decorator
+
+
+def _row(state):
+    identity = state.identity
+    return state.mapper.local_table.name, identity[0] if len(identity) == 1 else identity
+
+
+@event.listens_for(Session, 'loaded_as_persistent')
+def _remember_loaded_row(session, instance):
+    # The identity map only holds objects weakly: a row the view loaded and let
+    # go of may be gone by the time the keys are collected, so remember it here
+    if has_request_context():
+        g.setdefault('edge_cache_rows', set()).add(_row(inspect(instance)))
+
+
+def surrogate_keys(collections=()):
+    """Keys for the rows loaded while building this response, plus collection keys.
+
+    Past ``EDGE_SURROGATE_KEY_LIMIT`` row keys, rows are tagged by their table
+    instead, which purges more often but keeps the header bounded.
+    """
+    keys = set(collections)
+    rows = set(g.get('edge_cache_rows', ())) if has_request_context() else set()
+    for obj in list(db.session.identity_map.values()):
+        state = inspect(obj)
+        if state.identity is not None:
+            rows.add(_row(state))
+
+    if len(rows) > current_app.config.get('EDGE_SURROGATE_KEY_LIMIT', 256):
+        keys.update(table for table, _ in rows)
+    else:
+        keys.update(entity_key(table, entity_id) for table, entity_id in rows)
+    return sorted(keys)
+
+
+def _mark_uncacheable(response):
+    """Keep the proxy away from responses without a declared policy"""
+    if 'Cache-Control' not in response.headers:
+        response.cache_control.no_store = True
+    return response
+
+
+def init_edge_cache(app):
+    """Register the default no-store policy"""
+    app.after_request(_mark_uncacheable)
+
+
+# === Purging ===
+
+def _parent_keys(change):
+    """Keys of the rows a changed row points at (e.g. the bakery of a product)"""
+    table = db.metadata.tables.get(change.table)
+    if table is None:
+        return []
+    return [
+        entity_key(fk.column.table.name, change.values[fk.parent.name])
+        for fk in table.foreign_keys
+        if change.values.get(fk.parent.name) is not None
+    ]
+
+
+def keys_for_changes(changes):
+    """Surrogate keys made stale by a list of committed changes"""
+    keys = set()
+    for change in changes:
+        keys.add(change.table)
+        if change.id is not None:
+            keys.add(entity_key(change.table, change.id))
+        keys.update(_parent_keys(change))
+    return sorted(keys)
+
+
+def send_purge(url, keys, timeout):
+    """Ask the proxy to drop every response tagged with one of the keys"""
+    request = urllib.request.Request(url, method='PURGE', headers={'Surrogate-Key': ' '.join(keys)})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status
+    except Exception as e:
+        logger.warning(f"Edge purge of {len(keys)} keys failed: {e}")
+        return None
+
+
+def wait_for_purges(timeout=None):
+    """Block until the queued purge requests have been sent"""
+    wait(list(_pending_purges), timeout=timeout)
+
+
+@on_commit()
+def _purge_on_commit(changes):
+    if not has_app_context():
+        return
+    url = current_app.config.get('EDGE_PURGE_URL')
+    if not url:
+        return
+    keys = keys_for_changes(changes)
+    timeout = current_app.config.get('EDGE_PURGE_TIMEOUT', 2.0)
+    future = _purge_executor.submit(send_purge, url, keys, timeout)
+    _pending_purges.add(future)
+    future.add_done_callback(_pending_purges.discard)
@@ -0,0 +1,75 @@
+"""
+Request-scoped entity loading.
+
+Blueprints and services used to look the same row up independently: a
+``PATCH`` fetched the bakery in the blueprint, then again in the service,
+each time with its review stats. The ``EntityLoader`` kept in the session's
+``info`` (the session lives for one request) answers repeated lookups of an
+entity, misses included, and memoizes values derived from it, such as stats,
+so each is fetched or computed once per request and only when asked for.
+
+Anything flushed or rolled back may have changed what was loaded, so both
+empty the loader; the session's identity map still spares the queries for
+rows that haven't changed.
+"""
+from sqlalchemy import event
+
+from backend.extensions import db
+
+_NOT_LOADED = object()
+
+
+class EntityLoader:
+    """Entities by (model, id) and values derived from them, for one session"""
+
+    def __init__(self):
+        self._entities = {}
+        self._derived = {}
+
+    def get(self, model, entity_id):
+        """The entity with this primary key, or None; looked up once"""
+        key = (model, entity_id)
+        entity = self._entities.get(key, _NOT_LOADED)
+        if entity is _NOT_LOADED:
+            entity = self._entities[key] = db.session.get(model, entity_id)
+        return entity
+
+    def derived(self, name, entity_id, compute):
+        """``compute()`` for (name, id), computed once"""
+        key = (name, entity_id)
+        value = self._derived.get(key, _NOT_LOADED)
+        if value is _NOT_LOADED:
+            value = self._derived[key] = compute()
+        return value
+
+    def clear(self):
+        self._entities.clear()
+        self._derived.clear()
+
+
+def get_loader():
+    """The loader of the current session"""
+    session = db.session()
+    loader = session.info.get('entity_loader')
+    if loader is None:
+        loader = session.info['entity_loader'] = EntityLoader()
+    return loader
+
+
+def load_entity(model, entity_id):
+    """Shortcut for ``get_loader().get(model, entity_id)``"""
+    return get_loader().get(model, entity_id)
+
+
+def _clear_loader(session, *args):
+    loader = session.info.get('entity_loader')
+    if loader is not None:
+        loader.clear()
+
+
+def init_entity_loader():
+    """Attach the session listeners (safe to call more than once)"""
+    if event.contains(db.session, 'after_flush', _clear_loader):
+        return
+    event.listen(db.session, 'after_flush', _clear_loader)
+    event.listen(db.session, 'after_soft_rollback', _clear_loader)
@@ -0,0 +1,72 @@
+"""
+Offline geocoding of Danish zip codes and great-circle helpers.
+
+``backend/data/dk_zip_centroids.csv`` lists an approximate centroid for the
+postal codes bakeries are likely to use. A code that isn't listed takes the
+centroid of the closest listed code in the same hundred (1172 -> 1150): codes
+are handed out by area, so that is usually the same town or district.
+"""
+import csv
+import math
+import os
+from bisect import bisect_right
+from functools import lru_cache
+
+CENTROIDS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'dk_zip_centroids.csv')
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+@lru_cache(maxsize=1)
+def _rows():
+    with open(CENTROIDS_PATH, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+@lru_cache(maxsize=1)
+def _centroids():
+    """(sorted zip codes, {zip code: (latitude, longitude)})"""
+    table = {row['zip_code']: (float(row['latitude']), float(row['longitude'])) for row in _rows()}
+    return sorted(table), table
+
+
+def zip_city(zip_code):
+    """Town or district name of a listed zip code, or None"""
+    return _cities().get(zip_code)
+
+
+@lru_cache(maxsize=1)
+def _cities():
+    return {row['zip_code']: row['city'] for row in _rows()}
+
+
+def zip_centroid(zip_code):
+    """(latitude, longitude) for a Danish zip code, or None if it can't be placed"""
+    if not zip_code:
+        return None
+    codes, table = _centroids()
+    if zip_code in table:
+        return table[zip_code]
+    position = bisect_right(codes, zip_code)
+    if position and codes[position - 1][:2] == zip_code[:2]:
+        return table[codes[position - 1]]
+    if position < len(codes) and codes[position][:2] == zip_code[:2]:
+        return table[codes[position]]
+    return None
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def bounding_box(lat, lng, radius_km):
+    """(min_lat, max_lat, min_lng, max_lng) enclosing the circle around a point"""
+    d_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    # Longitude degrees shrink towards the poles; Denmark is nowhere near them
+    d_lng = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(lat))))
+    return lat - d_lat, lat + d_lat, lng - d_lng, lng + d_lng
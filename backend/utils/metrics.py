@@ -0,0 +1,54 @@
+"""
+Minimal metrics exporter.
+
+Components register collector functions that return their current metrics;
+``render_metrics`` turns them into the Prometheus text exposition format.
+Collectors run inside the app context of the scrape request.
+"""
+
+# Registered collector callables
+_collectors = []
+
+
+class Metric:
+    """A metric family with its samples"""
+
+    def __init__(self, name, kind, help_text):
+        self.name = name
+        self.kind = kind  # 'counter' or 'gauge'
+        self.help_text = help_text
+        self.samples = []  # (labels dict, value)
+
+    def add(self, value, **labels):
+        self.samples.append((labels, value))
+        return self
+
+
+def register_collector(fn):
+    """Register a callable returning an iterable of Metric objects"""
+    _collectors.append(fn)
+    return fn
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+        for key, value in sorted(labels.items())
+    )
+    return '{' + pairs + '}'
+
+
+def render_metrics():
+    """Render all registered metrics in Prometheus text format"""
+    lines = []
+    for collector in _collectors:
+        for metric in collector():
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for labels, value in metric.samples:
+                if value is None:
+                    continue
+                lines.append(f"{metric.name}{_format_labels(labels)} {value}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,213 @@
+"""
+Per-request SQL statistics and N+1 detection.
+
+Cursor execution events on every engine of the app count and time the
+statements each request runs. After the request:
+
+- statements that ran at least ``N_PLUS_ONE_THRESHOLD`` times with the same
+  shape (the SQL with ``IN`` lists collapsed, so only the parameters differ)
+  are logged as N+1 suspects together with the endpoint;
+- with ``QUERY_COUNT_HEADER`` on, the response carries ``X-Query-Count`` and
+  ``X-Query-Time`` (ms).
+
+``query_budget`` is the test-side counterpart: a context manager that fails
+when the code inside runs more statements than allowed, listing them.
+
+The same listeners count how each statement fared in SQLAlchemy's compiled
+statement cache (``compile_cache_stats``): a miss means the statement was
+compiled again, which statements built per call with literal values, or a
+cache that is too small (``DB_STATEMENT_CACHE_SIZE``), cause.
+"""
+import re
+import threading
+import time
+from collections import Counter
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from backend.utils.async_db import instrumented_engines
+from backend.utils.metrics import Metric, register_collector
+
+_WHITESPACE = re.compile(r'\s+')
+# "IN (?, ?, ?)" / "VALUES (?, ?), (?, ?)" -> one placeholder group
+_PLACEHOLDER_LIST = re.compile(r'\(\s*(?:\?|%s|:\w+)(?:\s*,\s*(?:\?|%s|:\w+))*\s*\)')
+_REPEATED_GROUPS = re.compile(r'(\(\?\.\.\.\))(?:\s*,\s*\(\?\.\.\.\))+')
+_SELECT_LIST = re.compile(r'SELECT (?:(?!SELECT |FROM ).)+ FROM ')
+
+_budgets = threading.local()
+_totals = {'statements': 0, 'seconds': 0.0}
+# Compiled cache outcome (context.cache_hit) -> label
+_CACHE_RESULTS = {
+    'CACHE_HIT': 'hit',
+    'CACHE_MISS': 'miss',
+    'CACHING_DISABLED': 'disabled',
+    'NO_CACHE_KEY': 'no_key',
+    'NO_DIALECT_SUPPORT': 'unsupported',
+}
+_compile_cache = Counter()
+_suspects = Counter()  # endpoint -> requests logged as N+1 suspects
+_totals_lock = threading.Lock()
+
+
+def normalize_sql(statement):
+    """Statement shape: whitespace collapsed and placeholder lists folded"""
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _PLACEHOLDER_LIST.sub('(?...)', shape)
+    return _REPEATED_GROUPS.sub(r'\1', shape)
+
+
+def abbreviate_sql(shape, limit=300):
+    """Shape for a log line: column lists elided, cut at ``limit`` characters"""
+    shape = _SELECT_LIST.sub('SELECT ... FROM ', shape)
+    return shape if len(shape) <= limit else shape[:limit] + '...'
+
+
+class RequestQueries:
+    """Statements of one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+
+    def add(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[normalize_sql(statement)] += 1
+
+    def repeated(self, threshold):
+        """[(shape, times)] run at least ``threshold`` times, most frequent first"""
+        return [(shape, times) for shape, times in self.shapes.most_common() if times >= threshold]
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info['query_started'].pop()
+    outcome = getattr(context, 'cache_hit', None)
+    with _totals_lock:
+        _totals['statements'] += 1
+        _totals['seconds'] += seconds
+        if outcome is not None:
+            _compile_cache[_CACHE_RESULTS.get(outcome.name, outcome.name.lower())] += 1
+    for budget in getattr(_budgets, 'active', ()):
+        budget.statements.append(statement)
+    if has_request_context():
+        if 'query_stats' not in g:
+            g.query_stats = RequestQueries()
+        g.query_stats.add(statement, seconds)
+
+
+def _execute_failed(context):
+    # after_cursor_execute doesn't run for a failed statement; drop its start time
+    if context.cursor is not None and context.connection is not None:
+        started = context.connection.info.get('query_started')
+        if started:
+            started.pop()
+
+
+def _report(response):
+    stats = g.pop('query_stats', None)
+    if stats is None:
+        return response
+    config = current_app.config
+    if config.get('QUERY_COUNT_HEADER'):
+        response.headers['X-Query-Count'] = str(stats.count)
+        response.headers['X-Query-Time'] = f'{stats.seconds * 1000:.1f}'
+
+    endpoint = request.endpoint or request.path
+    repeated = stats.repeated(config.get('N_PLUS_ONE_THRESHOLD', 10))
+    if repeated:
+        with _totals_lock:
+            _suspects[endpoint] += 1
+    for shape, times in repeated:
+        current_app.logger.warning(
+            f"Possible N+1 in {endpoint} ({request.method} {request.path}): "
+            f"{times} of {stats.count} statements were {abbreviate_sql(shape)}"
+        )
+    return response
+
+
+def init_query_stats(app):
+    """Instrument the app's engines and report after each request"""
+    for engine in instrumented_engines(app):
+        if not event.contains(engine, 'before_cursor_execute', _before_execute):
+            event.listen(engine, 'before_cursor_execute', _before_execute)
+            event.listen(engine, 'after_cursor_execute', _after_execute)
+            event.listen(engine, 'handle_error', _execute_failed)
+    app.after_request(_report)
+
+
+def compile_cache_stats(engines=None):
+    """Compiled statement cache outcomes since startup, with the hit ratio and, given engines, their fill"""
+    with _totals_lock:
+        stats = dict.fromkeys(_CACHE_RESULTS.values(), 0)
+        stats.update(_compile_cache)
+    cached = stats['hit'] + stats['miss']
+    stats['hit_ratio'] = round(stats['hit'] / cached, 4) if cached else None
+    if engines is not None:
+        caches = [engine._compiled_cache for engine in engines if engine._compiled_cache is not None]
+        stats['entries'] = sum(len(cache) for cache in caches)
+        stats['capacity'] = sum(cache.capacity for cache in caches)
+    return stats
+
+
+class query_budget:
+    """Fail if the block runs more than ``max_queries`` statements.
+
+        with query_budget(4):
+            client.get('/bakeries/')
+    """
+
+    def __init__(self, max_queries):
+        self.max_queries = max_queries
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __enter__(self):
+        if not hasattr(_budgets, 'active'):
+            _budgets.active = []
+        _budgets.active.append(self)
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        _budgets.active.remove(self)
+        if exc_type is None and self.count > self.max_queries:
+            shapes = Counter(normalize_sql(statement) for statement in self.statements)
+            listing = '\n'.join(f'  {times}x {abbreviate_sql(shape)}' for shape, times in shapes.most_common())
+            raise AssertionError(f"{self.count} queries, budget {self.max_queries}:\n{listing}")
+        return False
+
+
+@register_collector
+def _query_metrics():
+    """Export statement counts, N+1 suspects and compiled cache outcomes"""
+    with _totals_lock:
+        totals = dict(_totals)
+        suspects = dict(_suspects)
+    n_plus_one = Metric('bakery_sql_n_plus_one_total', 'counter', 'Requests logged as N+1 suspects, per endpoint')
+    for endpoint, count in sorted(suspects.items()):
+        n_plus_one.add(count, endpoint=endpoint)
+    cache = compile_cache_stats(instrumented_engines(current_app))
+    lookups = Metric('bakery_sql_compile_cache_total', 'counter', 'Statement executions by compiled cache outcome')
+    for result in _CACHE_RESULTS.values():
+        lookups.add(cache[result], result=result)
+    return [
+        Metric('bakery_sql_statements_total', 'counter', 'SQL statements executed').add(totals['statements']),
+        Metric('bakery_sql_seconds_total', 'counter', 'Time spent executing SQL statements')
+        .add(round(totals['seconds'], 6)),
+        n_plus_one,
+        lookups,
+        Metric('bakery_sql_compile_cache_hit_ratio', 'gauge', 'Compiled cache hits among cacheable statement executions')
+        .add(cache['hit_ratio']),
+        Metric('bakery_sql_compile_cache_entries', 'gauge', 'Compiled statements held in the engine caches')
+        .add(cache['entries']),
+        Metric('bakery_sql_compile_cache_capacity', 'gauge', 'Size of the engine compiled statement caches')
+        .add(cache['capacity']),
+    ]
@@ -0,0 +1,196 @@
+"""
+SQLite FTS5 full-text indexes.
+
+Each index is a standalone FTS5 table whose rowid is the id of the source
+row. Text is folded before it is stored and before it is queried, so
+matching ignores case and accents and treats the Danish letters the way
+people type them: "Smørrebrød" is found by "smørrebrød", "smoerrebroed" and
+"smorrebrod". The tables are created with the schema and kept in sync by
+mapper events inside the flushing transaction.
+
+``search`` returns ids ranked by BM25, or None when the index can't be used
+(another database, or an un-migrated one), so callers can fall back to LIKE.
+"""
+import logging
+import re
+import unicodedata
+
+from sqlalchemy import DDL, column, event, inspect, select, table, text
+from sqlalchemy.exc import OperationalError
+
+from backend.extensions import db
+
+logger = logging.getLogger(__name__)
+
+# Primary spelling of the Danish letters, and the plain-ASCII one people also type
+_DANISH_PRIMARY = str.maketrans({'æ': 'ae', 'ø': 'oe', 'å': 'aa'})
+_DANISH_PLAIN = str.maketrans({'æ': 'ae', 'ø': 'o', 'å': 'a'})
+
+_TOKEN = re.compile(r'\w+')
+
+# Registered indexes by name
+_indexes = {}
+
+
+def _strip_accents(value):
+    if value.isascii():
+        return value
+    decomposed = unicodedata.normalize('NFKD', value)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def fold(value):
+    """Fold text for matching: lowercase, Danish letters spelled out, accents removed"""
+    if not value:
+        return ''
+    return _strip_accents(value.lower().translate(_DANISH_PRIMARY))
+
+
+def fold_for_index(value):
+    """Folded text plus the plain-ASCII spelling of any word with æ, ø or å"""
+    if not value:
+        return ''
+    lowered = value.lower()
+    primary = fold(lowered)
+    plain = _strip_accents(lowered.translate(_DANISH_PLAIN))
+    if plain == primary:
+        return primary
+    extra = [word for word in _TOKEN.findall(plain) if word not in primary.split()]
+    return ' '.join([primary] + extra)
+
+
+def match_query(term):
+    """Build an FTS5 MATCH expression: every word must match as a prefix"""
+    words = _TOKEN.findall(fold(term))
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+class FullTextIndex:
+    """An FTS5 table mirroring some text columns of a model"""
+
+    def __init__(self, name, model, columns, watched, tokenize=None, normalize=fold_for_index):
+        self.name = name
+        self.model = model
+        self.columns = columns  # {fts column: (bm25 weight, callable(instance) -> text)}
+        self.watched = watched  # model attributes that feed the index
+        self.tokenize = tokenize    # FTS5 tokenizer, e.g. 'trigram' for substring matching
+        self.normalize = normalize  # applied to the text before it is stored
+
+    # === Schema ===
+
+    def create_sql(self):
+        arguments = list(self.columns)
+        if self.tokenize:
+            arguments.append(f"tokenize='{self.tokenize}'")
+        return f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.name} USING fts5({', '.join(arguments)})"
+
+    def drop_sql(self):
+        return f"DROP TABLE IF EXISTS {self.name}"
+
+    # === Maintenance ===
+
+    def _values(self, obj):
+        return {column: self.normalize(extract(obj) or '') for column, (_, extract) in self.columns.items()}
+
+    def upsert(self, connection, obj):
+        self.delete(connection, obj)
+        values = self._values(obj)
+        connection.execute(
+            text(f"INSERT INTO {self.name} (rowid, {', '.join(values)}) "
+                 f"VALUES (:rowid, {', '.join(':' + c for c in values)})"),
+            {'rowid': obj.id, **values},
+        )
+
+    def delete(self, connection, obj):
+        connection.execute(text(f"DELETE FROM {self.name} WHERE rowid = :rowid"), {'rowid': obj.id})
+
+    def rebuild(self, session):
+        """Re-index every row (after bulk loads that bypassed the ORM)"""
+        connection = session.connection()
+        connection.execute(text(f"DELETE FROM {self.name}"))
+        for obj in session.query(self.model).yield_per(500):
+            self.upsert(connection, obj)
+
+    # === Queries ===
+
+    def search(self, term, limit=None):
+        """Ids of matching rows, best match first; None if the index is unusable"""
+        query = match_query(term)
+        if query is None:
+            return []
+        if db.engine.dialect.name != 'sqlite':
+            return None
+
+        weights = ', '.join(str(weight) for weight, _ in self.columns.values())
+        sql = f"SELECT rowid FROM {self.name} WHERE {self.name} MATCH :query ORDER BY bm25({self.name}, {weights})"
+        params = {'query': query}
+        if limit:
+            sql += " LIMIT :limit"
+            params['limit'] = limit
+        try:
+            return [row[0] for row in db.session.execute(text(sql), params)]
+        except OperationalError as e:
+            logger.warning(f"Full-text index {self.name} unavailable, falling back to LIKE: {e}")
+            return None
+
+    def containing(self, term):
+        """Subquery of the rowids whose text contains ``term`` (trigram indexes, 3+ characters)"""
+        phrase = '"' + self.normalize(term).replace('"', '""') + '"'
+        return select(column('rowid')).select_from(table(self.name)) \
+            .where(text(f"{self.name} MATCH :phrase").bindparams(phrase=phrase))
+
+    def results(self, term, limit=None):
+        """Matching model instances in rank order; None if the index is unusable"""
+        ids = self.search(term, limit)
+        if not ids:
+            return ids
+        # Rows removed by ON DELETE CASCADE never reach the mapper events, so skip stale ids
+        by_id = {obj.id: obj for obj in self.model.query.filter(self.model.id.in_(ids))}
+        return [by_id[i] for i in ids if i in by_id]
+
+
+def register_index(index):
+    """Create the table with the schema and keep it in sync with the model"""
+    _indexes[index.name] = index
+
+    event.listen(db.metadata, 'after_create', DDL(index.create_sql()).execute_if(dialect='sqlite'))
+    event.listen(db.metadata, 'before_drop', DDL(index.drop_sql()).execute_if(dialect='sqlite'))
+
+    def _sync(connection, action, target):
+        if connection.dialect.name != 'sqlite':
+            return
+        try:
+            action(connection, target)
+        except OperationalError as e:
+            # A missing index must not block writes; searches fall back to LIKE
+            logger.warning(f"Could not update full-text index {index.name}: {e}")
+
+    @event.listens_for(index.model, 'after_insert')
+    def _after_insert(mapper, connection, target):
+        _sync(connection, index.upsert, target)
+
+    @event.listens_for(index.model, 'after_update')
+    def _after_update(mapper, connection, target):
+        state = inspect(target)
+        if any(state.attrs[attr].history.has_changes() for attr in index.watched):
+            _sync(connection, index.upsert, target)
+
+    @event.listens_for(index.model, 'after_delete')
+    def _after_delete(mapper, connection, target):
+        _sync(connection, index.delete, target)
+
+    return index
+
+
+def get_index(name):
+    return _indexes[name]
+
+
+def rebuild_indexes():
+    """Rebuild every registered index and commit"""
+    for index in _indexes.values():
+        index.rebuild(db.session)
+    db.session.commit()
+    return list(_indexes)
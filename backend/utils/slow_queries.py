@@ -0,0 +1,196 @@
+"""
+Slow query log.
+
+Every statement that takes ``SLOW_QUERY_THRESHOLD_MS`` or longer is written
+as one JSON line to ``SLOW_QUERY_LOG`` (rotated at
+``SLOW_QUERY_LOG_MAX_BYTES``, keeping ``SLOW_QUERY_LOG_BACKUPS`` old files):
+
+    {"time": "...", "duration_ms": 312.4, "sql": "SELECT ... WHERE id IN (?...)",
+     "params": ["int", "str"], "route": {"endpoint": "bakery.get_bakeries", ...},
+     "plan": ["SCAN bakery", "USE TEMP B-TREE FOR ORDER BY"]}
+
+``sql`` is the statement shape from ``normalize_sql`` and ``params`` only the
+types of the parameters, so the log groups well and holds no user data. On
+SQLite the entry carries the statement's ``EXPLAIN QUERY PLAN``, taken on the
+same connection right after the statement ran. ``/admin/slow-queries`` reads
+the entries back, newest first.
+
+The settings are read per statement, so they can be changed at runtime; an
+empty ``SLOW_QUERY_LOG`` turns the log off.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+from flask import current_app, has_request_context, request
+from sqlalchemy import event
+
+from backend.utils.async_db import instrumented_engines
+from backend.utils.metrics import Metric, register_collector
+from backend.utils.query_stats import normalize_sql
+
+# Statements EXPLAIN QUERY PLAN is run for
+_EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+_totals = {'logged': 0}
+_totals_lock = threading.Lock()
+
+
+def _type_shape(value):
+    return 'null' if value is None else type(value).__name__
+
+
+def parameter_shape(parameters, executemany=False):
+    """Types of the statement parameters, without their values"""
+    if executemany:
+        rows = list(parameters or ())
+        return {'rows': len(rows), 'row': parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: _type_shape(value) for key, value in parameters.items()}
+    return [_type_shape(value) for value in parameters or ()]
+
+
+def _route():
+    if not has_request_context():
+        return None
+    return {'endpoint': request.endpoint, 'method': request.method, 'path': request.path}
+
+
+def _explain(cursor, statement, parameters):
+    """EXPLAIN QUERY PLAN lines, indented by depth, or None if it can't be explained"""
+    if not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    try:
+        # A cursor of its own on the DBAPI connection, so no engine events fire
+        rows = cursor.connection.execute(f'EXPLAIN QUERY PLAN {statement}', parameters or ()).fetchall()
+    except Exception:
+        return None
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node_id] + detail)
+    return lines
+
+
+class SlowQueryLog:
+    """Times statements on the app's engines and writes the slow ones to a JSONL file"""
+
+    def __init__(self, config):
+        self.config = config
+        self._handler = None
+        self._handler_path = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return self.config.get('SLOW_QUERY_LOG') or None
+
+    @property
+    def threshold(self):
+        """Threshold in seconds"""
+        return float(self.config.get('SLOW_QUERY_THRESHOLD_MS', 250)) / 1000
+
+    def before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('slow_query_started', []).append(time.perf_counter())
+
+    def after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info['slow_query_started'].pop()
+        if seconds < self.threshold or not self.path:
+            return
+        entry = {
+            'time': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'duration_ms': round(seconds * 1000, 3),
+            'sql': normalize_sql(statement),
+            'params': parameter_shape(parameters, executemany),
+            'route': _route(),
+        }
+        if conn.dialect.name == 'sqlite' and not executemany:
+            entry['plan'] = _explain(cursor, statement, parameters)
+        self.write(entry)
+
+    def execute_failed(self, context):
+        # after_cursor_execute doesn't run for a failed statement; drop its start time
+        if context.cursor is not None and context.connection is not None:
+            started = context.connection.info.get('slow_query_started')
+            if started:
+                started.pop()
+
+    def write(self, entry):
+        path = self.path
+        with self._lock:
+            if path != self._handler_path:
+                if self._handler is not None:
+                    self._handler.close()
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._handler = RotatingFileHandler(
+                    path,
+                    maxBytes=int(self.config.get('SLOW_QUERY_LOG_MAX_BYTES', 1_048_576)),
+                    backupCount=int(self.config.get('SLOW_QUERY_LOG_BACKUPS', 5)),
+                    encoding='utf-8',
+                )
+                self._handler_path = path
+            self._handler.handle(logging.makeLogRecord({'msg': json.dumps(entry), 'levelno': logging.WARNING}))
+        with _totals_lock:
+            _totals['logged'] += 1
+
+    def read(self, limit=50, endpoint=None, min_ms=None):
+        """Logged entries, newest first, across the rotated files"""
+        path = self.path
+        if not path:
+            return []
+        files = [path] + [f'{path}.{n}' for n in range(1, int(self.config.get('SLOW_QUERY_LOG_BACKUPS', 5)) + 1)]
+        entries = []
+        with self._lock:
+            for name in files:
+                try:
+                    with open(name, encoding='utf-8') as f:
+                        lines = f.readlines()
+                except FileNotFoundError:
+                    continue
+                for line in reversed(lines):
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # line cut short by a crash
+                    if endpoint and (entry.get('route') or {}).get('endpoint') != endpoint:
+                        continue
+                    if min_ms is not None and entry.get('duration_ms', 0) < min_ms:
+                        continue
+                    entries.append(entry)
+                    if len(entries) >= limit:
+                        return entries
+        return entries
+
+
+def init_slow_query_log(app):
+    """Time the statements of the app's engines"""
+    log = app.extensions.get('slow_query_log')
+    if log is None:
+        log = app.extensions['slow_query_log'] = SlowQueryLog(app.config)
+    for engine in instrumented_engines(app):
+        if not event.contains(engine, 'before_cursor_execute', log.before_execute):
+            event.listen(engine, 'before_cursor_execute', log.before_execute)
+            event.listen(engine, 'after_cursor_execute', log.after_execute)
+            event.listen(engine, 'handle_error', log.execute_failed)
+    return log
+
+
+def get_slow_queries(limit=50, endpoint=None, min_ms=None):
+    """Entries of the current app's slow query log, newest first"""
+    log = current_app.extensions.get('slow_query_log')
+    return log.read(limit, endpoint, min_ms) if log else []
+
+
+@register_collector
+def _slow_query_metrics():
+    """Export the number of statements written to the slow query log"""
+    with _totals_lock:
+        logged = _totals['logged']
+    return [Metric('bakery_sql_slow_queries_total', 'counter', 'Statements written to the slow query log').add(logged)]
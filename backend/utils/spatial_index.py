@@ -0,0 +1,133 @@
+"""
+SQLite R*Tree indexes over model coordinates.
+
+Each index is an ``rtree`` virtual table holding one degenerate box (a point)
+per row, keyed by the source row's id. Like the full-text indexes, it is
+created with the schema and kept in sync by mapper events inside the
+flushing transaction. Rows without coordinates are left out.
+
+R*Tree stores 32-bit floats, rounded outwards, so coordinates read back from
+the index are accurate to about a metre.
+"""
+import logging
+
+from sqlalchemy import DDL, event, inspect, text
+from sqlalchemy.exc import OperationalError
+
+from backend.extensions import db
+from backend.utils.geo import bounding_box, haversine_km
+
+logger = logging.getLogger(__name__)
+
+# Registered indexes by name
+_indexes = {}
+
+
+class SpatialIndex:
+    """An R*Tree of (latitude, longitude) points mirroring a model"""
+
+    def __init__(self, name, model, point, watched):
+        self.name = name
+        self.model = model
+        self.point = point      # callable(instance) -> (latitude, longitude) or None
+        self.watched = watched  # model attributes that feed the point
+
+    # === Schema ===
+
+    def create_sql(self):
+        return f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.name} USING rtree(id, min_lat, max_lat, min_lng, max_lng)"
+
+    def drop_sql(self):
+        return f"DROP TABLE IF EXISTS {self.name}"
+
+    # === Maintenance ===
+
+    def upsert(self, connection, obj):
+        self.delete(connection, obj)
+        point = self.point(obj)
+        if point is None or None in point:
+            return
+        lat, lng = point
+        connection.execute(
+            text(f"INSERT INTO {self.name} (id, min_lat, max_lat, min_lng, max_lng) "
+                 f"VALUES (:id, :lat, :lat, :lng, :lng)"),
+            {'id': obj.id, 'lat': lat, 'lng': lng},
+        )
+
+    def delete(self, connection, obj):
+        connection.execute(text(f"DELETE FROM {self.name} WHERE id = :id"), {'id': obj.id})
+
+    def rebuild(self, session):
+        """Re-index every row (after bulk loads that bypassed the ORM)"""
+        connection = session.connection()
+        connection.execute(text(f"DELETE FROM {self.name}"))
+        for obj in session.query(self.model).yield_per(500):
+            self.upsert(connection, obj)
+
+    # === Queries ===
+
+    def within_box(self, min_lat, max_lat, min_lng, max_lng):
+        """[(id, latitude, longitude)] of the points inside a box; None if the index is unusable"""
+        if db.engine.dialect.name != 'sqlite':
+            return None
+        sql = (f"SELECT id, min_lat, min_lng FROM {self.name} "
+               f"WHERE max_lat >= :min_lat AND min_lat <= :max_lat AND max_lng >= :min_lng AND min_lng <= :max_lng")
+        params = {'min_lat': min_lat, 'max_lat': max_lat, 'min_lng': min_lng, 'max_lng': max_lng}
+        try:
+            return db.session.execute(text(sql), params).all()
+        except OperationalError as e:
+            logger.warning(f"Spatial index {self.name} unavailable, falling back to a table scan: {e}")
+            return None
+
+    def within_radius(self, lat, lng, radius_km):
+        """[(distance km, id)] of the points within a radius, nearest first; None if the index is unusable"""
+        points = self.within_box(*bounding_box(lat, lng, radius_km))
+        if points is None:
+            return None
+        hits = ((haversine_km(lat, lng, point_lat, point_lng), point_id) for point_id, point_lat, point_lng in points)
+        return sorted(hit for hit in hits if hit[0] <= radius_km)
+
+
+def register_spatial_index(index):
+    """Create the table with the schema and keep it in sync with the model"""
+    _indexes[index.name] = index
+
+    event.listen(db.metadata, 'after_create', DDL(index.create_sql()).execute_if(dialect='sqlite'))
+    event.listen(db.metadata, 'before_drop', DDL(index.drop_sql()).execute_if(dialect='sqlite'))
+
+    def _sync(connection, action, target):
+        if connection.dialect.name != 'sqlite':
+            return
+        try:
+            action(connection, target)
+        except OperationalError as e:
+            # A missing index must not block writes; queries fall back to a scan
+            logger.warning(f"Could not update spatial index {index.name}: {e}")
+
+    @event.listens_for(index.model, 'after_insert')
+    def _after_insert(mapper, connection, target):
+        _sync(connection, index.upsert, target)
+
+    @event.listens_for(index.model, 'after_update')
+    def _after_update(mapper, connection, target):
+        state = inspect(target)
+        if any(state.attrs[attr].history.has_changes() for attr in index.watched):
+            _sync(connection, index.upsert, target)
+
+    @event.listens_for(index.model, 'after_delete')
+    def _after_delete(mapper, connection, target):
+        _sync(connection, index.delete, target)
+
+    return index
+
+
+def get_spatial_index(name):
+    return _indexes[name]
+
+
+def rebuild_spatial_indexes():
+    """Rebuild every registered spatial index and commit"""
+    for index in _indexes.values():
+        index.rebuild(db.session)
+    db.session.commit()
+    return list(_indexes)
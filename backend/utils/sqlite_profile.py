@@ -0,0 +1,72 @@
+"""
+SQLite connection profiles.
+
+Every new SQLite connection runs ``PRAGMA foreign_keys=ON`` plus the pragmas
+of the configured profile (``SQLITE_PROFILE``):
+
+- ``default`` keeps SQLite's own settings: a rollback journal, where a
+  writer locks out readers while it commits, and ``synchronous=FULL``.
+- ``performance`` switches to write-ahead logging, so readers keep reading
+  the last committed state while a write is in progress. With WAL,
+  ``synchronous=NORMAL`` is still corruption-safe; only the last commits
+  before a power loss can be rolled back. It also memory-maps the file,
+  enlarges the page cache, keeps temporary tables in memory and waits for
+  locks instead of failing right away.
+
+``SQLITE_PRAGMAS`` overrides single pragmas on top of the profile, as a dict
+or as ``"cache_size=-16000,mmap_size=0"``.
+"""
+import re
+
+_NAME = re.compile(r'^[a-z_]+$')
+
+PROFILES = {
+    'default': {},
+    'performance': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,  # bytes
+        'cache_size': -64 * 1024,        # negative: KiB, so 64 MiB per connection
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,            # ms
+    },
+}
+
+
+def parse_pragmas(value):
+    """Parse 'name=value,name=value' (from the environment) into a dict"""
+    pragmas = {}
+    for item in (value or '').split(','):
+        name, _, setting = item.partition('=')
+        if name.strip() and setting.strip():
+            pragmas[name.strip()] = setting.strip()
+    return pragmas
+
+
+def profile_pragmas(profile, overrides=None):
+    """{pragma: value} of a profile with overrides applied"""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown SQLite profile '{profile}', expected one of: {', '.join(PROFILES)}")
+    if isinstance(overrides, str):
+        overrides = parse_pragmas(overrides)
+    pragmas = {**PROFILES[profile], **(overrides or {})}
+    for name in pragmas:
+        if not _NAME.match(name):
+            raise ValueError(f"Invalid SQLite pragma name '{name}'")
+    return pragmas
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    """Run ``PRAGMA name=value`` for each entry on a raw connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA foreign_keys=ON;")
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value};")
+    finally:
+        cursor.close()
+
+
+def current_pragmas(connection, names):
+    """{pragma: value} as reported by a connection"""
+    return {name: connection.exec_driver_sql(f"PRAGMA {name}").scalar() for name in names}
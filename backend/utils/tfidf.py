@@ -0,0 +1,293 @@
+"""
+TF-IDF vectors over short texts in SciPy sparse matrices.
+
+Every document is a row. Its terms are the folded words (see
+``backend.utils.search_index``) plus each pair of adjacent words, so a query
+for "flaky croissant" ranks the phrase above texts that only mention both
+words. Term weights are ``(1 + log tf) * idf`` and rows are L2-normalized,
+so a cosine similarity is a dot product. The normalized rows are kept
+column-major (CSC): scoring a query only reads the columns of its terms,
+like the postings lists of an inverted index.
+
+The index is updated incrementally. New rows are weighted with the current
+idf and collected in a small matrix next to the main one, which is merged in
+once it grows past ``MERGE_ROWS`` or a share of the index; removed rows are
+masked out. Once the rows changed since the last fit pass ``REFIT_RATIO`` of
+the index, the idf is recomputed and removed rows are dropped.
+
+The raw term counts are kept as CSR blocks. ``save`` writes them with
+``scipy.sparse.save_npz`` and ``TfidfIndex.load`` reads them back, so a large
+index can be built offline. Row keys are ``(kind, id)`` pairs, e.g.
+``('bakery', 12)``.
+"""
+import math
+import os
+import re
+import threading
+from bisect import bisect_right
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+
+from backend.utils.search_index import fold
+
+_TOKEN = re.compile(r'\w\w+')
+
+# Refit once this share of the rows was added or removed since the last fit
+REFIT_RATIO = 0.2
+
+# Merge recent rows into the main matrix past this many (or a tenth of the index)
+MERGE_ROWS = 1000
+
+
+def terms(text):
+    """Words of two or more characters plus adjacent word pairs"""
+    words = _TOKEN.findall(fold(text))
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def _empty(width=0, format='csc'):
+    return sparse.csc_matrix((0, width), dtype=np.float32) if format == 'csc' \
+        else sparse.csr_matrix((0, width), dtype=np.float32)
+
+
+def _normalized(weighted):
+    """The rows of a CSR matrix scaled to unit length"""
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags((1.0 / norms).astype(np.float32)) @ weighted)
+
+
+class TfidfIndex:
+    """Sparse TF-IDF document vectors with top-K cosine queries"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.vocabulary = {}             # term -> column
+        self.document_frequency = []     # column -> number of live rows containing the term
+        self.idf = []                    # column -> idf, frozen between fits
+        self.keys = []                   # row -> key
+        self.rows = {}                   # key -> row, live rows only
+        self.alive = np.zeros(0, dtype=bool)
+        self.vectors = _empty()          # normalized tf-idf rows, column-major
+        self.recent = _empty()           # rows added after the main matrix, column-major
+        self._count_blocks = []          # sublinear term frequencies, CSR blocks in row order
+        self._block_starts = []          # first row of each count block
+        self._pending = {}               # key -> {column: sublinear tf}, not yet in the matrices
+        self._changed = 0                # rows added or removed since the last fit
+        self._fitted = 0                 # live rows at the last fit
+
+    def __len__(self):
+        return len(self.rows) + len(self._pending)
+
+    # === Maintenance ===
+
+    def _columns(self, text, grow):
+        frequencies = {}
+        for term, count in Counter(terms(text)).items():
+            column = self.vocabulary.get(term)
+            if column is None:
+                if not grow:
+                    continue
+                column = self.vocabulary[term] = len(self.document_frequency)
+                self.document_frequency.append(0)
+                self.idf.append(0.0)
+            frequencies[column] = 1.0 + math.log(count)
+        return frequencies
+
+    def add(self, key, text):
+        """Insert or replace the document of a key; empty texts are removed"""
+        with self.lock:
+            self._remove(key)
+            frequencies = self._columns(text or '', grow=True)
+            if not frequencies:
+                return
+            for column in frequencies:
+                self.document_frequency[column] += 1
+                if not self.idf[column]:
+                    # Terms first seen after the last fit are weighted as they are now
+                    self.idf[column] = math.log((1.0 + len(self)) / (1.0 + self.document_frequency[column])) + 1.0
+            self._pending[key] = frequencies
+            self._changed += 1
+
+    def remove(self, key):
+        with self.lock:
+            self._remove(key)
+
+    def _row_counts(self, row):
+        """(columns, sublinear tfs) of a row in the matrices"""
+        block = bisect_right(self._block_starts, row) - 1
+        counts = self._count_blocks[block]
+        offset = row - self._block_starts[block]
+        start, end = counts.indptr[offset], counts.indptr[offset + 1]
+        return counts.indices[start:end], counts.data[start:end]
+
+    def _remove(self, key):
+        frequencies = self._pending.pop(key, None)
+        if frequencies is not None:
+            columns = list(frequencies)
+        else:
+            row = self.rows.pop(key, None)
+            if row is None:
+                return
+            self.alive[row] = False
+            columns, _ = self._row_counts(row)
+        for column in columns:
+            self.document_frequency[column] -= 1
+        self._changed += 1
+
+    def _append_pending(self):
+        """Add pending rows to the recent matrix, weighted with the current idf"""
+        if not self._pending:
+            return
+        width = len(self.vocabulary)
+        keys = list(self._pending)
+        indptr, indices, data = [0], [], []
+        for key in keys:
+            frequencies = self._pending[key]
+            indices.extend(frequencies)
+            data.extend(frequencies.values())
+            indptr.append(len(indices))
+        data = np.asarray(data, dtype=np.float32)
+        idf = np.fromiter((self.idf[column] for column in indices), dtype=np.float32, count=len(indices))
+        counts = sparse.csr_matrix((data, indices, indptr), shape=(len(keys), width))
+        vectors = _normalized(sparse.csr_matrix((data * idf, indices, indptr), shape=(len(keys), width)))
+
+        first = len(self.keys)
+        self._count_blocks.append(counts)
+        self._block_starts.append(first)
+        self.vectors.resize((self.vectors.shape[0], width))
+        self.recent.resize((self.recent.shape[0], width))
+        self.recent = sparse.vstack([self.recent, vectors], format='csc')
+        self.keys.extend(keys)
+        self.rows.update((key, first + offset) for offset, key in enumerate(keys))
+        self.alive = np.concatenate([self.alive, np.ones(len(keys), dtype=bool)])
+        self._pending.clear()
+
+        if self.recent.shape[0] > max(MERGE_ROWS, self.vectors.shape[0] // 10):
+            self.vectors = sparse.vstack([self.vectors, self.recent], format='csc')
+            self.recent = _empty(width)
+
+    def _flush(self):
+        self._append_pending()
+        if self._changed > REFIT_RATIO * max(self._fitted, 1):
+            self.refit()
+
+    def counts(self):
+        """Sublinear term frequencies of every row in the matrices, as one CSR matrix"""
+        width = len(self.vocabulary)
+        for block in self._count_blocks:
+            block.resize((block.shape[0], width))
+        return sparse.vstack(self._count_blocks, format='csr') if self._count_blocks else _empty(width, 'csr')
+
+    def refit(self):
+        """Recompute the idf from the live rows and drop removed rows"""
+        with self.lock:
+            self._append_pending()
+            live = np.flatnonzero(self.alive)
+            counts = self.counts()[live]
+            self._count_blocks, self._block_starts = [counts], [0]
+            self.keys = [self.keys[row] for row in live]
+            self.rows = {key: row for row, key in enumerate(self.keys)}
+            self.alive = np.ones(len(self.keys), dtype=bool)
+
+            idf = np.log((1.0 + len(self.keys)) / (1.0 + np.asarray(self.document_frequency, dtype=np.float64))) + 1.0
+            self.idf = idf.tolist()
+            self.vectors = _normalized(sparse.csr_matrix(counts.multiply(idf.astype(np.float32)))).tocsc()
+            self.recent = _empty(counts.shape[1])
+            self._changed = 0
+            self._fitted = len(self.keys)
+
+    # === Queries ===
+
+    def _scores(self, columns, weights):
+        """Cosine similarity of every row with a query, reading only the query's columns"""
+        weights = weights / np.linalg.norm(weights)
+        return np.concatenate([self.vectors[:, columns] @ weights, self.recent[:, columns] @ weights])
+
+    def _top(self, scores, limit, accept, exclude=None):
+        scores[~self.alive] = 0
+        if exclude is not None:
+            scores[exclude] = 0
+        candidates = np.flatnonzero(scores > 0)
+        wanted = limit
+        while True:
+            if len(candidates) > wanted:
+                top = candidates[np.argpartition(-scores[candidates], wanted)[:wanted]]
+            else:
+                top = candidates
+            top = top[np.argsort(-scores[top], kind='stable')]
+            results = [(self.keys[row], float(scores[row])) for row in top]
+            if accept is not None:
+                results = [result for result in results if accept(result[0])]
+            if len(results) >= limit or len(top) == len(candidates):
+                return results[:limit]
+            wanted *= 4
+
+    def search(self, text, limit=10, accept=None):
+        """[(key, cosine similarity)] of the best matching rows for a text"""
+        with self.lock:
+            self._flush()
+            width = self.vectors.shape[1]
+            frequencies = {
+                column: tf for column, tf in self._columns(text or '', grow=False).items() if column < width
+            }
+            if not frequencies:
+                return []
+            columns = np.fromiter(frequencies, dtype=np.int64)
+            weights = np.fromiter((tf * self.idf[column] for column, tf in frequencies.items()), dtype=np.float32)
+            return self._top(self._scores(columns, weights), limit, accept)
+
+    def similar(self, key, limit=10, accept=None):
+        """[(key, cosine similarity)] of the rows closest to a key's row; None for unknown keys"""
+        with self.lock:
+            self._flush()
+            row = self.rows.get(key)
+            if row is None:
+                return None
+            columns, counts = self._row_counts(row)
+            weights = counts * np.fromiter((self.idf[column] for column in columns), dtype=np.float32,
+                                           count=len(columns))
+            return self._top(self._scores(columns, weights), limit, accept, exclude=row)
+
+    # === Storage ===
+
+    def save(self, path, **metadata):
+        """Write the term counts and vocabulary to ``path`` (a directory)"""
+        with self.lock:
+            self.refit()
+            os.makedirs(path, exist_ok=True)
+            vocabulary = sorted(self.vocabulary, key=self.vocabulary.get)
+            sparse.save_npz(os.path.join(path, 'counts.tmp.npz'), self.counts())
+            np.savez(
+                os.path.join(path, 'meta.tmp.npz'),
+                vocabulary=np.array(vocabulary, dtype=str),
+                document_frequency=np.asarray(self.document_frequency, dtype=np.int64),
+                kinds=np.array([kind for kind, _ in self.keys], dtype=str),
+                ids=np.array([entity_id for _, entity_id in self.keys], dtype=np.int64),
+                **{name: np.array(value) for name, value in metadata.items()},
+            )
+            os.replace(os.path.join(path, 'counts.tmp.npz'), os.path.join(path, 'counts.npz'))
+            os.replace(os.path.join(path, 'meta.tmp.npz'), os.path.join(path, 'meta.npz'))
+
+    @classmethod
+    def load(cls, path):
+        """Index and metadata saved with ``save``; (None, {}) when there is none"""
+        try:
+            counts = sparse.load_npz(os.path.join(path, 'counts.npz')).tocsr().astype(np.float32)
+            with np.load(os.path.join(path, 'meta.npz')) as meta:
+                stored = {name: meta[name] for name in meta.files}
+        except FileNotFoundError:
+            return None, {}
+
+        index = cls()
+        index.vocabulary = {term: column for column, term in enumerate(stored.pop('vocabulary').tolist())}
+        index.document_frequency = stored.pop('document_frequency').tolist()
+        index.idf = [0.0] * len(index.document_frequency)
+        index.keys = list(zip(stored.pop('kinds').tolist(), stored.pop('ids').tolist()))
+        index.rows = {key: row for row, key in enumerate(index.keys)}
+        index.alive = np.ones(len(index.keys), dtype=bool)
+        index._count_blocks, index._block_starts = [counts], [0]
+        index.refit()
+        return index, {name: value.item() for name, value in stored.items()}
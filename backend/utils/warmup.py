@@ -0,0 +1,119 @@
+"""
+Startup cache warmup.
+
+Blueprints register their hot endpoints here. Warming issues a GET for each
+registered path through the app's test client, so whatever caching the view
+uses gets populated and the SQLite pages behind it are read once before real
+traffic arrives.
+"""
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor, wait
+
+# Registered hot keys: (name, path or callable returning a list of paths)
+_hot_keys = []
+
+
+def register_hot_key(name, path):
+    """Register a hot endpoint.
+
+    ``path`` is either a URL path or a callable run inside the app context
+    that returns a list of paths (e.g. one per subcategory).
+    """
+    _hot_keys.append((name, path))
+
+
+def get_hot_keys():
+    """Return the registered hot keys"""
+    return list(_hot_keys)
+
+
+def _resolve_paths(app):
+    """Expand registered hot keys into concrete (name, path) pairs"""
+    paths = []
+    with app.app_context():
+        for name, path in _hot_keys:
+            if callable(path):
+                try:
+                    paths.extend((name, p) for p in path())
+                except Exception as e:
+                    app.logger.warning(f"Cache warmup: could not resolve '{name}': {e}")
+            else:
+                paths.append((name, path))
+    return paths
+
+
+def _warm_path(app, name, path, deadline):
+    """Request a single path and time it"""
+    if time.monotonic() >= deadline:
+        return {"key": name, "path": path, "status": "skipped", "elapsed_ms": 0.0}
+
+    start = time.perf_counter()
+    try:
+        with app.test_client() as client:
+            response = client.get(path, headers={'X-Cache-Warmup': '1'})
+        status = response.status_code
+    except Exception as e:
+        app.logger.warning(f"Cache warmup: {path} failed: {e}")
+        status = "error"
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return {"key": name, "path": path, "status": status, "elapsed_ms": round(elapsed_ms, 2)}
+
+
+def warm_cache(app, concurrency=None, time_budget=None, grace=None):
+    """Warm all registered hot keys.
+
+    Runs at most ``concurrency`` requests at a time and starts no new ones
+    once ``time_budget`` seconds have passed; paths that never started are
+    reported as "skipped". Requests already in flight at the deadline get
+    ``grace`` more seconds to finish and are reported with their real
+    status. Only a request still running after that is reported as
+    "timeout"; it can't be interrupted, so it finishes in the background
+    while the worker serves traffic, and a warning says so. Returns one
+    report entry per path with its status and how long it took.
+    """
+    if concurrency is None:
+        concurrency = app.config.get('CACHE_WARMUP_CONCURRENCY', 4)
+    if time_budget is None:
+        time_budget = app.config.get('CACHE_WARMUP_TIME_BUDGET', 10.0)
+    if grace is None:
+        grace = app.config.get('CACHE_WARMUP_GRACE', 2.0)
+
+    started = time.monotonic()
+    deadline = started + time_budget
+    paths = _resolve_paths(app)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    futures = {
+        executor.submit(_warm_path, app, name, path, deadline): (name, path)
+        for name, path in paths
+    }
+    remaining = max(0.0, deadline - time.monotonic())
+    done, not_done = wait(futures, timeout=remaining)
+    if not_done:
+        # Queued requests never start; in-flight ones get the grace period
+        for future in not_done:
+            future.cancel()
+        finished, not_done = wait(not_done, timeout=grace)
+        done |= finished
+    executor.shutdown(wait=False)
+
+    report = []
+    for future in done:
+        name, path = futures[future]
+        try:
+            report.append(future.result())
+        except CancelledError:
+            report.append({"key": name, "path": path, "status": "skipped", "elapsed_ms": 0.0})
+    for future in not_done:
+        name, path = futures[future]
+        app.logger.warning(f"Cache warmup: {path} still running after the grace period")
+        report.append({"key": name, "path": path, "status": "timeout", "elapsed_ms": None})
+
+    report.sort(key=lambda r: r['path'])
+    for entry in report:
+        app.logger.info(
+            f"Cache warmup: {entry['path']} -> {entry['status']} ({entry['elapsed_ms']} ms)"
+        )
+    total_ms = (time.monotonic() - started) * 1000
+    app.logger.info(f"Cache warmup finished: {len(report)} keys in {total_ms:.1f} ms")
+    return report
@@ -0,0 +1,188 @@
+"""
+Single-writer coordination for SQLite.
+
+SQLite allows one writer at a time. When several gunicorn workers commit at
+once, the losers wait ``busy_timeout`` and then fail with "database is
+locked". Service write methods decorated with ``serialized_write`` instead
+queue for an exclusive lock file next to the database (``<db>.write.lock``),
+so only one write transaction runs at a time across all processes and
+threads. A write that still hits a lock error (e.g. from a process that
+isn't coordinated, or a checkpoint) is retried with exponential backoff and
+jitter. When the lock can't be had within ``SQLITE_WRITE_LOCK_TIMEOUT`` or
+the retries run out, ``DatabaseBusy`` is raised, which blueprints answer
+with 503 and a Retry-After header.
+
+Reads don't take the lock; in WAL mode (see ``backend.utils.sqlite_profile``)
+they keep running next to the writer. Other databases are left alone.
+"""
+import os
+import random
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, has_app_context, jsonify
+from sqlalchemy.exc import OperationalError
+
+from backend.extensions import db
+from backend.utils.metrics import Metric, register_collector
+
+try:
+    import fcntl
+except ImportError:  # Windows: coordinate the threads of this process only
+    fcntl = None
+
+# Messages SQLite uses for SQLITE_BUSY and SQLITE_LOCKED
+_LOCK_ERRORS = ('database is locked', 'database table is locked', 'database is busy')
+
+_local = threading.local()
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+_stats = {'writes': 0, 'retries': 0, 'busy': 0, 'wait_seconds': 0.0}
+_stats_lock = threading.Lock()
+
+
+class DatabaseBusy(Exception):
+    """The write could not get the database within the configured time or retries"""
+
+    def __init__(self, message="The database is busy, please try again", retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_lock_error(exc):
+    """Whether an exception, or one it was raised from, is SQLite's lock error"""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, OperationalError) and any(m in str(exc.orig) for m in _LOCK_ERRORS):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+def _count(**increments):
+    with _stats_lock:
+        for name, value in increments.items():
+            _stats[name] += value
+
+
+def _lock_path():
+    """Lock file of the app's SQLite database; None for other or in-memory databases"""
+    url = db.engine.url
+    if url.get_backend_name() != 'sqlite' or not url.database or url.database == ':memory:':
+        return None
+    return os.path.abspath(url.database) + '.write.lock'
+
+
+def _thread_lock(key):
+    with _thread_locks_guard:
+        return _thread_locks.setdefault(key, threading.Lock())
+
+
+class _WriteLock:
+    """Exclusive across threads (a mutex) and processes (flock on the lock file)"""
+
+    def __init__(self, path, timeout):
+        self.path = path
+        self.timeout = timeout
+        self.file = None
+        self.mutex = _thread_lock(path)
+
+    def __enter__(self):
+        started = time.monotonic()
+        if not self.mutex.acquire(timeout=self.timeout):
+            raise DatabaseBusy()
+        if self.path and fcntl is not None:
+            self.file = open(self.path, 'a')
+            delay = 0.001
+            while True:
+                try:
+                    fcntl.flock(self.file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() - started >= self.timeout:
+                        self._release()
+                        raise DatabaseBusy()
+                    time.sleep(delay)
+                    delay = min(delay * 2, 0.005)
+        _count(wait_seconds=time.monotonic() - started)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._release()
+
+    def _release(self):
+        if self.file is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+            self.file.close()
+            self.file = None
+        self.mutex.release()
+
+
+def serialized_write(fn):
+    """Run a service write method as the only writer, retrying lock errors with backoff"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not has_app_context() or getattr(_local, 'depth', 0) or db.engine.dialect.name != 'sqlite':
+            return fn(*args, **kwargs)
+
+        config = current_app.config
+        if not config.get('SQLITE_WRITE_COORDINATOR', True):
+            return fn(*args, **kwargs)
+        retries = config.get('SQLITE_WRITE_RETRIES', 5)
+        backoff = config.get('SQLITE_WRITE_BACKOFF', 0.05)
+        timeout = config.get('SQLITE_WRITE_LOCK_TIMEOUT', 10.0)
+
+        for attempt in range(retries + 1):
+            try:
+                with _WriteLock(_lock_path(), timeout):
+                    _local.depth = 1
+                    try:
+                        result = fn(*args, **kwargs)
+                    finally:
+                        _local.depth = 0
+                _count(writes=1)
+                return result
+            except Exception as e:
+                if isinstance(e, DatabaseBusy):
+                    _count(busy=1)
+                    raise
+                if not is_lock_error(e):
+                    raise
+                db.session.rollback()
+                if attempt == retries:
+                    _count(busy=1)
+                    raise DatabaseBusy() from e
+                _count(retries=1)
+                # Exponential backoff with full jitter, capped at one second
+                time.sleep(random.uniform(0, min(backoff * 2 ** attempt, 1.0)))
+    return wrapper
+
+
+def busy_response(error):
+    """503 telling the client when to retry"""
+    response = jsonify({"message": str(error)})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+
+def write_stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+@register_collector
+def _write_metrics():
+    """Export write coordination counters"""
+    stats = write_stats()
+    return [
+        Metric('bakery_sqlite_writes_total', 'counter', 'Coordinated write transactions').add(stats['writes']),
+        Metric('bakery_sqlite_write_retries_total', 'counter',
+               'Write transactions retried after a lock error').add(stats['retries']),
+        Metric('bakery_sqlite_write_busy_total', 'counter',
+               'Write transactions given up on as busy').add(stats['busy']),
+        Metric('bakery_sqlite_write_wait_seconds_total', 'counter',
+               'Time spent waiting for the write lock').add(round(stats['wait_seconds'], 6)),
+    ]
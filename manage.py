@@ -1,7 +1,11 @@
 import os
+import click
 from flask.cli import FlaskGroup
 from backend.app import create_app
 from backend.extensions import db
+from backend.utils.warmup import warm_cache
+from backend.utils.search_index import rebuild_indexes
+from backend.utils.spatial_index import rebuild_spatial_indexes
 
 # Create the Flask app
 app = create_app()
@@ -16,5 +20,45 @@ def db_create_all():
         db.create_all()
         print("All tables created successfully.")
 
+@cli.command("warm-cache")
+@click.option("--concurrency", type=int, default=None, help="Maximum concurrent warmup requests.")
+@click.option("--budget", type=float, default=None, help="Time budget in seconds.")
+def warm_cache_command(concurrency, budget):
+    """Precompute the registered hot cache keys."""
+    report = warm_cache(app, concurrency=concurrency, time_budget=budget)
+    for entry in report:
+        elapsed = f"{entry['elapsed_ms']:.1f} ms" if entry['elapsed_ms'] is not None else "-"
+        print(f"{entry['path']:<45} {str(entry['status']):<8} {elapsed}")
+
+@cli.command("rebuild-search-index")
+def rebuild_search_index_command():
+    """Re-index all rows in the full-text search tables."""
+    with app.app_context():
+        names = rebuild_indexes()
+        print(f"Rebuilt full-text indexes: {', '.join(names)}")
+
+@cli.command("rebuild-spatial-index")
+def rebuild_spatial_index_command():
+    """Re-place bakeries at their zip code centroids and re-index them."""
+    from backend.models import Bakery
+    with app.app_context():
+        for bakery in Bakery.query.yield_per(500):
+            bakery.zip_code = bakery.zip_code  # runs the geocoding validator
+        db.session.commit()
+        names = rebuild_spatial_indexes()
+        print(f"Rebuilt spatial indexes: {', '.join(names)}")
+
+@cli.command("build-review-vectors")
+@click.option("--path", default=None, help="Output directory (defaults to REVIEW_VECTORS_PATH).")
+def build_review_vectors_command(path):
+    """Build the TF-IDF review vectors and save them for the app to load."""
+    from backend.services.review_vectors import save_index
+    with app.app_context():
+        path = path or app.config.get('REVIEW_VECTORS_PATH')
+        if not path:
+            raise click.UsageError("Pass --path or set REVIEW_VECTORS_PATH")
+        index = save_index(path)
+        print(f"Saved {len(index)} review vectors ({len(index.vocabulary)} terms) to {path}")
+
 if __name__ == '__main__':
     cli()
\ No newline at end of file
@@ -45,6 +45,22 @@ target_db = current_app.extensions['migrate'].db
 # ... etc.
 
 
+# SQLite virtual tables (the FTS5 search indexes and the R*Tree) and the shadow
+# tables SQLite keeps behind them are created with raw SQL in the migrations and
+# have no models; autogenerate must not propose dropping them
+SHADOW_TABLE_SUFFIXES = ('_data', '_idx', '_docsize', '_config', '_content', '_node', '_rowid', '_parent')
+
+
+def get_virtual_tables(engine):
+    if engine.dialect.name != 'sqlite':
+        return set()
+    with engine.connect() as connection:
+        virtual = set(connection.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND sql LIKE 'CREATE VIRTUAL TABLE%'"
+        ).scalars())
+    return virtual | {name + suffix for name in virtual for suffix in SHADOW_TABLE_SUFFIXES}
+
+
 def get_metadata():
     if hasattr(target_db, 'metadatas'):
         return target_db.metadatas[None]
@@ -95,12 +111,16 @@ def run_migrations_online():
         conf_args["process_revision_directives"] = process_revision_directives
 
     connectable = get_engine()
+    virtual_tables = get_virtual_tables(connectable)
+
+    def include_name(name, type_, parent_names):
+        return not (type_ == 'table' and name in virtual_tables)
 
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
-            **conf_args
+            **{"include_name": include_name, **conf_args}
         )
 
         with context.begin_transaction():
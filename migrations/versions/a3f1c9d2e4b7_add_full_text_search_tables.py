@@ -0,0 +1,56 @@
+"""Add full-text search tables
+
+Revision ID: a3f1c9d2e4b7
+Revises: 66ecb76f2038
+Create Date: 2026-10-19 10:12:31.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.utils.search_index import fold_for_index
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f1c9d2e4b7'
+down_revision = '66ecb76f2038'
+branch_labels = None
+depends_on = None
+
+
+# FTS table -> (source query, FTS columns)
+FTS_TABLES = {
+    'bakery_fts': ("SELECT id, name, street_name FROM bakery", ('name', 'street')),
+    'product_fts': ("SELECT id, name FROM product", ('name',)),
+    'bakery_review_fts': ("SELECT id, review FROM bakery_review", ('review',)),
+    'product_review_fts': ("SELECT id, review FROM product_review", ('review',)),
+}
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+
+    for table, (source, columns) in FTS_TABLES.items():
+        op.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5({', '.join(columns)})")
+
+        # Backfill with the same folding the application applies
+        insert = sa.text(
+            f"INSERT INTO {table} (rowid, {', '.join(columns)}) "
+            f"VALUES (:rowid, {', '.join(':' + c for c in columns)})"
+        )
+        rows = [
+            {'rowid': row[0], **{c: fold_for_index(v) for c, v in zip(columns, row[1:])}}
+            for row in bind.execute(sa.text(source))
+        ]
+        if rows:
+            bind.execute(insert, rows)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for table in FTS_TABLES:
+        op.execute(f"DROP TABLE IF EXISTS {table}")
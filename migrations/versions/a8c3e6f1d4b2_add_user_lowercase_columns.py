@@ -0,0 +1,59 @@
+"""Add Unicode lowercase username and email columns
+
+Revision ID: a8c3e6f1d4b2
+Revises: f2b8d4a6c1e9
+Create Date: 2026-10-19 18:21:09.473615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8c3e6f1d4b2'
+down_revision = 'f2b8d4a6c1e9'
+branch_labels = None
+depends_on = None
+
+# column -> (length, index)
+LOWERCASE_COLUMNS = {
+    'username': (48, 'idx_user_username_lower'),
+    'email': (100, 'idx_user_email_lower'),
+}
+
+
+def upgrade():
+    bind = op.get_bind()
+    # The lower() expression indexes share their names with the column indexes
+    for column, (_, index) in LOWERCASE_COLUMNS.items():
+        op.drop_index(index, table_name='user')
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        for column, (length, _) in LOWERCASE_COLUMNS.items():
+            batch_op.add_column(sa.Column(f'{column}_lower', sa.String(length=length), nullable=True))
+
+    # SQLite's lower() only folds ASCII, so existing rows are lowercased here
+    rows = [
+        {'id': row_id, 'username': username.lower(), 'email': email.lower()}
+        for row_id, username, email in bind.execute(sa.text('SELECT id, username, email FROM "user"'))
+    ]
+    if rows:
+        bind.execute(sa.text('UPDATE "user" SET username_lower = :username, email_lower = :email WHERE id = :id'), rows)
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        for column, (_, index) in LOWERCASE_COLUMNS.items():
+            batch_op.create_index(index, [f'{column}_lower'], unique=False)
+
+    if bind.dialect.name == 'sqlite':
+        # The trigram table was filled with lower() as well
+        op.execute("DELETE FROM user_trigram")
+        op.execute('INSERT INTO user_trigram (rowid, username, email) '
+                   'SELECT id, username_lower, email_lower FROM "user"')
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        for column, (_, index) in LOWERCASE_COLUMNS.items():
+            batch_op.drop_index(index)
+            batch_op.drop_column(f'{column}_lower')
+    for column, (_, index) in LOWERCASE_COLUMNS.items():
+        op.create_index(index, 'user', [sa.text(f'lower({column})')], unique=False)
@@ -0,0 +1,40 @@
+"""Add table_version for the conditional GET validators
+
+Revision ID: b9e4d7a2c5f8
+Revises: a8c3e6f1d4b2
+Create Date: 2026-10-19 20:12:44.581903
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9e4d7a2c5f8'
+down_revision = 'a8c3e6f1d4b2'
+branch_labels = None
+depends_on = None
+
+# Tables whose changes the ETags and Last-Modified headers follow
+TRACKED_TABLES = ['user', 'category', 'subcategory', 'bakery', 'product', 'bakery_review', 'product_review']
+
+
+def upgrade():
+    table_version = op.create_table(
+        'table_version',
+        sa.Column('table_name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('table_name'),
+    )
+    # Existing data may have changed at any time up to now
+    now = datetime.utcnow()
+    op.bulk_insert(table_version, [
+        {'table_name': name, 'version': 1, 'changed_at': now} for name in TRACKED_TABLES
+    ])
+
+
+def downgrade():
+    op.drop_table('table_version')
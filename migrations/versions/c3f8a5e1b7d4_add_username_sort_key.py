@@ -0,0 +1,52 @@
+"""Add username sort key and re-key names for word-initial aa
+
+Revision ID: c3f8a5e1b7d4
+Revises: b9e4d7a2c5f8
+Create Date: 2026-10-19 21:03:17.204658
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.utils.collation import danish_sort_key
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f8a5e1b7d4'
+down_revision = 'b9e4d7a2c5f8'
+branch_labels = None
+depends_on = None
+
+# Tables keyed by name in e5f1a7c3b9d2, when every "aa" still counted as å
+NAME_KEYED_TABLES = ['bakery', 'product', 'category', 'subcategory']
+
+
+def _rekey(bind, table, source, target):
+    # The collation rules live in Python, so the rows are keyed here
+    keys = [
+        {'id': row_id, 'key': danish_sort_key(value)}
+        for row_id, value in bind.execute(sa.text(f'SELECT id, {source} FROM "{table}"'))
+    ]
+    if keys:
+        bind.execute(sa.text(f'UPDATE "{table}" SET {target} = :key WHERE id = :id'), keys)
+
+
+def upgrade():
+    bind = op.get_bind()
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('username_sort_key', sa.String(length=255), nullable=True))
+
+    _rekey(bind, 'user', 'username', 'username_sort_key')
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index('idx_user_username_sort_key', ['username_sort_key'], unique=False)
+
+    for table in NAME_KEYED_TABLES:
+        _rekey(bind, table, 'name', 'name_sort_key')
+
+
+def downgrade():
+    # The name keys stay on the new rules; they still order names consistently
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index('idx_user_username_sort_key')
+        batch_op.drop_column('username_sort_key')
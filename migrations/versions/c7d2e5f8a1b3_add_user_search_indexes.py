@@ -0,0 +1,35 @@
+"""Add user search indexes
+
+Revision ID: c7d2e5f8a1b3
+Revises: a3f1c9d2e4b7
+Create Date: 2026-10-19 14:03:47.581920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d2e5f8a1b3'
+down_revision = 'a3f1c9d2e4b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('idx_user_username_lower', 'user', [sa.text('lower(username)')], unique=False)
+    op.create_index('idx_user_email_lower', 'user', [sa.text('lower(email)')], unique=False)
+
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS user_trigram USING fts5(username, email, tokenize='trigram')")
+    op.execute('INSERT INTO user_trigram (rowid, username, email) SELECT id, lower(username), lower(email) FROM "user"')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS user_trigram")
+
+    op.drop_index('idx_user_email_lower', table_name='user')
+    op.drop_index('idx_user_username_lower', table_name='user')
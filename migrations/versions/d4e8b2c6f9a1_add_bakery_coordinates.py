@@ -0,0 +1,52 @@
+"""Add bakery coordinates and spatial index
+
+Revision ID: d4e8b2c6f9a1
+Revises: c7d2e5f8a1b3
+Create Date: 2026-10-19 15:21:08.337164
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.utils.geo import zip_centroid
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e8b2c6f9a1'
+down_revision = 'c7d2e5f8a1b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('bakery', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('latitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('longitude', sa.Float(), nullable=True))
+
+    # Place existing bakeries at their zip code centroids
+    bind = op.get_bind()
+    placed = []
+    for bakery_id, zip_code in bind.execute(sa.text("SELECT id, zip_code FROM bakery")):
+        point = zip_centroid(zip_code)
+        if point:
+            placed.append({'id': bakery_id, 'lat': point[0], 'lng': point[1]})
+    if placed:
+        bind.execute(sa.text("UPDATE bakery SET latitude = :lat, longitude = :lng WHERE id = :id"), placed)
+
+    if bind.dialect.name != 'sqlite':
+        return
+
+    op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS bakery_rtree USING rtree(id, min_lat, max_lat, min_lng, max_lng)")
+    op.execute(
+        "INSERT INTO bakery_rtree (id, min_lat, max_lat, min_lng, max_lng) "
+        "SELECT id, latitude, latitude, longitude, longitude FROM bakery WHERE latitude IS NOT NULL"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS bakery_rtree")
+
+    with op.batch_alter_table('bakery', schema=None) as batch_op:
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
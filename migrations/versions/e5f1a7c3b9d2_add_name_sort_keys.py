@@ -0,0 +1,66 @@
+"""Add Danish name sort keys
+
+Revision ID: e5f1a7c3b9d2
+Revises: d4e8b2c6f9a1
+Create Date: 2026-10-19 16:02:44.918305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.utils.collation import danish_sort_key
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f1a7c3b9d2'
+down_revision = 'd4e8b2c6f9a1'
+branch_labels = None
+depends_on = None
+
+# table -> indexes on the sort key, leading with the column each listing filters on
+SORT_KEY_INDEXES = {
+    'bakery': {
+        'idx_bakery_name_sort_key': ['name_sort_key'],
+        'idx_bakery_zip_name_sort_key': ['zip_code', 'name_sort_key'],
+    },
+    'product': {
+        'idx_product_name_sort_key': ['name_sort_key'],
+        'idx_product_bakery_name_sort_key': ['bakery_id', 'name_sort_key'],
+        'idx_product_category_name_sort_key': ['category_id', 'name_sort_key'],
+        'idx_product_subcategory_name_sort_key': ['subcategory_id', 'name_sort_key'],
+    },
+    'category': {
+        'idx_category_name_sort_key': ['name_sort_key'],
+    },
+    'subcategory': {
+        'idx_subcategory_name_sort_key': ['name_sort_key'],
+        'idx_subcategory_category_name_sort_key': ['category_id', 'name_sort_key'],
+    },
+}
+
+
+def upgrade():
+    bind = op.get_bind()
+    for table, indexes in SORT_KEY_INDEXES.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('name_sort_key', sa.String(length=255), nullable=True))
+
+        # The collation rules live in Python, so existing rows are keyed here
+        keys = [
+            {'id': row_id, 'key': danish_sort_key(name)}
+            for row_id, name in bind.execute(sa.text(f"SELECT id, name FROM {table}"))
+        ]
+        if keys:
+            bind.execute(sa.text(f"UPDATE {table} SET name_sort_key = :key WHERE id = :id"), keys)
+
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for name, columns in indexes.items():
+                batch_op.create_index(name, columns, unique=False)
+
+
+def downgrade():
+    for table, indexes in SORT_KEY_INDEXES.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for name in indexes:
+                batch_op.drop_index(name)
+            batch_op.drop_column('name_sort_key')
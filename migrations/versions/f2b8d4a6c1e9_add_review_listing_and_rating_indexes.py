@@ -0,0 +1,66 @@
+"""Add review listing and rating indexes
+
+Revision ID: f2b8d4a6c1e9
+Revises: e5f1a7c3b9d2
+Create Date: 2026-10-19 17:41:08.263517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b8d4a6c1e9'
+down_revision = 'e5f1a7c3b9d2'
+branch_labels = None
+depends_on = None
+
+# table -> indexes added: listings by (filter, created_at, id), so newest-first
+# needs no sort, and the rating columns behind the stats, so they are read
+# from the index alone
+INDEXES = {
+    'bakery_review': {
+        'idx_bakery_review_bakery_created': ['bakery_id', 'created_at', 'id'],
+        'idx_bakery_review_user_created': ['user_id', 'created_at', 'id'],
+        'idx_bakery_review_created': ['created_at', 'id'],
+        'idx_bakery_review_bakery_ratings': ['bakery_id', 'overall_rating', 'service_rating', 'price_rating',
+                                             'atmosphere_rating', 'location_rating'],
+    },
+    'product_review': {
+        'idx_product_review_product_created': ['product_id', 'created_at', 'id'],
+        'idx_product_review_user_created': ['user_id', 'created_at', 'id'],
+        'idx_product_review_created': ['created_at', 'id'],
+        'idx_product_review_product_ratings': ['product_id', 'overall_rating', 'taste_rating', 'price_rating',
+                                               'presentation_rating'],
+    },
+}
+
+# table -> single-column indexes the new ones lead with, and so replace
+REPLACED = {
+    'bakery_review': {
+        'idx_bakery_review_bakery_id': ['bakery_id'],
+        'idx_bakery_review_user_id': ['user_id'],
+    },
+    'product_review': {
+        'idx_product_review_product_id': ['product_id'],
+        'idx_product_review_user_id': ['user_id'],
+    },
+}
+
+
+def upgrade():
+    for table, indexes in INDEXES.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for name, columns in indexes.items():
+                batch_op.create_index(name, columns, unique=False)
+            for name in REPLACED[table]:
+                batch_op.drop_index(name)
+
+
+def downgrade():
+    for table, indexes in INDEXES.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for name, columns in REPLACED[table].items():
+                batch_op.create_index(name, columns, unique=False)
+            for name in indexes:
+                batch_op.drop_index(name)